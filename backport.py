@@ -4,18 +4,32 @@
 #
 # vim: set noai syntax=python ts=4 sw=4:
 """Wait Wait Stats Database Backport."""
+import argparse
 import json
+from dataclasses import asdict, replace
 from pathlib import Path
 
+from tables import mappings
+from tables.async_engine import run_tasks_async
+from tables.checkpoint import Checkpoint
+from tables.connections import ConnectionManager
 from tables.descriptions import Descriptions
 from tables.guests import Guests
 from tables.hosts import Hosts
+from tables.indexes import IndexRebuildError, saved_tables
 from tables.locations import Locations
-from tables.mappings import AllMappings
+from tables.metrics import RunReport, record_run
 from tables.notes import Notes
+from tables.options import DRIVERS, ENGINES, TransferOptions
 from tables.panelists import Panelists
+from tables.scheduler import TransferTask, run_tasks
 from tables.scorekeepers import Scorekeepers
 from tables.shows import Shows
+from tables.snapshot import SnapshotReader, SnapshotWriter
+from tables.transactions import TransactionManager
+from tables.transform import shutdown_transform_pool
+
+COMMANDS: tuple[str, ...] = ("transfer", "export", "import")
 
 
 def load_config(config_file: str = "config.json") -> dict[str, str | int | None] | None:
@@ -37,66 +51,433 @@ def load_config(config_file: str = "config.json") -> dict[str, str | int | None]
     return _config_keys
 
 
+TRANSFER_TASKS: tuple[TransferTask, ...] = tuple(
+    TransferTask.from_table(table_class)
+    for table_class in (
+        Shows,
+        Descriptions,
+        Notes,
+        Guests,
+        Hosts,
+        Locations,
+        Panelists,
+        Scorekeepers,
+        mappings.Bluffs,
+        mappings.Guests,
+        mappings.Hosts,
+        mappings.Locations,
+        mappings.Panelists,
+        mappings.Scorekeepers,
+    )
+)
+
+
+def _run(
+    source_database_config: dict,
+    destination_database_config: dict | list[dict],
+    options: TransferOptions,
+    snapshot: SnapshotReader | SnapshotWriter | None = None,
+) -> RunReport:
+    """Run every transfer task and write the run report and profile.
+
+    If options.checkpoint_file is set, the progress of each table is
+    recorded in a checkpoint that is deleted once the run completes. No
+    checkpoint is written in the run transaction mode, as nothing is
+    committed before the end of the run, or for snapshots.
+    """
+    # Tables left without their indexes by an earlier run can only be
+    # restored by a run that rebuilds indexes
+    if options.index_file and not options.rebuild_indexes:
+        pending = saved_tables(options.index_file)
+        if pending:
+            raise IndexRebuildError(
+                f"The indexes of {', '.join(pending)} were dropped by an earlier "
+                f"run and are saved in {options.index_file}; run again with "
+                "--rebuild-indexes to recreate them"
+            )
+
+    transaction_manager = TransactionManager(
+        mode=options.transaction_mode, disable_checks=options.disable_checks
+    )
+
+    # Partitioned tables use a pair of connections for each primary key
+    # range in addition to their own pair
+    pool_size = max(options.pool_size, options.jobs)
+    if options.partitions > 1:
+        pool_size = max(pool_size, options.jobs * (options.partitions + 1))
+
+    checkpoint: Checkpoint | None = None
+    if (
+        options.checkpoint_file
+        and options.transaction_mode != "run"
+        and snapshot is None
+    ):
+        checkpoint = Checkpoint(options.checkpoint_file, resume=options.resume)
+
+    report: RunReport | None = None
+    try:
+        with (
+            record_run(options=asdict(options)) as report,
+            ConnectionManager(
+                source_connect_dict=source_database_config,
+                destination_connect_dict=destination_database_config,
+                pool_size=pool_size,
+                driver=options.driver,
+            ) as connection_manager,
+            transaction_manager.run(),
+        ):
+            # Snapshot imports do not read from the source database
+            if options.consistent_snapshot and not isinstance(snapshot, SnapshotReader):
+                connection_manager.start_source_snapshot(
+                    sorted(
+                        {task.table_class.spec.source_table for task in TRANSFER_TASKS}
+                    )
+                )
+
+            if options.engine == "async":
+                if snapshot is not None:
+                    raise ValueError(
+                        "The async engine cannot be used to export or import snapshots"
+                    )
+
+                if len(connection_manager.destination_pools) > 1:
+                    raise ValueError(
+                        "The async engine only supports a single destination database"
+                    )
+
+                run_tasks_async(
+                    tasks=TRANSFER_TASKS,
+                    connection_manager=connection_manager,
+                    options=options,
+                    jobs=options.jobs,
+                    transaction_manager=transaction_manager,
+                    report=report,
+                    checkpoint=checkpoint,
+                )
+            else:
+                run_tasks(
+                    tasks=TRANSFER_TASKS,
+                    connection_manager=connection_manager,
+                    options=options,
+                    jobs=options.jobs,
+                    transaction_manager=transaction_manager,
+                    report=report,
+                    snapshot=snapshot,
+                    checkpoint=checkpoint,
+                )
+
+        if checkpoint is not None:
+            checkpoint.remove()
+    finally:
+        shutdown_transform_pool()
+        if report is not None and options.report_file:
+            report.write(options.report_file)
+
+        if report is not None and options.profile_file:
+            report.write_profile(options.profile_file)
+
+    return report
+
+
 def transfer_data(
-    source_database_config: dict, destination_database_config: dict
-) -> None:
-    """Process and transfer data from newer database to older database versions."""
-    _shows = Shows(
-        source_connect_dict=source_database_config,
-        destination_connect_dict=destination_database_config,
+    source_database_config: dict,
+    destination_database_config: dict | list[dict],
+    options: TransferOptions | None = None,
+) -> RunReport:
+    """Process and transfer data from newer database to older database versions.
+
+    Tables are transferred by a scheduler that runs up to options.jobs
+    transfers concurrently, each on its own pair of connections, while
+    ensuring that tables are only transferred after the tables they
+    reference. Writes are committed according to the configured
+    transaction mode and rolled back if a transfer fails.
+
+    If a list of destination databases is provided, each source table
+    is read once and written to every destination in parallel.
+
+    Returns a report with timings and row counts for each table. The
+    report is also written to options.report_file, if set, including
+    when the run fails.
+    """
+    return _run(
+        source_database_config=source_database_config,
+        destination_database_config=destination_database_config,
+        options=options or TransferOptions(),
+    )
+
+
+def export_data(
+    source_database_config: dict,
+    snapshot_directory: str | Path,
+    options: TransferOptions | None = None,
+) -> RunReport:
+    """Export data from the newer database version to a snapshot.
+
+    Only the source database is used. Rows are transformed into their
+    destination values and written to one file per table, and the
+    snapshot manifest is only written once every table was exported.
+    """
+    with SnapshotWriter(snapshot_directory) as snapshot:
+        return _run(
+            source_database_config=source_database_config,
+            destination_database_config={},
+            options=options or TransferOptions(),
+            snapshot=snapshot,
+        )
+
+
+def import_data(
+    destination_database_config: dict | list[dict],
+    snapshot_directory: str | Path,
+    options: TransferOptions | None = None,
+) -> RunReport:
+    """Import data from a snapshot into the older database version.
+
+    Only the destination database is used. Tables are loaded in the
+    same order, and with the same transaction handling, as a transfer.
+    The row count and checksum of each table are verified against the
+    snapshot manifest before any of its rows are loaded.
+    """
+    return _run(
+        source_database_config={},
+        destination_database_config=destination_database_config,
+        options=options or TransferOptions(),
+        snapshot=SnapshotReader(snapshot_directory),
+    )
+
+
+def parse_arguments(arguments: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Wait Wait Stats Database Backport")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=COMMANDS,
+        default="transfer",
+        help="transfer data between databases (default), export data from the "
+        "source database to a snapshot or import a snapshot into the "
+        "destination database",
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="DIRECTORY",
+        default=None,
+        help="snapshot directory used by the export and import commands",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="maximum number of tables to transfer concurrently "
+        "(overrides the jobs setting in config.json)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=None,
+        help="only transfer rows newer than those already in the destination "
+        "database (overrides the incremental setting in config.json)",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        default=None,
+        help="compare tables using checksums and only insert, update or delete "
+        "rows that differ (overrides the sync setting in config.json)",
+    )
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        default=None,
+        help="write rows using LOAD DATA LOCAL INFILE where possible "
+        "(overrides the bulk_load setting in config.json)",
+    )
+    parser.add_argument(
+        "--prepared-statements",
+        action="store_true",
+        default=None,
+        help="write full batches of rows using server-side prepared statements "
+        "(overrides the prepared_statements setting in config.json)",
     )
-    _descriptions = Descriptions(
-        source_connect_dict=source_database_config,
-        destination_connect_dict=destination_database_config,
+    parser.add_argument(
+        "--rebuild-indexes",
+        action="store_true",
+        default=None,
+        help="drop secondary indexes and foreign keys before loading each table "
+        "and rebuild them afterwards (overrides the rebuild_indexes setting in "
+        "config.json)",
     )
-    _notes = Notes(
-        source_connect_dict=source_database_config,
-        destination_connect_dict=destination_database_config,
+    parser.add_argument(
+        "--transform-workers",
+        type=int,
+        metavar="N",
+        default=None,
+        help="transform show notes and descriptions in N worker processes "
+        "(overrides the transform_workers setting in config.json)",
     )
-    _guests = Guests(
-        source_connect_dict=source_database_config,
-        destination_connect_dict=destination_database_config,
+    parser.add_argument(
+        "--consistent-snapshot",
+        action="store_true",
+        default=None,
+        help="read every source table from a single consistent snapshot taken "
+        "when the run starts (overrides the consistent_snapshot setting in "
+        "config.json)",
     )
-    _hosts = Hosts(
-        source_connect_dict=source_database_config,
-        destination_connect_dict=destination_database_config,
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        metavar="N",
+        default=None,
+        help="split each large mapping table into N primary key ranges that "
+        "are transferred in parallel (overrides the partitions setting in "
+        "config.json)",
     )
-    _locations = Locations(
-        source_connect_dict=source_database_config,
-        destination_connect_dict=destination_database_config,
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=None,
+        help="run tables on worker threads (threaded) or on an asyncio event "
+        "loop that reads rows ahead while earlier rows are written (async) "
+        "(overrides the engine setting in config.json)",
     )
-    _panelists = Panelists(
-        source_connect_dict=source_database_config,
-        destination_connect_dict=destination_database_config,
+    parser.add_argument(
+        "--driver",
+        choices=DRIVERS,
+        default=None,
+        help="database driver used to connect to the source and destination "
+        "databases (overrides the driver setting in config.json)",
     )
-    _scorekeepers = Scorekeepers(
-        source_connect_dict=source_database_config,
-        destination_connect_dict=destination_database_config,
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        default=None,
+        help="record the progress of each table in a checkpoint file "
+        "(overrides the checkpoint_file setting in config.json)",
     )
-    _all_mappings = AllMappings(
-        source_connect_dict=source_database_config,
-        destination_connect_dict=destination_database_config,
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="skip tables completed by an interrupted run and continue "
+        "partially transferred tables after their last committed row",
     )
+    parser.add_argument(
+        "--report",
+        metavar="FILE",
+        default=None,
+        help="write a JSON report with timings and row counts for each table "
+        "(overrides the report_file setting in config.json)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        default=None,
+        help="profile each table, add text normalizer timings to the report "
+        "and write the combined profile to a file in pstats format "
+        "(overrides the profile_file setting in config.json)",
+    )
+    _arguments = parser.parse_args(arguments)
+
+    if _arguments.command in ("export", "import"):
+        if not _arguments.snapshot:
+            parser.error(f"the {_arguments.command} command requires --snapshot")
+
+        if _arguments.incremental or _arguments.sync:
+            parser.error(
+                f"the {_arguments.command} command cannot be combined with "
+                "--incremental or --sync"
+            )
 
-    _shows.transfer()
-    _descriptions.transfer()
-    _notes.transfer()
-    _guests.transfer()
-    _hosts.transfer()
-    _locations.transfer()
-    _panelists.transfer()
-    _scorekeepers.transfer()
-    _all_mappings.transfer_all()
+        if _arguments.resume:
+            parser.error(
+                f"the {_arguments.command} command cannot be combined with --resume"
+            )
+
+        if _arguments.engine == "async":
+            parser.error(
+                f"the {_arguments.command} command cannot be used with the "
+                "async engine"
+            )
+
+    return _arguments
 
 
 def main() -> None:
     """Main application entry point."""
+    _arguments = parse_arguments()
     _config_keys: dict = load_config()
     if _config_keys:
-        transfer_data(
-            source_database_config=_config_keys["source_database"],
-            destination_database_config=_config_keys["destination_database"],
-        )
+        _options = TransferOptions.from_config(_config_keys)
+        if _arguments.jobs is not None:
+            _options = replace(_options, jobs=_arguments.jobs)
+
+        if _arguments.incremental is not None:
+            _options = replace(_options, incremental=_arguments.incremental)
+
+        if _arguments.sync is not None:
+            _options = replace(_options, sync=_arguments.sync)
+
+        if _arguments.bulk_load is not None:
+            _options = replace(_options, bulk_load=_arguments.bulk_load)
+
+        if _arguments.prepared_statements is not None:
+            _options = replace(
+                _options, prepared_statements=_arguments.prepared_statements
+            )
+
+        if _arguments.rebuild_indexes is not None:
+            _options = replace(_options, rebuild_indexes=_arguments.rebuild_indexes)
+
+        if _arguments.transform_workers is not None:
+            _options = replace(_options, transform_workers=_arguments.transform_workers)
+
+        if _arguments.consistent_snapshot is not None:
+            _options = replace(
+                _options, consistent_snapshot=_arguments.consistent_snapshot
+            )
+
+        if _arguments.partitions is not None:
+            _options = replace(_options, partitions=_arguments.partitions)
+
+        if _arguments.engine is not None:
+            _options = replace(_options, engine=_arguments.engine)
+
+        if _arguments.driver is not None:
+            _options = replace(_options, driver=_arguments.driver)
+
+        if _arguments.checkpoint is not None:
+            _options = replace(_options, checkpoint_file=_arguments.checkpoint)
+
+        if _arguments.resume:
+            _options = replace(_options, resume=True)
+
+        if _arguments.report is not None:
+            _options = replace(_options, report_file=_arguments.report)
+
+        if _arguments.profile is not None:
+            _options = replace(_options, profile_file=_arguments.profile)
+
+        if _arguments.command == "export":
+            _report = export_data(
+                source_database_config=_config_keys["source_database"],
+                snapshot_directory=_arguments.snapshot,
+                options=_options,
+            )
+        elif _arguments.command == "import":
+            _report = import_data(
+                destination_database_config=_config_keys["destination_database"],
+                snapshot_directory=_arguments.snapshot,
+                options=_options,
+            )
+        else:
+            _report = transfer_data(
+                source_database_config=_config_keys["source_database"],
+                destination_database_config=_config_keys["destination_database"],
+                options=_options,
+            )
+
+        print(_report.summary())
 
 
 if __name__ == "__main__":
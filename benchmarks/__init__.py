@@ -0,0 +1,6 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport Benchmarks Module."""
@@ -0,0 +1,224 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport Benchmarks: Database Drivers.
+
+Generates a synthetic source database and, using each database driver
+in turn, reads every mapping table from the source database and writes
+it into the destination database using batched INSERT statements.
+Reports the best wall time and client CPU time per row spent reading,
+which includes decoding values returned by the server, and spent
+writing, which includes encoding values sent to the server, for each
+driver and table as JSON. Drivers that are not installed are reported
+with the error raised when connecting.
+
+Foreign key checks are turned off on the destination connection, so
+that mapping tables can be written without loading the tables they
+reference.
+
+Usage::
+
+    python -m benchmarks.drivers --config benchmark.json --scale 10
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from backport import TRANSFER_TASKS, load_config
+from benchmarks.generate import generate
+from benchmarks.schema import create_tables
+from tables.connections import ConnectionManager
+from tables.drivers import DriverError, connect
+from tables.options import DRIVERS, TransferOptions
+from tables.writer import BatchWriter
+
+
+def _best_times(function: Callable[[], Any], repeat: int) -> tuple[float, float]:
+    """Return the lowest wall time and CPU time of repeated calls."""
+    wall_times: list[float] = []
+    cpu_times: list[float] = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+        function()
+        cpu_times.append(time.process_time() - start_cpu_time)
+        wall_times.append(time.perf_counter() - start_time)
+
+    return min(wall_times), min(cpu_times)
+
+
+def _per_row(seconds: float, rows: int) -> float | None:
+    """Convert a time in seconds into microseconds per row."""
+    return round(seconds / rows * 1000000, 3) if rows else None
+
+
+def _measure_driver(
+    config: dict[str, Any], options: TransferOptions, driver: str, repeat: int
+) -> list[dict[str, Any]]:
+    """Read and write every mapping table using a driver."""
+    measurements: list[dict[str, Any]] = []
+    with (
+        ConnectionManager(
+            source_connect_dict=config["source_database"],
+            destination_connect_dict=config["destination_database"],
+            pool_size=1,
+            driver=driver,
+        ) as connection_manager,
+        connection_manager.connections() as (
+            source_connection,
+            destination_connection,
+        ),
+    ):
+        cursor = destination_connection.cursor()
+        cursor.execute("SET SESSION foreign_key_checks = 0;")
+        cursor.close()
+
+        for task in TRANSFER_TASKS:
+            if not task.name.endswith("_mappings"):
+                continue
+
+            spec = task.table_class.spec
+            table = task.table_class(
+                source_database_connection=source_connection,
+                destination_database_connection=destination_connection,
+                options=options,
+            )
+            rows = list(table.read())
+            source_connection.commit()
+
+            def read(table=table) -> None:
+                for _ in table.read():
+                    pass
+
+            def write(spec=spec, rows=rows) -> None:
+                cursor = destination_connection.cursor()
+                cursor.execute(f"TRUNCATE TABLE {spec.destination_table};")
+                cursor.close()
+                with BatchWriter(
+                    database_connection=destination_connection,
+                    table=spec.destination_table,
+                    columns=spec.columns,
+                    batch_size=options.batch_size,
+                ) as writer:
+                    writer.extend(rows)
+
+                destination_connection.commit()
+
+            read_time, read_cpu_time = _best_times(read, repeat)
+            write_time, write_cpu_time = _best_times(write, repeat)
+            measurements.append(
+                {
+                    "name": task.name,
+                    "rows": len(rows),
+                    "read_time": round(read_time, 6),
+                    "read_cpu_us_per_row": _per_row(read_cpu_time, len(rows)),
+                    "write_time": round(write_time, 6),
+                    "write_cpu_us_per_row": _per_row(write_cpu_time, len(rows)),
+                }
+            )
+
+    return measurements
+
+
+def run_benchmark(
+    config: dict[str, Any],
+    scale: float,
+    seed: int = 0,
+    repeat: int = 3,
+    skip_generate: bool = False,
+) -> dict[str, Any]:
+    """Run the benchmark and return the results."""
+    options = TransferOptions.from_config(config)
+    results: dict[str, Any] = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "scale": scale,
+        "seed": seed,
+        "repeat": repeat,
+        "batch_size": options.batch_size,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "source_rows": None,
+        "drivers": [],
+    }
+
+    source_connection = connect(config["source_database"])
+    destination_connection = connect(config["destination_database"])
+    try:
+        if not skip_generate:
+            create_tables(source_connection, source=True)
+            results["source_rows"] = generate(source_connection, scale=scale, seed=seed)
+
+        create_tables(destination_connection, source=False)
+    finally:
+        source_connection.close()
+        destination_connection.close()
+
+    for driver in DRIVERS:
+        try:
+            tables = _measure_driver(config, options, driver, repeat)
+        except DriverError as error:
+            results["drivers"].append({"driver": driver, "error": str(error)})
+        else:
+            results["drivers"].append({"driver": driver, "tables": tables})
+
+    return results
+
+
+def main(arguments: list[str] | None = None) -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(
+        description="Wait Wait Stats Database Backport Database Driver Benchmark"
+    )
+    parser.add_argument(
+        "--config",
+        default="config.json",
+        help="configuration file pointing at scratch source and destination "
+        "databases; all fixture tables in both databases are replaced",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1,
+        help="size of the generated data relative to the real database "
+        "(for example 1, 10 or 100)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="number of timed runs per table"
+    )
+    parser.add_argument(
+        "--skip-generate",
+        action="store_true",
+        help="reuse previously generated source data",
+    )
+    parser.add_argument("--output", help="write JSON results to a file")
+    _arguments = parser.parse_args(arguments)
+
+    _config = load_config(_arguments.config)
+    if not _config:
+        sys.exit(f"Unable to load configuration from {_arguments.config}")
+
+    _results = run_benchmark(
+        config=_config,
+        scale=_arguments.scale,
+        seed=_arguments.seed,
+        repeat=_arguments.repeat,
+        skip_generate=_arguments.skip_generate,
+    )
+    _output = json.dumps(_results, indent=2, default=str)
+    if _arguments.output:
+        Path(_arguments.output).write_text(_output + "\n", encoding="utf-8")
+    else:
+        print(_output)
+
+
+if __name__ == "__main__":
+    main()
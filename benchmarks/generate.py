@@ -0,0 +1,317 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport Benchmarks: Synthetic Data Generator.
+
+Populates a source database with synthetic data shaped like the Wait
+Wait Stats Database. A scale of 1 roughly matches the number of shows,
+guests and mappings in the real database.
+"""
+import datetime
+import random
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from mysql.connector.connection import MySQLConnection
+
+from tables.writer import BatchWriter
+
+BASE_SHOW_COUNT: int = 1700
+BASE_GUEST_COUNT: int = 1400
+BASE_LOCATION_COUNT: int = 350
+BASE_PANELIST_COUNT: int = 130
+HOST_COUNT: int = 30
+SCOREKEEPER_COUNT: int = 15
+
+_FIRST_NAMES: tuple[str, ...] = (
+    "Adam",
+    "Amy",
+    "Béla",
+    "Chloë",
+    "Faith",
+    "François",
+    "Helen",
+    "José",
+    "Luis",
+    "Maeve",
+    "Mo",
+    "Paula",
+    "Peter",
+    "Renée",
+    "Roxanne",
+    "Søren",
+    "Tom",
+    "Zoë",
+)
+_LAST_NAMES: tuple[str, ...] = (
+    "Begley",
+    "Brandt",
+    "Cortés",
+    "Dvořák",
+    "Felber",
+    "Grosz",
+    "Jackson",
+    "Müller",
+    "Núñez",
+    "Poundstone",
+    "Rocca",
+    "Sagal",
+    "Smith",
+    "Ødegaard",
+)
+_WORDS: tuple[str, ...] = (
+    "the",
+    "panel",
+    "listener",
+    "limerick",
+    "bluff",
+    "lightning",
+    "round",
+    "guest",
+    "café",
+    "naïve",
+    "résumé",
+    "piñata",
+    "jalapeño",
+    "crème",
+    "brûlée",
+    "news",
+    "quiz",
+    "week",
+)
+_RANKS: tuple[str, ...] = ("1", "1t", "2", "2t", "3")
+
+
+def _name(generator: random.Random) -> str:
+    """Generate a person's name."""
+    return f"{generator.choice(_FIRST_NAMES)} {generator.choice(_LAST_NAMES)}"
+
+
+def _slug(name: str, identifier: int) -> str:
+    """Generate a slug for a name."""
+    return f"{name.lower().replace(' ', '-')}-{identifier}"
+
+
+def _text(generator: random.Random, minimum_words: int, maximum_words: int) -> str:
+    """Generate a paragraph of text."""
+    word_count = generator.randint(minimum_words, maximum_words)
+    return " ".join(generator.choice(_WORDS) for _ in range(word_count)).capitalize()
+
+
+def _insert(
+    database_connection: MySQLConnection,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterator[tuple[Any, ...]],
+) -> int:
+    """Insert generated rows into a table and return the row count."""
+    with BatchWriter(
+        database_connection=database_connection,
+        table=table,
+        columns=columns,
+        batch_size=1000,
+    ) as writer:
+        writer.extend(rows)
+
+    return writer.rows_written
+
+
+def generate(
+    database_connection: MySQLConnection, scale: float = 1, seed: int = 0
+) -> dict[str, int]:
+    """Populate empty source tables with synthetic data.
+
+    Returns the number of rows generated for each table.
+    """
+    # Reproducible synthetic data, not used for anything security related
+    generator = random.Random(seed)  # noqa: S311
+    show_count = max(int(BASE_SHOW_COUNT * scale), 1)
+    guest_count = max(int(BASE_GUEST_COUNT * scale), 1)
+    location_count = max(int(BASE_LOCATION_COUNT * scale), 1)
+    panelist_count = max(int(BASE_PANELIST_COUNT * scale), 3)
+
+    counts: dict[str, int] = {}
+    first_show_date = datetime.date(1998, 1, 3)
+
+    def shows() -> Iterator[tuple[Any, ...]]:
+        for show_id in range(1, show_count + 1):
+            repeat_show_id = None
+            if show_id > 10 and generator.random() < 0.15:
+                repeat_show_id = generator.randint(1, show_id - 1)
+
+            yield (
+                show_id,
+                first_show_date + datetime.timedelta(weeks=show_id - 1),
+                repeat_show_id,
+                int(generator.random() < 0.05),
+                int(generator.random() < 0.01),
+            )
+
+    def people(count: int, gendered: bool) -> Iterator[tuple[Any, ...]]:
+        for identifier in range(1, count + 1):
+            name = _name(generator)
+            if gendered:
+                yield (
+                    identifier,
+                    name,
+                    generator.choice("FM"),
+                    _slug(name, identifier),
+                )
+            else:
+                yield (identifier, name, _slug(name, identifier))
+
+    counts["ww_shows"] = _insert(
+        database_connection,
+        "ww_shows",
+        ("showid", "showdate", "repeatshowid", "bestof", "bestofuniquebluff"),
+        shows(),
+    )
+    counts["ww_showdescriptions"] = _insert(
+        database_connection,
+        "ww_showdescriptions",
+        ("showid", "showdescription"),
+        ((show_id, _text(generator, 20, 80)) for show_id in range(1, show_count + 1)),
+    )
+    counts["ww_shownotes"] = _insert(
+        database_connection,
+        "ww_shownotes",
+        ("showid", "shownotes"),
+        (
+            (show_id, _text(generator, 40, 200) if generator.random() < 0.8 else None)
+            for show_id in range(1, show_count + 1)
+        ),
+    )
+    counts["ww_guests"] = _insert(
+        database_connection,
+        "ww_guests",
+        ("guestid", "guest", "guestslug"),
+        people(guest_count, gendered=False),
+    )
+    counts["ww_hosts"] = _insert(
+        database_connection,
+        "ww_hosts",
+        ("hostid", "host", "hostgender", "hostslug"),
+        people(HOST_COUNT, gendered=True),
+    )
+    counts["ww_locations"] = _insert(
+        database_connection,
+        "ww_locations",
+        ("locationid", "city", "state", "venue", "locationslug"),
+        (
+            (
+                location_id,
+                generator.choice(("Chicago", "San José", "Montréal", "Boston")),
+                generator.choice(("IL", "CA", "QC", "MA")),
+                f"{generator.choice(_LAST_NAMES)} Théâtre",
+                f"location-{location_id}",
+            )
+            for location_id in range(1, location_count + 1)
+        ),
+    )
+    counts["ww_panelists"] = _insert(
+        database_connection,
+        "ww_panelists",
+        ("panelistid", "panelist", "panelistgender", "panelistslug"),
+        people(panelist_count, gendered=True),
+    )
+    counts["ww_scorekeepers"] = _insert(
+        database_connection,
+        "ww_scorekeepers",
+        ("scorekeeperid", "scorekeeper", "scorekeepergender", "scorekeeperslug"),
+        people(SCOREKEEPER_COUNT, gendered=True),
+    )
+
+    def bluffs() -> Iterator[tuple[Any, ...]]:
+        for show_id in range(1, show_count + 1):
+            if generator.random() < 0.7:
+                yield (
+                    show_id,
+                    generator.choice((1, 1, 1, 2)),
+                    generator.randint(1, panelist_count),
+                    generator.randint(1, panelist_count),
+                )
+
+    def panelists() -> Iterator[tuple[Any, ...]]:
+        for show_id in range(1, show_count + 1):
+            for panelist_id in generator.sample(range(1, panelist_count + 1), 3):
+                start = generator.randint(0, 10)
+                correct = generator.randint(0, 3)
+                yield (
+                    show_id,
+                    panelist_id,
+                    start,
+                    correct,
+                    start + correct * 2,
+                    generator.choice(_RANKS),
+                )
+
+    counts["ww_showbluffmap"] = _insert(
+        database_connection,
+        "ww_showbluffmap",
+        ("showid", "segment", "chosenbluffpnlid", "correctbluffpnlid"),
+        bluffs(),
+    )
+    counts["ww_showguestmap"] = _insert(
+        database_connection,
+        "ww_showguestmap",
+        ("showid", "guestid", "guestscore", "exception"),
+        (
+            (
+                show_id,
+                generator.randint(1, guest_count),
+                generator.randint(0, 3),
+                int(generator.random() < 0.02),
+            )
+            for show_id in range(1, show_count + 1)
+        ),
+    )
+    counts["ww_showhostmap"] = _insert(
+        database_connection,
+        "ww_showhostmap",
+        ("showid", "hostid", "guest"),
+        (
+            (show_id, generator.randint(1, HOST_COUNT), int(generator.random() < 0.1))
+            for show_id in range(1, show_count + 1)
+        ),
+    )
+    counts["ww_showlocationmap"] = _insert(
+        database_connection,
+        "ww_showlocationmap",
+        ("showid", "locationid"),
+        (
+            (show_id, generator.randint(1, location_count))
+            for show_id in range(1, show_count + 1)
+        ),
+    )
+    counts["ww_showpnlmap"] = _insert(
+        database_connection,
+        "ww_showpnlmap",
+        (
+            "showid",
+            "panelistid",
+            "panelistlrndstart",
+            "panelistlrndcorrect",
+            "panelistscore",
+            "showpnlrank",
+        ),
+        panelists(),
+    )
+    counts["ww_showskmap"] = _insert(
+        database_connection,
+        "ww_showskmap",
+        ("showid", "scorekeeperid", "guest", "description"),
+        (
+            (
+                show_id,
+                generator.randint(1, SCOREKEEPER_COUNT),
+                int(generator.random() < 0.1),
+                _text(generator, 3, 10) if generator.random() < 0.1 else None,
+            )
+            for show_id in range(1, show_count + 1)
+        ),
+    )
+
+    database_connection.commit()
+    return counts
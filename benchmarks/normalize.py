@@ -0,0 +1,147 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport Benchmarks: Text Normalization.
+
+Compares the time taken by the text normalizer and by normalizing
+each string using NFKD and dropping non-ASCII characters to normalize
+synthetic show notes, with and without characters outside of Latin-1.
+Both are checked to return the same values by tests/test_normalize.py.
+
+Usage::
+
+    python -m benchmarks.normalize --rows 20000
+"""
+import argparse
+import json
+import platform
+import random
+import time
+import unicodedata
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from tables import normalize
+
+CHUNK_SIZE: int = 1000
+
+# Words found in show notes and descriptions, with only Latin-1
+# characters, and typographic punctuation outside of Latin-1
+_LATIN1_WORDS: tuple[str, ...] = (
+    "panel",
+    "listener",
+    "limerick",
+    "Bluff",
+    "the",
+    "and",
+    "café",
+    "naïve",
+    "résumé",
+    "piñata",
+    "jalapeño",
+    "crème brûlée",
+    "Ødegaard",
+    "São Paulo",
+    "Zürich",
+)
+_TYPOGRAPHIC_WORDS: tuple[str, ...] = ("“quoted”", "it’s", "—", "…", "Dvořák")
+
+
+def reference_fold(value: str | None) -> str | None:
+    """Normalize a string using the NFKD and ASCII encoding chain."""
+    if not value:
+        return None
+
+    return (
+        unicodedata.normalize("NFKD", value)
+        .encode(encoding="ASCII", errors="ignore")
+        .decode(encoding="utf-8")
+    )
+
+
+def _notes(count: int, seed: int, words: tuple[str, ...]) -> list[str | None]:
+    """Generate synthetic show notes."""
+    # Reproducible test data, not used for anything security related
+    generator = random.Random(seed)  # noqa: S311
+    return [
+        (
+            " ".join(generator.choice(words) for _ in range(generator.randint(40, 200)))
+            if generator.random() < 0.8
+            else None
+        )
+        for _ in range(count)
+    ]
+
+
+def _timed(function: Callable[[], Any]) -> float:
+    """Return the wall time of a function call."""
+    start_time = time.perf_counter()
+    function()
+    return time.perf_counter() - start_time
+
+
+def _measure(notes: list[str | None]) -> dict[str, Any]:
+    """Time the reference chain and the normalizer on a list of notes."""
+    rows = len(notes)
+    chunks = [notes[index : index + CHUNK_SIZE] for index in range(0, rows, CHUNK_SIZE)]
+
+    reference_time = _timed(lambda: [reference_fold(note) for note in notes])
+    normalize.reset_statistics()
+    single_time = _timed(lambda: [normalize.ascii_fold(note) for note in notes])
+    normalize.reset_statistics()
+    chunked_time = _timed(
+        lambda: [normalize.ascii_fold_many(chunk) for chunk in chunks]
+    )
+
+    return {
+        "rows": rows,
+        "reference_us_per_row": round(reference_time / rows * 1e6, 2),
+        "ascii_fold_us_per_row": round(single_time / rows * 1e6, 2),
+        "ascii_fold_many_us_per_row": round(chunked_time / rows * 1e6, 2),
+        "speedup": round(reference_time / chunked_time, 2) if chunked_time else None,
+    }
+
+
+def run_benchmark(rows: int, seed: int = 0) -> dict[str, Any]:
+    """Time the reference chain and the normalizer on synthetic notes.
+
+    Notes are generated with only Latin-1 characters, which are folded
+    using the translation table, and with typographic punctuation as
+    well, which is folded using NFKD normalization.
+    """
+    return {
+        "latin1": _measure(_notes(rows, seed, _LATIN1_WORDS)),
+        "typographic": _measure(_notes(rows, seed, _LATIN1_WORDS + _TYPOGRAPHIC_WORDS)),
+    }
+
+
+def main(arguments: list[str] | None = None) -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(
+        description="Wait Wait Stats Database Backport Text Normalization Benchmark"
+    )
+    parser.add_argument(
+        "--rows", type=int, default=20000, help="number of synthetic show notes"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--output", help="write JSON results to a file")
+    _arguments = parser.parse_args(arguments)
+
+    _results: dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "unidata_version": unicodedata.unidata_version,
+        "benchmark": run_benchmark(rows=_arguments.rows, seed=_arguments.seed),
+    }
+    _output = json.dumps(_results, indent=2)
+    if _arguments.output:
+        Path(_arguments.output).write_text(_output + "\n", encoding="utf-8")
+    else:
+        print(_output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport Benchmarks: Transfer Pipeline.
+
+Generates a synthetic source database, transfers each table into a
+destination database and reports wall time, rows per second and peak
+resident memory per table as JSON.
+
+Usage::
+
+    python -m benchmarks.pipeline --config benchmark.json --scale 10
+"""
+import argparse
+import datetime
+import json
+import platform
+import resource
+import sys
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from mysql.connector.connection import MySQLConnection
+
+from backport import TRANSFER_TASKS, load_config
+from benchmarks.generate import generate
+from benchmarks.schema import TABLES, create_tables, truncate_tables
+from tables.connections import ConnectionManager
+from tables.mappings import AllMappings
+from tables.options import TransferOptions
+from tables.transactions import TransactionManager
+
+MAPPING_TABLES: tuple[str, ...] = tuple(
+    table for table in TABLES if table.startswith("ww_show") and table.endswith("map")
+)
+
+# Destination table written by each transfer task
+TASK_TABLES: dict[str, str] = {
+    "shows": "ww_shows",
+    "descriptions": "ww_showdescriptions",
+    "notes": "ww_shownotes",
+    "guests": "ww_guests",
+    "hosts": "ww_hosts",
+    "locations": "ww_locations",
+    "panelists": "ww_panelists",
+    "scorekeepers": "ww_scorekeepers",
+    "bluff_mappings": "ww_showbluffmap",
+    "guest_mappings": "ww_showguestmap",
+    "host_mappings": "ww_showhostmap",
+    "location_mappings": "ww_showlocationmap",
+    "panelist_mappings": "ww_showpnlmap",
+    "scorekeeper_mappings": "ww_showskmap",
+}
+
+
+class MemorySampler:
+    """Wait Wait Stats Database Backport Benchmarks Memory Sampler.
+
+    Samples the resident set size of the current process in a
+    background thread to capture the peak memory use of a block of
+    code. On platforms without /proc, the process-wide maximum resident
+    set size is reported instead.
+
+    :param interval: Number of seconds between samples
+    """
+
+    _STATUS_PATH = Path("/proc/self/status")
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """Class initialization method."""
+        self.interval = interval
+        self.peak_kb: int = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def current_kb(cls) -> int:
+        """Return the current resident set size in kilobytes."""
+        try:
+            with cls._STATUS_PATH.open(encoding="utf-8") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_kb = max(self.peak_kb, self.current_kb())
+
+    def __enter__(self) -> "MemorySampler":
+        self.peak_kb = self.current_kb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+        self.peak_kb = max(self.peak_kb, self.current_kb())
+
+
+def _row_count(database_connection: MySQLConnection, tables: tuple[str, ...]) -> int:
+    """Return the total number of rows in one or more tables."""
+    cursor = database_connection.cursor()
+    total = 0
+    for table in tables:
+        cursor.execute(f"SELECT COUNT(*) FROM {table};")
+        total += cursor.fetchone()[0]
+
+    cursor.close()
+    database_connection.commit()
+    return total
+
+
+def _measurement(
+    name: str, rows: int, wall_time: float, peak_rss_kb: int
+) -> dict[str, Any]:
+    """Build a measurement record."""
+    return {
+        "name": name,
+        "rows": rows,
+        "wall_time": round(wall_time, 6),
+        "rows_per_second": round(rows / wall_time, 2) if wall_time else None,
+        "peak_rss_kb": peak_rss_kb,
+    }
+
+
+def run_benchmark(
+    config: dict[str, Any],
+    scale: float,
+    seed: int = 0,
+    skip_generate: bool = False,
+    create_destination: bool = True,
+) -> dict[str, Any]:
+    """Run the benchmark and return the results."""
+    options = TransferOptions.from_config(config)
+    transaction_manager = TransactionManager(
+        mode=options.transaction_mode, disable_checks=options.disable_checks
+    )
+    results: dict[str, Any] = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "scale": scale,
+        "seed": seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": asdict(options),
+        "source_rows": None,
+        "tables": [],
+    }
+
+    with ConnectionManager(
+        source_connect_dict=config["source_database"],
+        destination_connect_dict=config["destination_database"],
+        pool_size=1,
+        driver=options.driver,
+    ) as connection_manager:
+        with connection_manager.connections() as (
+            source_connection,
+            destination_connection,
+        ):
+            if not skip_generate:
+                create_tables(source_connection, source=True)
+                start_time = time.perf_counter()
+                results["source_rows"] = generate(
+                    source_connection, scale=scale, seed=seed
+                )
+                results["generate_time"] = round(time.perf_counter() - start_time, 6)
+
+            if create_destination:
+                create_tables(destination_connection, source=False)
+            else:
+                truncate_tables(destination_connection)
+
+        # Transfer each table individually, in dependency order
+        total_start_time = time.perf_counter()
+        for task in TRANSFER_TASKS:
+            with connection_manager.connections() as (
+                source_connection,
+                destination_connection,
+            ):
+                table = task.table_class(
+                    source_database_connection=source_connection,
+                    destination_database_connection=destination_connection,
+                    options=options,
+                )
+                with MemorySampler() as memory:
+                    start_time = time.perf_counter()
+                    with transaction_manager.table(destination_connection):
+                        table.transfer()
+                    wall_time = time.perf_counter() - start_time
+
+                rows = _row_count(destination_connection, (TASK_TABLES[task.name],))
+                results["tables"].append(
+                    _measurement(task.name, rows, wall_time, memory.peak_kb)
+                )
+
+        total_wall_time = time.perf_counter() - total_start_time
+        with connection_manager.connections() as (
+            source_connection,
+            destination_connection,
+        ):
+            total_rows = _row_count(destination_connection, TABLES)
+            results["total"] = _measurement(
+                "total",
+                total_rows,
+                total_wall_time,
+                max(table["peak_rss_kb"] for table in results["tables"]),
+            )
+
+            # Re-run all mapping tables together through AllMappings
+            cursor = destination_connection.cursor()
+            cursor.execute("SET foreign_key_checks = 0;")
+            for table in MAPPING_TABLES:
+                cursor.execute(f"TRUNCATE TABLE {table};")
+
+            cursor.execute("SET foreign_key_checks = 1;")
+            cursor.close()
+
+            all_mappings = AllMappings(
+                source_database_connection=source_connection,
+                destination_database_connection=destination_connection,
+                options=options,
+            )
+            with MemorySampler() as memory:
+                start_time = time.perf_counter()
+                with transaction_manager.table(destination_connection):
+                    all_mappings.transfer_all()
+                wall_time = time.perf_counter() - start_time
+
+            results["all_mappings"] = _measurement(
+                "all_mappings",
+                _row_count(destination_connection, MAPPING_TABLES),
+                wall_time,
+                memory.peak_kb,
+            )
+
+    return results
+
+
+def main(arguments: list[str] | None = None) -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(
+        description="Wait Wait Stats Database Backport Pipeline Benchmark"
+    )
+    parser.add_argument(
+        "--config",
+        default="config.json",
+        help="configuration file pointing at scratch source and destination "
+        "databases; all fixture tables in both databases are replaced",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1,
+        help="size of the generated data relative to the real database "
+        "(for example 1, 10 or 100)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--skip-generate",
+        action="store_true",
+        help="reuse previously generated source data",
+    )
+    parser.add_argument(
+        "--keep-destination-schema",
+        action="store_true",
+        help="truncate existing destination tables instead of re-creating them",
+    )
+    parser.add_argument("--output", help="write JSON results to a file")
+    _arguments = parser.parse_args(arguments)
+
+    _config = load_config(_arguments.config)
+    if not _config:
+        sys.exit(f"Unable to load configuration from {_arguments.config}")
+
+    _results = run_benchmark(
+        config=_config,
+        scale=_arguments.scale,
+        seed=_arguments.seed,
+        skip_generate=_arguments.skip_generate,
+        create_destination=not _arguments.keep_destination_schema,
+    )
+    _output = json.dumps(_results, indent=2, default=str)
+    if _arguments.output:
+        Path(_arguments.output).write_text(_output + "\n", encoding="utf-8")
+    else:
+        print(_output)
+
+
+if __name__ == "__main__":
+    main()
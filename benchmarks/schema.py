@@ -0,0 +1,225 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport Benchmarks: Fixture Schema.
+
+Minimal table definitions covering the columns read from a version 4
+source database and written to a version 3 destination database. The
+destination tables include the foreign keys and secondary indexes that
+affect write performance.
+"""
+from mysql.connector.connection import MySQLConnection
+
+# Tables in dependency order; tables must be dropped in reverse order
+TABLES: tuple[str, ...] = (
+    "ww_shows",
+    "ww_showdescriptions",
+    "ww_shownotes",
+    "ww_guests",
+    "ww_hosts",
+    "ww_locations",
+    "ww_panelists",
+    "ww_scorekeepers",
+    "ww_showbluffmap",
+    "ww_showguestmap",
+    "ww_showhostmap",
+    "ww_showlocationmap",
+    "ww_showpnlmap",
+    "ww_showskmap",
+)
+
+_TABLE_DEFINITIONS: dict[str, str] = {
+    "ww_shows": """
+        showid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        showdate DATE NOT NULL,
+        repeatshowid INT UNSIGNED NULL,
+        bestof TINYINT(1) NOT NULL DEFAULT 0,
+        bestofuniquebluff TINYINT(1) NOT NULL DEFAULT 0,
+        PRIMARY KEY (showid),
+        UNIQUE KEY showdate (showdate),
+        KEY repeatshowid (repeatshowid),
+        CONSTRAINT fk_ww_shows_repeatshowid FOREIGN KEY (repeatshowid)
+            REFERENCES ww_shows (showid)
+    """,
+    "ww_showdescriptions": """
+        showid INT UNSIGNED NOT NULL,
+        showdescription TEXT NULL,
+        PRIMARY KEY (showid),
+        CONSTRAINT fk_ww_showdescriptions_showid FOREIGN KEY (showid)
+            REFERENCES ww_shows (showid)
+    """,
+    "ww_shownotes": """
+        showid INT UNSIGNED NOT NULL,
+        shownotes TEXT NULL,
+        PRIMARY KEY (showid),
+        CONSTRAINT fk_ww_shownotes_showid FOREIGN KEY (showid)
+            REFERENCES ww_shows (showid)
+    """,
+    "ww_guests": """
+        guestid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        guest VARCHAR(255) NOT NULL,
+        guestslug VARCHAR(255) NULL,
+        PRIMARY KEY (guestid),
+        KEY guestslug (guestslug)
+    """,
+    "ww_hosts": """
+        hostid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        host VARCHAR(255) NOT NULL,
+        hostgender CHAR(1) NOT NULL,
+        hostslug VARCHAR(255) NULL,
+        PRIMARY KEY (hostid),
+        KEY hostslug (hostslug)
+    """,
+    "ww_locations": """
+        locationid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        city VARCHAR(255) NULL,
+        state VARCHAR(50) NULL,
+        venue VARCHAR(255) NULL,
+        locationslug VARCHAR(255) NULL,
+        PRIMARY KEY (locationid),
+        KEY locationslug (locationslug)
+    """,
+    "ww_panelists": """
+        panelistid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        panelist VARCHAR(255) NOT NULL,
+        panelistgender CHAR(1) NOT NULL,
+        panelistslug VARCHAR(255) NULL,
+        PRIMARY KEY (panelistid),
+        KEY panelistslug (panelistslug)
+    """,
+    "ww_scorekeepers": """
+        scorekeeperid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        scorekeeper VARCHAR(255) NOT NULL,
+        scorekeepergender CHAR(1) NOT NULL,
+        scorekeeperslug VARCHAR(255) NULL,
+        PRIMARY KEY (scorekeeperid),
+        KEY scorekeeperslug (scorekeeperslug)
+    """,
+    "ww_showbluffmap": """
+        showbluffmapid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        showid INT UNSIGNED NOT NULL,
+        {segment}
+        chosenbluffpnlid INT UNSIGNED NULL,
+        correctbluffpnlid INT UNSIGNED NULL,
+        PRIMARY KEY (showbluffmapid),
+        KEY showid (showid),
+        KEY chosenbluffpnlid (chosenbluffpnlid),
+        KEY correctbluffpnlid (correctbluffpnlid),
+        CONSTRAINT fk_ww_showbluffmap_showid FOREIGN KEY (showid)
+            REFERENCES ww_shows (showid),
+        CONSTRAINT fk_ww_showbluffmap_chosenbluffpnlid
+            FOREIGN KEY (chosenbluffpnlid) REFERENCES ww_panelists (panelistid),
+        CONSTRAINT fk_ww_showbluffmap_correctbluffpnlid
+            FOREIGN KEY (correctbluffpnlid) REFERENCES ww_panelists (panelistid)
+    """,
+    "ww_showguestmap": """
+        showguestmapid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        showid INT UNSIGNED NOT NULL,
+        guestid INT UNSIGNED NOT NULL,
+        guestscore INT NULL,
+        exception TINYINT(1) NOT NULL DEFAULT 0,
+        PRIMARY KEY (showguestmapid),
+        KEY showid (showid),
+        KEY guestid (guestid),
+        CONSTRAINT fk_ww_showguestmap_showid FOREIGN KEY (showid)
+            REFERENCES ww_shows (showid),
+        CONSTRAINT fk_ww_showguestmap_guestid FOREIGN KEY (guestid)
+            REFERENCES ww_guests (guestid)
+    """,
+    "ww_showhostmap": """
+        showhostmapid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        showid INT UNSIGNED NOT NULL,
+        hostid INT UNSIGNED NOT NULL,
+        guest TINYINT(1) NOT NULL DEFAULT 0,
+        PRIMARY KEY (showhostmapid),
+        KEY showid (showid),
+        KEY hostid (hostid),
+        CONSTRAINT fk_ww_showhostmap_showid FOREIGN KEY (showid)
+            REFERENCES ww_shows (showid),
+        CONSTRAINT fk_ww_showhostmap_hostid FOREIGN KEY (hostid)
+            REFERENCES ww_hosts (hostid)
+    """,
+    "ww_showlocationmap": """
+        showlocationmapid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        showid INT UNSIGNED NOT NULL,
+        locationid INT UNSIGNED NOT NULL,
+        PRIMARY KEY (showlocationmapid),
+        KEY showid (showid),
+        KEY locationid (locationid),
+        CONSTRAINT fk_ww_showlocationmap_showid FOREIGN KEY (showid)
+            REFERENCES ww_shows (showid),
+        CONSTRAINT fk_ww_showlocationmap_locationid FOREIGN KEY (locationid)
+            REFERENCES ww_locations (locationid)
+    """,
+    "ww_showpnlmap": """
+        showpnlmapid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        showid INT UNSIGNED NOT NULL,
+        panelistid INT UNSIGNED NOT NULL,
+        panelistlrndstart INT NULL,
+        panelistlrndcorrect INT NULL,
+        panelistscore INT NULL,
+        showpnlrank CHAR(2) NULL,
+        PRIMARY KEY (showpnlmapid),
+        KEY showid (showid),
+        KEY panelistid (panelistid),
+        CONSTRAINT fk_ww_showpnlmap_showid FOREIGN KEY (showid)
+            REFERENCES ww_shows (showid),
+        CONSTRAINT fk_ww_showpnlmap_panelistid FOREIGN KEY (panelistid)
+            REFERENCES ww_panelists (panelistid)
+    """,
+    "ww_showskmap": """
+        showskmapid INT UNSIGNED NOT NULL AUTO_INCREMENT,
+        showid INT UNSIGNED NOT NULL,
+        scorekeeperid INT UNSIGNED NOT NULL,
+        guest TINYINT(1) NOT NULL DEFAULT 0,
+        description TEXT NULL,
+        PRIMARY KEY (showskmapid),
+        KEY showid (showid),
+        KEY scorekeeperid (scorekeeperid),
+        CONSTRAINT fk_ww_showskmap_showid FOREIGN KEY (showid)
+            REFERENCES ww_shows (showid),
+        CONSTRAINT fk_ww_showskmap_scorekeeperid FOREIGN KEY (scorekeeperid)
+            REFERENCES ww_scorekeepers (scorekeeperid)
+    """,
+}
+
+
+def create_tables(database_connection: MySQLConnection, source: bool) -> None:
+    """Drop and re-create all fixture tables.
+
+    Source tables use the utf8mb4 character set and include the bluff
+    segment column found in version 4, while destination tables use the
+    utf8 character set used by version 3.
+    """
+    charset = "utf8mb4" if source else "utf8"
+    segment = "segment TINYINT UNSIGNED NOT NULL DEFAULT 1," if source else ""
+
+    cursor = database_connection.cursor()
+    cursor.execute("SET foreign_key_checks = 0;")
+    for table in reversed(TABLES):
+        cursor.execute(f"DROP TABLE IF EXISTS {table};")
+
+    for table in TABLES:
+        definition = _TABLE_DEFINITIONS[table].format(segment=segment)
+        cursor.execute(
+            f"CREATE TABLE {table} ({definition}) "
+            f"ENGINE=InnoDB DEFAULT CHARSET={charset};"
+        )
+
+    cursor.execute("SET foreign_key_checks = 1;")
+    cursor.close()
+    database_connection.commit()
+
+
+def truncate_tables(database_connection: MySQLConnection) -> None:
+    """Remove all rows from the fixture tables."""
+    cursor = database_connection.cursor()
+    cursor.execute("SET foreign_key_checks = 0;")
+    for table in reversed(TABLES):
+        cursor.execute(f"TRUNCATE TABLE {table};")
+
+    cursor.execute("SET foreign_key_checks = 1;")
+    cursor.close()
+    database_connection.commit()
@@ -0,0 +1,234 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport Benchmarks: Insert Statements.
+
+Generates a synthetic source database, reads the rows of each mapping
+table into memory and writes them into the destination database using
+single-row and multi-row INSERT statements, each sent either as text
+or as a server-side prepared statement with binary parameters. Reports
+the best write time, rows per second, statements issued and bytes
+received by the destination database for each table and path as JSON.
+
+Foreign key checks are turned off on the destination connection, so
+that mapping tables can be written without loading the tables they
+reference.
+
+Usage::
+
+    python -m benchmarks.statements --config benchmark.json --scale 10
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from mysql.connector.connection import MySQLConnection
+
+from backport import TRANSFER_TASKS, load_config
+from benchmarks.generate import generate
+from benchmarks.schema import create_tables
+from tables.connections import ConnectionManager
+from tables.options import TransferOptions
+from tables.writer import BatchWriter
+
+# Batch size, or None for the configured batch size, and whether to use
+# a prepared statement for each path
+STATEMENT_PATHS: dict[str, tuple[int | None, bool]] = {
+    "text_row": (1, False),
+    "prepared_row": (1, True),
+    "text_batch": (None, False),
+    "prepared_batch": (None, True),
+}
+
+
+def _bytes_received(database_connection: MySQLConnection) -> int:
+    """Return the number of bytes received by the server in this session."""
+    cursor = database_connection.cursor()
+    cursor.execute("SHOW SESSION STATUS LIKE 'Bytes_received';")
+    result = cursor.fetchone()
+    cursor.close()
+    return int(result[1])
+
+
+def _measure(
+    database_connection: MySQLConnection,
+    table: str,
+    columns: tuple[str, ...],
+    rows: list[tuple[Any, ...]],
+    batch_size: int,
+    prepared: bool,
+) -> dict[str, Any]:
+    """Write rows into an empty table and return the measurements."""
+    cursor = database_connection.cursor()
+    cursor.execute(f"TRUNCATE TABLE {table};")
+    cursor.close()
+    database_connection.commit()
+
+    bytes_received = _bytes_received(database_connection)
+    start_time = time.perf_counter()
+    with BatchWriter(
+        database_connection=database_connection,
+        table=table,
+        columns=columns,
+        batch_size=batch_size,
+        prepared=prepared,
+    ) as writer:
+        writer.extend(rows)
+
+    database_connection.commit()
+    wall_time = time.perf_counter() - start_time
+
+    # The status query itself is included in both counters, so cancels out
+    return {
+        "wall_time": wall_time,
+        "statements": writer.statements,
+        "prepared": writer.uses_prepared_statements,
+        "bytes_received": _bytes_received(database_connection) - bytes_received,
+    }
+
+
+def run_benchmark(
+    config: dict[str, Any],
+    scale: float,
+    seed: int = 0,
+    repeat: int = 3,
+    skip_generate: bool = False,
+) -> dict[str, Any]:
+    """Run the benchmark and return the results."""
+    options = TransferOptions.from_config(config)
+    results: dict[str, Any] = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "scale": scale,
+        "seed": seed,
+        "repeat": repeat,
+        "batch_size": options.batch_size,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "source_rows": None,
+        "tables": [],
+    }
+
+    with (
+        ConnectionManager(
+            source_connect_dict=config["source_database"],
+            destination_connect_dict=config["destination_database"],
+            pool_size=1,
+            driver=options.driver,
+        ) as connection_manager,
+        connection_manager.connections() as (
+            source_connection,
+            destination_connection,
+        ),
+    ):
+        if not skip_generate:
+            create_tables(source_connection, source=True)
+            results["source_rows"] = generate(source_connection, scale=scale, seed=seed)
+
+        create_tables(destination_connection, source=False)
+        cursor = destination_connection.cursor()
+        cursor.execute("SET SESSION foreign_key_checks = 0;")
+        cursor.close()
+
+        for task in TRANSFER_TASKS:
+            if not task.name.endswith("_mappings"):
+                continue
+
+            spec = task.table_class.spec
+            table = task.table_class(
+                source_database_connection=source_connection,
+                destination_database_connection=destination_connection,
+                options=options,
+            )
+            rows = list(table.read())
+            source_connection.commit()
+
+            for path, (batch_size, prepared) in STATEMENT_PATHS.items():
+                runs = [
+                    _measure(
+                        database_connection=destination_connection,
+                        table=spec.destination_table,
+                        columns=spec.columns,
+                        rows=rows,
+                        batch_size=batch_size or options.batch_size,
+                        prepared=prepared,
+                    )
+                    for _ in range(repeat)
+                ]
+                best = min(runs, key=lambda run: run["wall_time"])
+                results["tables"].append(
+                    {
+                        "name": task.name,
+                        "path": path,
+                        "rows": len(rows),
+                        "wall_time": round(best["wall_time"], 6),
+                        "rows_per_second": (
+                            round(len(rows) / best["wall_time"], 2)
+                            if best["wall_time"]
+                            else None
+                        ),
+                        "statements": best["statements"],
+                        "prepared": best["prepared"],
+                        "bytes_received": best["bytes_received"],
+                    }
+                )
+
+    return results
+
+
+def main(arguments: list[str] | None = None) -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(
+        description="Wait Wait Stats Database Backport Insert Statement Benchmark"
+    )
+    parser.add_argument(
+        "--config",
+        default="config.json",
+        help="configuration file pointing at scratch source and destination "
+        "databases; all fixture tables in both databases are replaced",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1,
+        help="size of the generated data relative to the real database "
+        "(for example 1, 10 or 100)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="number of timed runs per path"
+    )
+    parser.add_argument(
+        "--skip-generate",
+        action="store_true",
+        help="reuse previously generated source data",
+    )
+    parser.add_argument("--output", help="write JSON results to a file")
+    _arguments = parser.parse_args(arguments)
+
+    _config = load_config(_arguments.config)
+    if not _config:
+        sys.exit(f"Unable to load configuration from {_arguments.config}")
+
+    _results = run_benchmark(
+        config=_config,
+        scale=_arguments.scale,
+        seed=_arguments.seed,
+        repeat=_arguments.repeat,
+        skip_generate=_arguments.skip_generate,
+    )
+    _output = json.dumps(_results, indent=2, default=str)
+    if _arguments.output:
+        Path(_arguments.output).write_text(_output + "\n", encoding="utf-8")
+    else:
+        print(_output)
+
+
+if __name__ == "__main__":
+    main()
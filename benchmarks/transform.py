@@ -0,0 +1,175 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport Benchmarks: Row Transforms.
+
+Measures the per-row CPU cost of converting source rows into
+destination values for the mapping tables, without a database. The
+dictionary path builds a dictionary for every row, as a dictionary
+cursor does, and converts it by looking up columns by name. The tuple
+path converts the tuple returned by a tuple cursor using the row
+transformer compiled from the table specification.
+
+Usage::
+
+    python -m benchmarks.transform --rows 100000
+"""
+import argparse
+import json
+import platform
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+from tables.normalize import ascii_fold
+from tables.spec import TABLE_SPECS, TableSpec
+from tables.transform import compile_transform
+
+MAPPING_SPECS: tuple[TableSpec, ...] = tuple(
+    spec for spec in TABLE_SPECS if spec.name.endswith("_mappings")
+)
+
+_TEXT_VALUES: tuple[str | None, ...] = ("1", "1t", "2", "Crème brûlée", None)
+
+
+# Row conversions used by the mapping table classes with dictionary
+# cursors, before rows were read as tuples
+_DICTIONARY_TRANSFORMS: dict[str, Callable[[dict[str, Any]], tuple[Any, ...]]] = {
+    "bluff_mappings": lambda bluff: (
+        bluff["showbluffmapid"],
+        bluff["showid"],
+        bluff["chosenbluffpnlid"],
+        bluff["correctbluffpnlid"],
+    ),
+    "guest_mappings": lambda guest: (
+        guest["showguestmapid"],
+        guest["showid"],
+        guest["guestid"],
+        guest["guestscore"],
+        guest["exception"],
+    ),
+    "host_mappings": lambda host: (
+        host["showhostmapid"],
+        host["showid"],
+        host["hostid"],
+        host["guest"],
+    ),
+    "location_mappings": lambda location: (
+        location["showlocationmapid"],
+        location["showid"],
+        location["locationid"],
+    ),
+    "panelist_mappings": lambda panelist: (
+        panelist["showpnlmapid"],
+        panelist["showid"],
+        panelist["panelistid"],
+        panelist["panelistlrndstart"],
+        panelist["panelistlrndcorrect"],
+        panelist["panelistscore"],
+        ascii_fold(panelist["showpnlrank"]),
+    ),
+    "scorekeeper_mappings": lambda scorekeeper: (
+        scorekeeper["showskmapid"],
+        scorekeeper["showid"],
+        scorekeeper["scorekeeperid"],
+        scorekeeper["guest"],
+        ascii_fold(scorekeeper["description"]),
+    ),
+}
+
+
+def _rows(spec: TableSpec, count: int) -> list[tuple[Any, ...]]:
+    """Generate source rows for a table."""
+    return [
+        tuple(
+            (
+                _TEXT_VALUES[(index + position) % len(_TEXT_VALUES)]
+                if column in spec.folded_columns
+                else index * 7 + position
+            )
+            for position, column in enumerate(spec.columns)
+        )
+        for index in range(count)
+    ]
+
+
+def _best_time(function: Callable[[], None], repeat: int) -> float:
+    """Return the lowest wall time of several runs of a function."""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+
+    return min(times)
+
+
+def _measure(spec: TableSpec, rows: Sequence[tuple[Any, ...]], repeat: int) -> dict:
+    """Measure both row conversion paths for a table."""
+    column_names = spec.columns
+    dictionary_transform = _DICTIONARY_TRANSFORMS[spec.name]
+    tuple_transform = compile_transform(spec)
+
+    def dictionary_path() -> None:
+        for row in rows:
+            dictionary_transform(dict(zip(column_names, row, strict=True)))
+
+    def tuple_path() -> None:
+        for row in rows:
+            tuple_transform(row)
+
+    # Both paths must produce the same destination values
+    for row in rows[:1000]:
+        if dictionary_transform(dict(zip(column_names, row, strict=True))) != (
+            tuple_transform(row)
+        ):
+            raise AssertionError(f"Row transforms differ for table {spec.name}")
+
+    dictionary_time = _best_time(dictionary_path, repeat)
+    tuple_time = _best_time(tuple_path, repeat)
+    return {
+        "name": spec.name,
+        "rows": len(rows),
+        "dictionary_ns_per_row": round(dictionary_time / len(rows) * 1e9, 1),
+        "tuple_ns_per_row": round(tuple_time / len(rows) * 1e9, 1),
+        "speedup": round(dictionary_time / tuple_time, 2) if tuple_time else None,
+    }
+
+
+def run_benchmark(rows: int, repeat: int = 5) -> dict[str, Any]:
+    """Run the benchmark and return the results."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "tables": [_measure(spec, _rows(spec, rows), repeat) for spec in MAPPING_SPECS],
+    }
+
+
+def main(arguments: list[str] | None = None) -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(
+        description="Wait Wait Stats Database Backport Row Transform Benchmark"
+    )
+    parser.add_argument(
+        "--rows", type=int, default=100000, help="number of rows per table"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of timed runs per path"
+    )
+    parser.add_argument("--output", help="write JSON results to a file")
+    _arguments = parser.parse_args(arguments)
+
+    _results = run_benchmark(rows=_arguments.rows, repeat=_arguments.repeat)
+    _output = json.dumps(_results, indent=2)
+    if _arguments.output:
+        Path(_arguments.output).write_text(_output + "\n", encoding="utf-8")
+    else:
+        print(_output)
+
+
+if __name__ == "__main__":
+    main()
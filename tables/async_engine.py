@@ -0,0 +1,283 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Asynchronous Transfer Engine."""
+import asyncio
+import contextvars
+import threading
+from collections.abc import Generator, Iterator, Sequence
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from typing import Any
+
+from tables.checkpoint import Checkpoint
+from tables.connections import ConnectionManager
+from tables.fanout import DEFAULT_QUEUE_SIZE
+from tables.metrics import RunReport
+from tables.options import TransferOptions
+from tables.scheduler import (
+    TransferTask,
+    delete_synced_rows,
+    transfer_task,
+    validate_tasks,
+)
+from tables.sync import SyncDeletes
+from tables.transactions import TransactionManager
+
+_DONE = object()
+
+
+class _SkippedError(Exception):
+    """Raised for tasks that are not started after another task failed."""
+
+
+def _next_chunk(rows: Iterator[Any], chunk_size: int) -> list[Any]:
+    """Read up to chunk_size rows from an iterator."""
+    return list(islice(rows, chunk_size))
+
+
+async def _drain(queue: asyncio.Queue) -> None:
+    """Remove every item from a queue."""
+    while not queue.empty():
+        queue.get_nowait()
+
+
+class _Pipeline:
+    """Wait Wait Stats Database Backport Asynchronous Table Pipeline.
+
+    Connects the read side and the write side of a table transfer with
+    a bounded asyncio queue. Rows are read and transformed in chunks on
+    one worker thread while the previous chunks are written to the
+    destination database on another, and reading pauses whenever the
+    queue is full.
+
+    :param loop: Event loop running the engine
+    :param chunk_size: Number of rows passed through the queue at a time
+    :param queue_size: Maximum number of chunks waiting to be written
+    """
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, chunk_size: int, queue_size: int
+    ) -> None:
+        """Class initialization method."""
+        self.loop = loop
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+
+    async def _produce(
+        self,
+        rows: Iterator[Any],
+        queue: asyncio.Queue,
+        context: contextvars.Context,
+        stop: threading.Event,
+    ) -> None:
+        """Read chunks of rows on a worker thread and queue them.
+
+        Stops reading once stop is set. Nothing is queued after stop is
+        set, so the producer cannot wait on a full queue once the queue
+        has been emptied.
+        """
+        try:
+            while not stop.is_set():
+                chunk = await self.loop.run_in_executor(
+                    None, context.copy().run, _next_chunk, rows, self.chunk_size
+                )
+                if not chunk or stop.is_set():
+                    break
+
+                await queue.put(chunk)
+        except BaseException as error:
+            if not stop.is_set():
+                await queue.put(error)
+            raise
+        else:
+            if not stop.is_set():
+                await queue.put(_DONE)
+
+    def _read_ahead(self, rows: Iterator[Any]) -> Iterator[Any]:
+        """Yield rows that are read ahead on a worker thread.
+
+        Called from the worker thread running the write side of the
+        transfer. When the rows stop being consumed, reading is stopped,
+        the chunk being read, if any, is waited for and the rows
+        iterator is closed before returning, so the source connection is
+        no longer in use.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        producer = asyncio.run_coroutine_threadsafe(
+            self._produce(rows, queue, contextvars.copy_context(), stop), self.loop
+        )
+        try:
+            while True:
+                item = asyncio.run_coroutine_threadsafe(queue.get(), self.loop).result()
+                if item is _DONE:
+                    return
+
+                if isinstance(item, BaseException):
+                    raise item
+
+                yield from item
+        finally:
+            stop.set()
+            asyncio.run_coroutine_threadsafe(_drain(queue), self.loop).result()
+            futures.wait([producer])
+            if isinstance(rows, Generator):
+                rows.close()
+
+    @contextmanager
+    def read_ahead(self, table: Any) -> Iterator[None]:
+        """Read the rows of a table ahead while earlier rows are written.
+
+        Replaces the table's read method within the block, and stops
+        any reads started within the block that have not completed when
+        the block exits, including when the transfer fails.
+        """
+        read = table.read
+        readers: list[Generator] = []
+
+        def pipelined_read(*args: Any, **kwargs: Any) -> Iterator[Any]:
+            reader = self._read_ahead(iter(read(*args, **kwargs)))
+            readers.append(reader)
+            return reader
+
+        table.read = pipelined_read
+        try:
+            yield
+        finally:
+            table.read = read
+            for reader in readers:
+                reader.close()
+
+
+async def _run_tasks(
+    tasks: Sequence[TransferTask],
+    connection_manager: ConnectionManager,
+    options: TransferOptions,
+    jobs: int,
+    transaction_manager: TransactionManager,
+    report: RunReport | None,
+    checkpoint: Checkpoint | None,
+    deletes: SyncDeletes | None,
+) -> None:
+    """Run transfer tasks as coroutines on the current event loop."""
+    loop = asyncio.get_running_loop()
+
+    # Each running table uses one thread to write rows and, while
+    # reading ahead, one thread to read rows
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=jobs * 2, thread_name_prefix="backport")
+    )
+
+    pipeline = _Pipeline(
+        loop=loop, chunk_size=options.fetch_size, queue_size=DEFAULT_QUEUE_SIZE
+    )
+    slots = asyncio.Semaphore(jobs)
+    failures: list[BaseException] = []
+    running: dict[str, asyncio.Task] = {}
+
+    async def run(task: TransferTask) -> None:
+        await asyncio.gather(*(running[name] for name in task.dependencies))
+        async with slots:
+            if failures:
+                raise _SkippedError(task.name)
+
+            try:
+                await loop.run_in_executor(
+                    None,
+                    contextvars.copy_context().run,
+                    partial(
+                        transfer_task,
+                        task,
+                        connection_manager.source_pool,
+                        connection_manager.destination_pool,
+                        options,
+                        transaction_manager,
+                        report,
+                        checkpoint=checkpoint,
+                        deletes=deletes,
+                        read_ahead=pipeline.read_ahead,
+                    ),
+                )
+            except BaseException as error:
+                failures.append(error)
+                raise
+
+    for task in tasks:
+        running[task.name] = loop.create_task(run(task), name=task.name)
+
+    await asyncio.gather(*running.values(), return_exceptions=True)
+    if failures:
+        raise failures[0]
+
+    if deletes is not None:
+        await loop.run_in_executor(
+            None,
+            contextvars.copy_context().run,
+            delete_synced_rows,
+            tasks,
+            connection_manager.destination_pool,
+            options,
+            transaction_manager,
+            deletes,
+            None,
+            checkpoint,
+        )
+
+
+def run_tasks_async(
+    tasks: Sequence[TransferTask],
+    connection_manager: ConnectionManager,
+    options: TransferOptions,
+    jobs: int = 1,
+    transaction_manager: TransactionManager | None = None,
+    report: RunReport | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> None:
+    """Run transfer tasks on an asyncio event loop.
+
+    Tables are started as soon as their dependencies have completed,
+    with at most jobs tables running at once, in the same way as
+    run_tasks. In addition, each table transfer is pipelined: source
+    rows are read and transformed ahead on one worker thread while
+    earlier rows are written to the destination database on another,
+    with a bounded queue providing backpressure between the two. This
+    keeps both the source and destination connections busy instead of
+    alternating between them.
+
+    The database drivers are blocking, so reads and writes still run on
+    worker threads; the event loop only schedules tables and moves
+    chunks of rows between them. Each table is transferred by the same
+    transfer_task function used by run_tasks.
+
+    If a task fails, no further tasks are started and the first
+    exception is raised once all running tasks have finished. If a
+    checkpoint is provided, it is used in the same way as by run_tasks.
+    When syncing, rows that no longer exist in the source database are
+    deleted once every table has been synced, as by run_tasks.
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be a positive integer")
+
+    validate_tasks(tasks)
+    transaction_manager = transaction_manager or TransactionManager(
+        mode=options.transaction_mode, disable_checks=options.disable_checks
+    )
+
+    asyncio.run(
+        _run_tasks(
+            tasks=tasks,
+            connection_manager=connection_manager,
+            options=options,
+            jobs=jobs,
+            transaction_manager=transaction_manager,
+            report=report,
+            checkpoint=checkpoint,
+            deletes=SyncDeletes() if options.sync else None,
+        )
+    )
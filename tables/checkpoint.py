@@ -0,0 +1,217 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Resumable Run Checkpoints.
+
+A checkpoint is a JSON file recording the progress of each table
+during a run: whether the table has been completed and, for tables
+written with intermediate commits, the primary key value of the last
+committed row and the number of commits so far. A resumed run skips
+completed tables and continues partially transferred tables after the
+highest primary key value in the destination table. Rows are read and
+written in primary key order, so every row up to that value is known
+to be in the destination database, including rows committed just
+before the run stopped that were not yet recorded in the checkpoint.
+"""
+import datetime
+import json
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+CHECKPOINT_FORMAT: str = "wwdtm_database_backport checkpoint"
+CHECKPOINT_VERSION: int = 1
+
+_current: ContextVar["TableProgress | None"] = ContextVar(
+    "table_progress", default=None
+)
+
+
+class CheckpointError(Exception):
+    """Raised when a checkpoint is missing or incompatible."""
+
+
+def _now() -> str:
+    """Return the current time as an ISO 8601 string."""
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def checkpoint_key(name: str, destination: str | None = None) -> str:
+    """Return the checkpoint entry name of a table and destination."""
+    return f"{destination}/{name}" if destination else name
+
+
+class Checkpoint:
+    """Wait Wait Stats Database Backport Run Checkpoint.
+
+    Records the progress of each table in a checkpoint file, which is
+    rewritten every time progress is recorded. The file is written to a
+    temporary file first and then moved into place, so an interrupted
+    run never leaves a partially written checkpoint behind. Progress
+    may be recorded concurrently from multiple threads.
+
+    :param path: Path of the checkpoint file
+    :param resume: Continue from the progress recorded in an existing
+        checkpoint file instead of starting a new checkpoint
+    """
+
+    def __init__(self, path: str | Path, resume: bool = False) -> None:
+        """Class initialization method."""
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        if resume:
+            if not self.path.is_file():
+                raise CheckpointError(
+                    f"No checkpoint found at {self.path}, nothing to resume"
+                )
+
+            checkpoint = json.loads(self.path.read_text(encoding="utf-8"))
+            if checkpoint.get("format") != CHECKPOINT_FORMAT:
+                raise CheckpointError(f"{self.path} is not a checkpoint file")
+
+            if checkpoint.get("version") != CHECKPOINT_VERSION:
+                raise CheckpointError(
+                    f"Unsupported checkpoint version {checkpoint.get('version')}, "
+                    f"expected {CHECKPOINT_VERSION}"
+                )
+
+            self.started: str = checkpoint["started"]
+            self.tables: dict[str, dict[str, Any]] = checkpoint["tables"]
+        else:
+            self.started = _now()
+            self.tables = {}
+
+        self._save()
+
+    def _save(self) -> None:
+        """Write the checkpoint file."""
+        checkpoint = {
+            "format": CHECKPOINT_FORMAT,
+            "version": CHECKPOINT_VERSION,
+            "started": self.started,
+            "updated": _now(),
+            "tables": self.tables,
+        }
+        temporary_path = self.path.with_name(self.path.name + ".tmp")
+        temporary_path.write_text(
+            json.dumps(checkpoint, indent=2) + "\n", encoding="utf-8"
+        )
+        temporary_path.replace(self.path)
+
+    def completed(self, key: str) -> bool:
+        """Whether a table was completed by this or a previous run."""
+        with self._lock:
+            return self.tables.get(key, {}).get("status") == "completed"
+
+    def record_commit(self, key: str, last_id: int) -> None:
+        """Record an intermediate commit of a table."""
+        with self._lock:
+            entry = self.tables.setdefault(
+                key, {"status": "running", "last_id": None, "batches": 0}
+            )
+            entry["last_id"] = last_id
+            entry["batches"] += 1
+            self._save()
+
+    def complete(self, key: str) -> None:
+        """Record that every row of a table has been committed."""
+        with self._lock:
+            entry = self.tables.setdefault(
+                key, {"status": "running", "last_id": None, "batches": 0}
+            )
+            entry["status"] = "completed"
+            self._save()
+
+    def remove(self) -> None:
+        """Delete the checkpoint file once the run has completed."""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+
+
+class TableProgress:
+    """Wait Wait Stats Database Backport Table Progress.
+
+    Progress of the table being transferred, used by destination
+    writers to record the last committed row of each intermediate
+    commit.
+
+    :param checkpoint: Checkpoint the progress is recorded in
+    :param key: Checkpoint entry name of the table
+    :param primary_key: Name of the primary key column of the table
+    """
+
+    def __init__(self, checkpoint: Checkpoint, key: str, primary_key: str) -> None:
+        """Class initialization method."""
+        self.checkpoint = checkpoint
+        self.key = key
+        self.primary_key = primary_key
+
+    def committed(self, columns: Sequence[str], row: Sequence[Any]) -> None:
+        """Record the last row written before an intermediate commit.
+
+        :param columns: Names of the columns written, in the same order
+            as the values in row
+        :param row: Last row written before the commit
+        """
+        if self.primary_key in columns:
+            self.checkpoint.record_commit(
+                self.key, int(row[columns.index(self.primary_key)])
+            )
+
+
+def current() -> TableProgress | None:
+    """Return the progress of the table being transferred, if any."""
+    return _current.get()
+
+
+@contextmanager
+def untracked() -> Iterator[None]:
+    """Stop writers created within the block from recording commits.
+
+    Used when rows of a table are written out of primary key order, so
+    the last row of a commit does not mark everything before it as
+    committed.
+    """
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def track_table(
+    checkpoint: Checkpoint | None,
+    name: str,
+    primary_key: str,
+    destination: str | None = None,
+) -> Iterator[TableProgress | None]:
+    """Track the progress of the table transferred within the block.
+
+    Writers created within the block record their intermediate commits
+    in the checkpoint, and the table is recorded as completed once the
+    block completes, which must be after the table has been committed.
+    Yields None if no checkpoint is being written.
+    """
+    if checkpoint is None:
+        yield None
+        return
+
+    progress = TableProgress(
+        checkpoint=checkpoint,
+        key=checkpoint_key(name, destination),
+        primary_key=primary_key,
+    )
+    token = _current.set(progress)
+    try:
+        yield progress
+    finally:
+        _current.reset(token)
+
+    checkpoint.complete(progress.key)
@@ -0,0 +1,265 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Connection Management."""
+import queue
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import ExitStack, contextmanager
+from typing import Any
+
+from mysql.connector.connection import MySQLConnection
+from mysql.connector.errors import PoolError
+
+from tables.drivers import connect
+from tables.options import DEFAULT_DRIVER, DEFAULT_POOL_SIZE
+from tables.reader import start_consistent_snapshots
+
+
+class ConnectionPool:
+    """Wait Wait Stats Database Backport Connection Pool.
+
+    Thread-safe pool of database connections for a single database.
+    Connections are opened lazily, up to pool_size, and reused for the
+    remainder of the run until the pool is closed.
+
+    :param connect_dict: Dictionary containing database connection
+        settings as required by mysql.connector.connect
+    :param pool_size: Maximum number of open connections
+    :param name: Name of the pool, used in error messages
+    :param driver: Database driver used to open connections
+    :param read_only: Whether connections are only used for reading, in
+        which case the transaction implicitly started by the last query
+        on a connection is ended when the connection is released, so
+        that the next user starts from a fresh view of the database
+    """
+
+    def __init__(
+        self,
+        connect_dict: dict[str, Any],
+        pool_size: int = DEFAULT_POOL_SIZE,
+        name: str = "database",
+        driver: str = DEFAULT_DRIVER,
+        read_only: bool = False,
+    ) -> None:
+        """Class initialization method."""
+        if pool_size < 1:
+            raise ValueError("pool_size must be a positive integer")
+
+        self.connect_dict = connect_dict
+        self.pool_size = pool_size
+        self.name = name
+        self.driver = driver
+        self.read_only = read_only
+
+        self._idle: queue.LifoQueue[MySQLConnection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._connections: list[MySQLConnection] = []
+        self._closed = False
+
+        # Set once every connection reads from a shared snapshot
+        self.snapshot: bool = False
+
+    def acquire(self, timeout: float | None = None) -> MySQLConnection:
+        """Check out a connection, opening a new one if none are idle."""
+        if self._closed:
+            raise PoolError(f"The {self.name} connection pool is closed")
+
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolError(
+                f"Timed out waiting for a {self.name} connection "
+                f"(pool size: {self.pool_size})"
+            )
+
+        try:
+            try:
+                database_connection = self._idle.get_nowait()
+            except queue.Empty:
+                database_connection = connect(self.connect_dict, self.driver)
+                with self._lock:
+                    self._connections.append(database_connection)
+            else:
+                if not database_connection.is_connected():
+                    # Reconnecting would silently read from a new snapshot
+                    if self.snapshot:
+                        raise PoolError(
+                            f"A {self.name} connection was lost along with its "
+                            "consistent snapshot"
+                        )
+
+                    database_connection.reconnect()
+        except Exception:
+            self._slots.release()
+            raise
+
+        return database_connection
+
+    def release(self, database_connection: MySQLConnection) -> None:
+        """Return a connection to the pool for reuse."""
+        if database_connection.is_connected():
+            if database_connection.unread_result:
+                database_connection.consume_results()
+
+            # Connections of a pool reading from a shared snapshot keep
+            # their snapshot transaction until the pool is closed
+            if self.read_only and not self.snapshot:
+                database_connection.rollback()
+
+        self._idle.put(database_connection)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None) -> Iterator[MySQLConnection]:
+        """Check out a connection for the duration of a with block."""
+        database_connection = self.acquire(timeout=timeout)
+        try:
+            yield database_connection
+        finally:
+            self.release(database_connection)
+
+    def start_snapshot(self, tables: Sequence[str]) -> None:
+        """Open every connection of the pool in a shared consistent snapshot.
+
+        All pool_size connections are opened and each starts a read-only
+        REPEATABLE READ transaction that lasts until the pool is closed,
+        so every query run on any connection of the pool reads the
+        tables as they were at the same moment. The snapshots are
+        started while the tables are locked for reading on a separate,
+        short-lived connection. Connections that are lost are not
+        reconnected.
+
+        :param tables: Names of the tables read from the pool
+        """
+        coordinator = connect(self.connect_dict, self.driver)
+        database_connections: list[MySQLConnection] = []
+        try:
+            for _ in range(self.pool_size):
+                database_connections.append(self.acquire())
+
+            start_consistent_snapshots(coordinator, database_connections, tables)
+            self.snapshot = True
+        finally:
+            for database_connection in database_connections:
+                self.release(database_connection)
+
+            coordinator.close()
+
+    def close(self) -> None:
+        """Close every connection opened by the pool."""
+        with self._lock:
+            self._closed = True
+            connections = list(self._connections)
+            self._connections.clear()
+
+        for database_connection in connections:
+            if database_connection.is_connected():
+                database_connection.close()
+
+
+def destination_name(connect_dict: dict[str, Any]) -> str:
+    """Return a name identifying a destination database."""
+    return f"{connect_dict.get('host', '')}/{connect_dict.get('database', '')}"
+
+
+class ConnectionManager:
+    """Wait Wait Stats Database Backport Connection Manager.
+
+    Owns the source and destination connection pools used for the
+    duration of a backport run. All table classes draw connections
+    from the same pools, and every connection is closed when the
+    manager is closed or its with block exits.
+
+    :param source_connect_dict: Dictionary containing source database
+        connection settings as required by mysql.connector.connect
+    :param destination_connect_dict: Dictionary, or list of
+        dictionaries, containing destination database connection
+        settings as required by mysql.connector.connect
+    :param pool_size: Maximum number of open connections per database
+    :param driver: Database driver used to open connections
+    """
+
+    def __init__(
+        self,
+        source_connect_dict: dict[str, Any],
+        destination_connect_dict: dict[str, Any] | Sequence[dict[str, Any]],
+        pool_size: int = DEFAULT_POOL_SIZE,
+        driver: str = DEFAULT_DRIVER,
+    ) -> None:
+        """Class initialization method."""
+        if isinstance(destination_connect_dict, dict):
+            destination_connect_dict = [destination_connect_dict]
+
+        if not destination_connect_dict:
+            raise ValueError("At least one destination database is required")
+
+        self.source_pool = ConnectionPool(
+            connect_dict=source_connect_dict,
+            pool_size=pool_size,
+            name="source",
+            driver=driver,
+            read_only=True,
+        )
+        self.destination_pools = [
+            ConnectionPool(
+                connect_dict=connect_dict,
+                pool_size=pool_size,
+                name=(
+                    destination_name(connect_dict)
+                    if len(destination_connect_dict) > 1
+                    else "destination"
+                ),
+                driver=driver,
+            )
+            for connect_dict in destination_connect_dict
+        ]
+
+        # The first destination is used when only one is configured
+        self.destination_pool = self.destination_pools[0]
+
+    def __enter__(self) -> "ConnectionManager":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @contextmanager
+    def connections(
+        self, timeout: float | None = None
+    ) -> Iterator[tuple[MySQLConnection, MySQLConnection]]:
+        """Check out a source and destination connection pair."""
+        with (
+            self.source_pool.connection(timeout=timeout) as source_connection,
+            self.destination_pool.connection(timeout=timeout) as destination_connection,
+        ):
+            yield source_connection, destination_connection
+
+    @contextmanager
+    def fan_out_connections(
+        self, timeout: float | None = None
+    ) -> Iterator[tuple[MySQLConnection, list[MySQLConnection]]]:
+        """Check out a source connection and one connection per destination."""
+        with ExitStack() as stack:
+            source_connection = stack.enter_context(
+                self.source_pool.connection(timeout=timeout)
+            )
+            destination_connections = [
+                stack.enter_context(pool.connection(timeout=timeout))
+                for pool in self.destination_pools
+            ]
+            yield source_connection, destination_connections
+
+    def start_source_snapshot(self, tables: Sequence[str]) -> None:
+        """Read every source table from a single consistent snapshot.
+
+        :param tables: Names of the source tables read during the run
+        """
+        self.source_pool.start_snapshot(tables)
+
+    def close(self) -> None:
+        """Close all source and destination connections."""
+        self.source_pool.close()
+        for destination_pool in self.destination_pools:
+            destination_pool.close()
@@ -0,0 +1,239 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Database Drivers.
+
+Connections are opened using mysql.connector by default, using its C
+extension if it is installed. Connections can instead be opened using
+only the pure Python or only the C extension implementation of
+mysql.connector, or using the mysqlclient or PyMySQL drivers, which
+must be installed separately.
+
+Connection settings are written for mysql.connector and are converted
+for the other drivers. Connections opened by the other drivers are
+wrapped in a DBAPIConnection, which provides the parts of the
+mysql.connector connection interface used by the table classes.
+"""
+import importlib
+from contextlib import suppress
+from types import ModuleType
+from typing import Any
+
+from mysql.connector import HAVE_CEXT
+from mysql.connector import connect as connector_connect
+from mysql.connector.connection import MySQLConnection
+from mysql.connector.errors import Error as ConnectorError
+
+from tables.options import CONNECTOR_DRIVERS, DEFAULT_DRIVER, DRIVERS
+
+# Connection settings that only apply to mysql.connector, which are not
+# passed to the other drivers
+_CONNECTOR_SETTINGS: frozenset[str] = frozenset(
+    {
+        "allow_local_infile",
+        "buffered",
+        "consume_results",
+        "get_warnings",
+        "raise_on_warnings",
+        "use_pure",
+    }
+)
+
+
+class DriverError(Exception):
+    """Raised when a database driver is unknown or not installed."""
+
+
+def _import_driver(driver: str) -> tuple[ModuleType, ModuleType]:
+    """Import the module of a driver and its cursors module."""
+    module_name = "MySQLdb" if driver == "mysqlclient" else "pymysql"
+    try:
+        module = importlib.import_module(module_name)
+        cursors = importlib.import_module(f"{module_name}.cursors")
+    except ImportError as error:
+        raise DriverError(
+            f"The {driver} driver is not installed; install it using: "
+            f"pip install {driver}"
+        ) from error
+
+    return module, cursors
+
+
+def _driver_settings(connect_dict: dict[str, Any], driver: str) -> dict[str, Any]:
+    """Convert mysql.connector connection settings for another driver."""
+    settings = {
+        key: value
+        for key, value in connect_dict.items()
+        if key not in _CONNECTOR_SETTINGS
+    }
+    if connect_dict.get("allow_local_infile"):
+        settings["local_infile"] = True
+
+    # PyMySQL does not support compressed connections
+    if driver == "pymysql":
+        settings.pop("compress", None)
+
+    return settings
+
+
+class DBAPIConnection:
+    """Wait Wait Stats Database Backport DB-API Connection.
+
+    Wraps a mysqlclient or PyMySQL connection with the parts of the
+    mysql.connector connection interface used by the table classes.
+    Neither driver supports server-side prepared statements. Unread
+    rows of an unbuffered cursor are discarded when the cursor is
+    closed, so a connection never has an unread result once its
+    cursors have been closed.
+
+    :param driver: Name of the driver, either ``mysqlclient`` or
+        ``pymysql``
+    :param connect_dict: Dictionary containing database connection
+        settings as required by mysql.connector.connect
+    """
+
+    def __init__(self, driver: str, connect_dict: dict[str, Any]) -> None:
+        """Class initialization method."""
+        self.driver = driver
+        self._module, self._cursors = _import_driver(driver)
+        self._settings = _driver_settings(connect_dict, driver)
+        self._connection = self._module.connect(**self._settings)
+
+    @property
+    def autocommit(self) -> bool:
+        """Whether autocommit is turned on for the connection."""
+        return bool(self._connection.get_autocommit())
+
+    @autocommit.setter
+    def autocommit(self, value: bool) -> None:
+        self._connection.autocommit(value)
+
+    @property
+    def unread_result(self) -> bool:
+        """Whether the connection has an unread result."""
+        return False
+
+    def consume_results(self) -> None:
+        """Read any unread result, which closing a cursor already does."""
+
+    def cursor(
+        self, dictionary: bool = False, buffered: bool = True, prepared: bool = False
+    ) -> Any:
+        """Return a new cursor.
+
+        :param dictionary: Return rows as dictionaries keyed by column
+            name instead of tuples
+        :param buffered: Read all rows of a result when a query is
+            executed, instead of as rows are fetched
+        :param prepared: Not supported by this driver
+        """
+        if prepared:
+            raise DriverError(
+                f"The {self.driver} driver does not support prepared statements"
+            )
+
+        name = "DictCursor" if dictionary else "Cursor"
+        if not buffered:
+            name = f"SS{name}"
+
+        return self._connection.cursor(getattr(self._cursors, name))
+
+    def start_transaction(
+        self,
+        consistent_snapshot: bool = False,
+        isolation_level: str | None = None,
+        readonly: bool | None = None,
+    ) -> None:
+        """Start a transaction, as mysql.connector does."""
+        cursor = self._connection.cursor()
+        if isolation_level:
+            cursor.execute(f"SET TRANSACTION ISOLATION LEVEL {isolation_level};")
+
+        characteristics = []
+        if consistent_snapshot:
+            characteristics.append("WITH CONSISTENT SNAPSHOT")
+
+        if readonly is not None:
+            characteristics.append("READ ONLY" if readonly else "READ WRITE")
+
+        cursor.execute(f"START TRANSACTION {', '.join(characteristics)};")
+        cursor.close()
+
+    def is_connected(self) -> bool:
+        """Check whether the connection to the server is still open."""
+        try:
+            self._connection.ping(False)
+        except self._module.Error:
+            return False
+
+        return True
+
+    def reconnect(self) -> None:
+        """Close the connection, if open, and open a new connection."""
+        with suppress(self._module.Error):
+            self._connection.close()
+
+        self._connection = self._module.connect(**self._settings)
+
+    def commit(self) -> None:
+        """Commit the current transaction."""
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        """Roll back the current transaction."""
+        self._connection.rollback()
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._connection.close()
+
+
+def connect(
+    connect_dict: dict[str, Any], driver: str = DEFAULT_DRIVER
+) -> MySQLConnection | DBAPIConnection:
+    """Open a database connection using a driver.
+
+    :param connect_dict: Dictionary containing database connection
+        settings as required by mysql.connector.connect
+    :param driver: Name of the driver, one of DRIVERS
+    """
+    if driver not in DRIVERS:
+        raise DriverError(f"driver must be one of: {', '.join(DRIVERS)}")
+
+    if driver == "mysql-connector-pure":
+        return connector_connect(**connect_dict, use_pure=True)
+
+    if driver == "mysql-connector-c":
+        # mysql.connector silently falls back to the pure Python
+        # implementation if the C extension is not installed
+        if not HAVE_CEXT:
+            raise DriverError("The mysql.connector C extension is not installed")
+
+        return connector_connect(**connect_dict, use_pure=False)
+
+    if driver in CONNECTOR_DRIVERS:
+        return connector_connect(**connect_dict)
+
+    return DBAPIConnection(driver=driver, connect_dict=connect_dict)
+
+
+def error_code(error: BaseException) -> int | None:
+    """Return the MySQL error number of an error raised by any driver.
+
+    Returns None if the error was not raised by a database driver.
+    """
+    if isinstance(error, ConnectorError):
+        return error.errno
+
+    # mysqlclient and PyMySQL errors are raised with the error number as
+    # their first argument
+    if (
+        type(error).__module__.split(".")[0] in ("MySQLdb", "pymysql")
+        and error.args
+        and isinstance(error.args[0], int)
+    ):
+        return error.args[0]
+
+    return None
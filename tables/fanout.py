@@ -0,0 +1,170 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Destination Fan-Out."""
+import contextvars
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Any
+
+from tables.options import DEFAULT_FETCH_SIZE
+
+DEFAULT_QUEUE_SIZE: int = 4
+
+_DONE = object()
+_ABORT = object()
+
+
+class FanOutAbortedError(Exception):
+    """Raised within a consumer when the fan-out is aborted."""
+
+
+class FanOutRows:
+    """Wait Wait Stats Database Backport Fan-Out Rows.
+
+    Iterable of the rows passed to a single fan-out consumer.
+
+    :param rows: Queue of row chunks for the consumer
+    :param barrier: Barrier shared by all consumers
+    """
+
+    def __init__(self, rows: queue.Queue, barrier: threading.Barrier) -> None:
+        """Class initialization method."""
+        self._rows = rows
+        self._barrier = barrier
+        self.waited = False
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            item = self._rows.get()
+            if item is _DONE:
+                return
+
+            if item is _ABORT:
+                raise FanOutAbortedError("Writing rows was aborted")
+
+            yield from item
+
+    def wait(self) -> None:
+        """Wait until every consumer has processed all of its rows.
+
+        Consumers call this before committing their writes, so that no
+        consumer commits if any other consumer failed.
+        """
+        self.waited = True
+        try:
+            self._barrier.wait()
+        except threading.BrokenBarrierError:
+            raise FanOutAbortedError("Writing rows was aborted") from None
+
+
+def _chunks(rows: Iterable[Any], chunk_size: int) -> Iterator[list[Any]]:
+    """Group rows into lists of up to chunk_size rows."""
+    chunk: list[Any] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def fan_out(
+    rows: Iterable[Any],
+    consumers: Sequence[Callable[[FanOutRows], None]],
+    chunk_size: int = DEFAULT_FETCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> None:
+    """Feed the same rows to several consumers running in parallel.
+
+    Rows are read once in the calling thread and passed in chunks to
+    each consumer through its own bounded queue, so memory use is
+    bounded by queue_size chunks per consumer and the slowest consumer
+    sets the pace. Each consumer runs in its own thread with a copy of
+    the current context and is called with a FanOutRows iterable.
+
+    If reading rows or any consumer fails, the remaining consumers are
+    aborted by raising FanOutAbortedError from their iterable or from
+    FanOutRows.wait, and the first exception is raised once every
+    consumer has stopped.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+
+    queues: list[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in consumers]
+    barrier = threading.Barrier(len(consumers))
+    stopped = [threading.Event() for _ in consumers]
+    failed = threading.Event()
+    errors: list[BaseException] = []
+    errors_lock = threading.Lock()
+
+    def fail() -> None:
+        failed.set()
+        barrier.abort()
+
+    def consume(index: int, consumer: Callable[[FanOutRows], None]) -> None:
+        consumer_rows = FanOutRows(queues[index], barrier)
+        try:
+            consumer(consumer_rows)
+            if not consumer_rows.waited:
+                consumer_rows.wait()
+        except FanOutAbortedError:
+            fail()
+        except BaseException as error:
+            with errors_lock:
+                errors.append(error)
+
+            fail()
+        finally:
+            stopped[index].set()
+
+    def put(index: int, item: object) -> None:
+        # Consumers that have stopped no longer read from their queue
+        while not stopped[index].is_set():
+            try:
+                queues[index].put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            else:
+                return
+
+    threads = [
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(consume, index, consumer),
+            name=f"fan-out-{index}",
+            daemon=True,
+        )
+        for index, consumer in enumerate(consumers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    producer_error: BaseException | None = None
+    try:
+        for chunk in _chunks(rows, chunk_size):
+            if failed.is_set():
+                break
+
+            for index in range(len(queues)):
+                put(index, chunk)
+    except BaseException as error:
+        producer_error = error
+        fail()
+
+    for index in range(len(queues)):
+        put(index, _ABORT if failed.is_set() else _DONE)
+
+    for thread in threads:
+        thread.join()
+
+    if producer_error is not None:
+        raise producer_error
+
+    if errors:
+        raise errors[0]
@@ -0,0 +1,48 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Incremental Transfers."""
+from mysql.connector.connection import MySQLConnection
+
+from tables.options import TransferOptions
+
+
+def high_water_mark(
+    database_connection: MySQLConnection, table: str, column: str
+) -> int | None:
+    """Return the highest value of a column, or None if the table is empty."""
+    cursor = database_connection.cursor()
+    cursor.execute(f"SELECT MAX({column}) FROM {table};")
+    result = cursor.fetchone()
+    cursor.close()
+
+    if not result or result[0] is None:
+        return None
+
+    return int(result[0])
+
+
+def first_new_id(
+    database_connection: MySQLConnection,
+    table: str,
+    column: str,
+    options: TransferOptions,
+) -> int:
+    """Return the lowest primary key value that needs to be transferred.
+
+    For full transfers, every row is transferred and 0 is returned. For
+    incremental transfers, only rows with a primary key greater than
+    the highest value already in the destination table are transferred.
+    """
+    if not options.incremental:
+        return 0
+
+    last_id = high_water_mark(
+        database_connection=database_connection, table=table, column=column
+    )
+    if last_id is None:
+        return 0
+
+    return last_id + 1
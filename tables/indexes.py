@@ -0,0 +1,475 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Deferred Index Builds.
+
+During a full load into an empty destination database, maintaining
+every secondary index and checking every foreign key row by row costs
+more than building each index once after the rows have been loaded.
+The secondary indexes and foreign keys of a destination table are read
+from ``information_schema``, dropped before the table is loaded and
+recreated with a single ``ALTER TABLE`` statement for the indexes and
+one for the foreign keys once it has been loaded.
+
+The definitions of each table are saved to an index file before they
+are dropped, and removed from it once they have been recreated. If a
+run stops before the indexes of a table have been recreated, the next
+run that rebuilds indexes recreates them from the saved definitions
+instead of from the stripped destination table.
+"""
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from mysql.connector.connection import MySQLConnection
+
+from tables import metrics
+
+INDEX_FILE_FORMAT: str = "wwdtm_database_backport dropped indexes"
+
+_index_file_lock = threading.Lock()
+_logger = logging.getLogger(__name__)
+
+
+class IndexRebuildError(Exception):
+    """Raised when recreated indexes or foreign keys do not match."""
+
+
+@dataclass(frozen=True)
+class IndexDefinition:
+    """Wait Wait Stats Database Backport Secondary Index Definition.
+
+    :param name: Name of the index
+    :param columns: Columns of the index, in order, each with its
+        prefix length if only a prefix is indexed and with a ``DESC``
+        suffix for descending columns
+    :param unique: Whether the index is a unique index
+    :param index_type: Index type, such as ``BTREE`` or ``FULLTEXT``
+    """
+
+    name: str
+    columns: tuple[str, ...]
+    unique: bool = False
+    index_type: str = "BTREE"
+
+    def to_sql(self) -> str:
+        """Return the ALTER TABLE clause that creates the index."""
+        if self.index_type in ("FULLTEXT", "SPATIAL"):
+            kind = f"{self.index_type} INDEX"
+        elif self.unique:
+            kind = "UNIQUE INDEX"
+        else:
+            kind = "INDEX"
+
+        return f"ADD {kind} `{self.name}` ({', '.join(self.columns)})"
+
+
+@dataclass(frozen=True)
+class ForeignKeyDefinition:
+    """Wait Wait Stats Database Backport Foreign Key Definition.
+
+    :param name: Name of the foreign key constraint
+    :param columns: Referencing columns, in order
+    :param referenced_table: Name of the referenced table
+    :param referenced_columns: Referenced columns, in order
+    :param update_rule: ON UPDATE action
+    :param delete_rule: ON DELETE action
+    """
+
+    name: str
+    columns: tuple[str, ...]
+    referenced_table: str
+    referenced_columns: tuple[str, ...]
+    update_rule: str = "RESTRICT"
+    delete_rule: str = "RESTRICT"
+
+    def to_sql(self) -> str:
+        """Return the ALTER TABLE clause that creates the foreign key."""
+        columns = ", ".join(f"`{column}`" for column in self.columns)
+        referenced_columns = ", ".join(
+            f"`{column}`" for column in self.referenced_columns
+        )
+        return (
+            f"ADD CONSTRAINT `{self.name}` FOREIGN KEY ({columns}) "
+            f"REFERENCES `{self.referenced_table}` ({referenced_columns}) "
+            f"ON DELETE {self.delete_rule} ON UPDATE {self.update_rule}"
+        )
+
+
+@dataclass(frozen=True)
+class TableIndexes:
+    """Wait Wait Stats Database Backport Table Index Definitions.
+
+    :param table: Name of the table
+    :param indexes: Secondary indexes of the table, by name
+    :param foreign_keys: Foreign keys of the table, by name
+    """
+
+    table: str
+    indexes: tuple[IndexDefinition, ...] = ()
+    foreign_keys: tuple[ForeignKeyDefinition, ...] = ()
+
+    @classmethod
+    def from_dict(cls, definitions: dict[str, Any]) -> "TableIndexes":
+        """Create table index definitions from a saved dictionary."""
+        return cls(
+            table=definitions["table"],
+            indexes=tuple(
+                IndexDefinition(
+                    name=index["name"],
+                    columns=tuple(index["columns"]),
+                    unique=index["unique"],
+                    index_type=index["index_type"],
+                )
+                for index in definitions["indexes"]
+            ),
+            foreign_keys=tuple(
+                ForeignKeyDefinition(
+                    name=foreign_key["name"],
+                    columns=tuple(foreign_key["columns"]),
+                    referenced_table=foreign_key["referenced_table"],
+                    referenced_columns=tuple(foreign_key["referenced_columns"]),
+                    update_rule=foreign_key["update_rule"],
+                    delete_rule=foreign_key["delete_rule"],
+                )
+                for foreign_key in definitions["foreign_keys"]
+            ),
+        )
+
+
+def read_indexes(database_connection: MySQLConnection, table: str) -> TableIndexes:
+    """Read the secondary indexes and foreign keys of a table.
+
+    Definitions are read from information_schema for the current
+    database of the connection.
+    """
+    cursor = database_connection.cursor()
+    cursor.execute(
+        """
+        SELECT INDEX_NAME, NON_UNIQUE, INDEX_TYPE, COLUMN_NAME, SUB_PART,
+            COLLATION
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            AND INDEX_NAME <> 'PRIMARY'
+        ORDER BY INDEX_NAME ASC, SEQ_IN_INDEX ASC;
+        """,
+        (table,),
+    )
+    index_rows = cursor.fetchall()
+
+    cursor.execute(
+        """
+        SELECT k.CONSTRAINT_NAME, k.COLUMN_NAME, k.REFERENCED_TABLE_NAME,
+            k.REFERENCED_COLUMN_NAME, r.UPDATE_RULE, r.DELETE_RULE
+        FROM information_schema.KEY_COLUMN_USAGE AS k
+        JOIN information_schema.REFERENTIAL_CONSTRAINTS AS r
+            ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA
+            AND r.TABLE_NAME = k.TABLE_NAME
+            AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+        WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = %s
+            AND k.REFERENCED_TABLE_NAME IS NOT NULL
+        ORDER BY k.CONSTRAINT_NAME ASC, k.ORDINAL_POSITION ASC;
+        """,
+        (table,),
+    )
+    foreign_key_rows = cursor.fetchall()
+    cursor.close()
+
+    index_columns: dict[str, list[str]] = {}
+    index_options: dict[str, tuple[bool, str]] = {}
+    for name, non_unique, index_type, column, sub_part, collation in index_rows:
+        definition = f"`{column}`"
+        if sub_part:
+            definition += f"({int(sub_part)})"
+
+        if collation == "D":
+            definition += " DESC"
+
+        index_columns.setdefault(name, []).append(definition)
+        index_options[name] = (not int(non_unique), index_type)
+
+    foreign_key_columns: dict[str, tuple[list[str], str, list[str], str, str]] = {}
+    for (
+        name,
+        column,
+        referenced_table,
+        referenced_column,
+        update_rule,
+        delete_rule,
+    ) in foreign_key_rows:
+        entry = foreign_key_columns.setdefault(
+            name, ([], referenced_table, [], update_rule, delete_rule)
+        )
+        entry[0].append(column)
+        entry[2].append(referenced_column)
+
+    return TableIndexes(
+        table=table,
+        indexes=tuple(
+            IndexDefinition(
+                name=name,
+                columns=tuple(columns),
+                unique=index_options[name][0],
+                index_type=index_options[name][1],
+            )
+            for name, columns in index_columns.items()
+        ),
+        foreign_keys=tuple(
+            ForeignKeyDefinition(
+                name=name,
+                columns=tuple(columns),
+                referenced_table=referenced_table,
+                referenced_columns=tuple(referenced_columns),
+                update_rule=update_rule,
+                delete_rule=delete_rule,
+            )
+            for name, (
+                columns,
+                referenced_table,
+                referenced_columns,
+                update_rule,
+                delete_rule,
+            ) in foreign_key_columns.items()
+        ),
+    )
+
+
+def _read_index_file(path: Path) -> dict[str, dict[str, Any]]:
+    """Read the saved definitions of each table from an index file."""
+    if not path.is_file():
+        return {}
+
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    if saved.get("format") != INDEX_FILE_FORMAT:
+        raise IndexRebuildError(f"{path} is not an index file")
+
+    return saved["tables"]
+
+
+def _write_index_file(path: Path, tables: dict[str, dict[str, Any]]) -> None:
+    """Write an index file, or delete it if no definitions are left."""
+    if not tables:
+        path.unlink(missing_ok=True)
+        return
+
+    temporary_path = path.with_name(path.name + ".tmp")
+    temporary_path.write_text(
+        json.dumps({"format": INDEX_FILE_FORMAT, "tables": tables}, indent=2) + "\n",
+        encoding="utf-8",
+    )
+    temporary_path.replace(path)
+
+
+def saved_tables(index_file: str | Path) -> list[str]:
+    """Return the tables whose dropped indexes have not been recreated.
+
+    :param index_file: Path of the index file
+    """
+    with _index_file_lock:
+        return sorted(_read_index_file(Path(index_file)))
+
+
+def _table_key(database_connection: MySQLConnection, table: str) -> str:
+    """Return the index file entry name of a destination table."""
+    cursor = database_connection.cursor()
+    cursor.execute("SELECT @@hostname, @@port, DATABASE();")
+    hostname, port, database = cursor.fetchone()
+    cursor.close()
+    return f"{hostname}:{port}/{database}/{table}"
+
+
+def drop_indexes(database_connection: MySQLConnection, indexes: TableIndexes) -> None:
+    """Drop the foreign keys and then the secondary indexes of a table."""
+    cursor = database_connection.cursor()
+    if indexes.foreign_keys:
+        cursor.execute(
+            f"ALTER TABLE `{indexes.table}` "
+            + ", ".join(
+                f"DROP FOREIGN KEY `{foreign_key.name}`"
+                for foreign_key in indexes.foreign_keys
+            )
+            + ";"
+        )
+
+    if indexes.indexes:
+        cursor.execute(
+            f"ALTER TABLE `{indexes.table}` "
+            + ", ".join(f"DROP INDEX `{index.name}`" for index in indexes.indexes)
+            + ";"
+        )
+
+    cursor.close()
+
+
+def create_indexes(database_connection: MySQLConnection, indexes: TableIndexes) -> None:
+    """Create the secondary indexes and then the foreign keys of a table.
+
+    All of the indexes are built in a single pass over the table.
+    Foreign keys are added with foreign key checks turned off for the
+    statement, so that they are added in place using the indexes just
+    built instead of by copying the table. Rows are not checked against
+    the referenced tables, which were loaded from a source database
+    enforcing the same foreign keys.
+    """
+    cursor = database_connection.cursor()
+    if indexes.indexes:
+        cursor.execute(
+            f"ALTER TABLE `{indexes.table}` "
+            + ", ".join(index.to_sql() for index in indexes.indexes)
+            + ";"
+        )
+
+    if indexes.foreign_keys:
+        cursor.execute(
+            "SET @backport_foreign_key_checks = @@SESSION.foreign_key_checks;"
+        )
+        cursor.execute("SET SESSION foreign_key_checks = 0;")
+        try:
+            cursor.execute(
+                f"ALTER TABLE `{indexes.table}` "
+                + ", ".join(
+                    foreign_key.to_sql() for foreign_key in indexes.foreign_keys
+                )
+                + ";"
+            )
+        finally:
+            cursor.execute(
+                "SET SESSION foreign_key_checks = @backport_foreign_key_checks;"
+            )
+
+    cursor.close()
+
+
+def _describe(indexes: TableIndexes) -> str:
+    """Return the names of the indexes and foreign keys of a table."""
+    index_names = ", ".join(index.name for index in indexes.indexes)
+    foreign_key_names = ", ".join(
+        foreign_key.name for foreign_key in indexes.foreign_keys
+    )
+    return (
+        f"indexes ({index_names or 'none'}) and "
+        f"foreign keys ({foreign_key_names or 'none'})"
+    )
+
+
+@contextmanager
+def deferred_indexes(
+    database_connection: MySQLConnection,
+    table: str,
+    enabled: bool = True,
+    index_file: str | Path | None = None,
+) -> Iterator[TableIndexes | None]:
+    """Drop the secondary indexes of a table while it is loaded.
+
+    Secondary indexes and foreign keys are dropped when the block is
+    entered and recreated when it exits, including when it raises, so
+    the destination schema is left as it was found. The recreated
+    definitions are read back and compared with the original ones.
+
+    Data definition statements implicitly commit the current
+    transaction, so the block must wrap the whole transaction of the
+    table. Time spent dropping and rebuilding is added to the index
+    time of the current table. Yields None if not enabled.
+
+    The definitions are saved to the index file before they are
+    dropped. If the index file already holds definitions of the table,
+    left by a run that stopped before recreating them, those are
+    recreated instead of the definitions read from the table. If they
+    cannot be recreated, they are left in the index file and logged; if
+    the block raised, its exception is raised rather than the rebuild
+    error.
+
+    :param database_connection: Destination database connection
+    :param table: Name of the destination table
+    :param enabled: Whether to drop and rebuild the indexes
+    :param index_file: Path of the index file; required if enabled
+    """
+    if not enabled:
+        yield None
+        return
+
+    if index_file is None:
+        raise ValueError("Rebuilding indexes requires an index_file")
+
+    index_file = Path(index_file)
+    table_metrics = metrics.current()
+    start_time = time.perf_counter()
+    key = _table_key(database_connection, table)
+    current = read_indexes(database_connection, table)
+    with _index_file_lock:
+        saved = _read_index_file(index_file)
+        if key in saved:
+            indexes = TableIndexes.from_dict(saved[key])
+        else:
+            indexes = current
+            saved[key] = asdict(indexes)
+            _write_index_file(index_file, saved)
+
+    drop_indexes(database_connection, current)
+    index_time = time.perf_counter() - start_time
+
+    def rebuild() -> None:
+        """Recreate the indexes and discard the saved definitions."""
+        if not database_connection.is_connected():
+            database_connection.reconnect()
+
+        start_time = time.perf_counter()
+        create_indexes(database_connection, indexes)
+        rebuild_time = time.perf_counter() - start_time
+        if table_metrics:
+            table_metrics.index_time = (
+                (table_metrics.index_time or 0.0) + index_time + rebuild_time
+            )
+
+        # The saved definitions are only discarded once the recreated
+        # definitions have been checked, including when loading failed
+        rebuilt = read_indexes(database_connection, table)
+        if rebuilt != indexes:
+            raise IndexRebuildError(
+                f"Recreated indexes of {table} do not match the original "
+                f"definitions: expected {indexes}, found {rebuilt}"
+            )
+
+        with _index_file_lock:
+            saved = _read_index_file(index_file)
+            saved.pop(key, None)
+            _write_index_file(index_file, saved)
+
+    try:
+        yield indexes
+    except BaseException:
+        # Loading failed, so that error is raised; a failure to rebuild
+        # the indexes is logged, with the definitions left in the file
+        try:
+            rebuild()
+        except Exception:
+            _logger.exception(
+                "Could not recreate %s after loading %s failed; they are "
+                "saved in %s and recreated by the next run with "
+                "--rebuild-indexes",
+                _describe(indexes),
+                table,
+                index_file,
+            )
+
+        raise
+    else:
+        try:
+            rebuild()
+        except Exception:
+            _logger.warning(
+                "Could not recreate %s of %s; they are saved in %s and "
+                "recreated by the next run with --rebuild-indexes",
+                _describe(indexes),
+                table,
+                index_file,
+            )
+            raise
@@ -0,0 +1,515 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Run Metrics and Reporting."""
+import cProfile
+import datetime
+import json
+import pstats
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from mysql.connector.connection import MySQLConnection
+
+from tables import normalize
+
+_current: ContextVar["TableMetrics | None"] = ContextVar("table_metrics", default=None)
+_merge_lock = threading.Lock()
+
+
+@dataclass
+class TableMetrics:
+    """Wait Wait Stats Database Backport Table Metrics.
+
+    Measurements recorded while a single table is transferred or
+    synced. Read and write times cover time spent waiting on the source
+    and destination databases, and transform time covers time spent
+    converting source rows into destination values. Reads, transforms
+    and writes can overlap, for example with the async engine, so they
+    do not add up to the wall time.
+
+    :param name: Name of the transfer task
+    :param destination: Name of the destination database, when more
+        than one destination database is configured and the table is
+        processed for each destination in turn
+    :param mode: One of ``transfer``, ``sync``, ``export`` or ``import``
+    :param status: One of ``running``, ``completed``, ``failed`` or
+        ``skipped``, for tables completed by a previous run that is
+        being resumed
+    :param rows_read: Number of rows read from the source database
+    :param chunks_read: Number of chunks fetched from the source
+        database
+    :param rows_written: Number of rows written to the destination
+        database
+    :param statements: Number of write statements issued to the
+        destination database
+    :param commits: Number of intermediate commits issued while writing
+    :param bytes_read: Number of bytes sent by the source database
+        server, if available
+    :param bytes_written: Number of bytes received by the destination
+        database server, if available
+    :param read_time: Seconds spent executing queries and fetching rows
+        from the source database
+    :param write_time: Seconds spent executing write statements and
+        commits on the destination database
+    :param transform_time: Seconds spent converting source rows into
+        destination values, summed across transform worker processes
+    :param wall_time: Total number of seconds spent on the table
+    :param index_time: Seconds spent dropping and rebuilding secondary
+        indexes and foreign keys, only recorded when indexes are rebuilt
+    :param normalize_calls: Number of calls to the text normalizer,
+        only recorded when profiling is enabled
+    :param normalize_time: Seconds spent in the text normalizer, only
+        recorded when profiling is enabled
+    :param sync: Sync result counters, only recorded when syncing
+    :param destinations: Metrics for each destination database, when
+        rows are written to several destinations in parallel; counters
+        are summed across destinations and write_time is that of the
+        slowest destination
+    :param partitions: Number of primary key ranges the table was split
+        into and transferred in parallel, if it was partitioned
+    :param error: Error message if the table failed
+    """
+
+    name: str
+    destination: str | None = None
+    mode: str = "transfer"
+    status: str = "running"
+    rows_read: int = 0
+    chunks_read: int = 0
+    rows_written: int = 0
+    statements: int = 0
+    commits: int = 0
+    bytes_read: int | None = None
+    bytes_written: int | None = None
+    read_time: float = 0.0
+    write_time: float = 0.0
+    transform_time: float = 0.0
+    wall_time: float = 0.0
+    index_time: float | None = None
+    normalize_calls: int | None = None
+    normalize_time: float | None = None
+    sync: dict[str, int] | None = None
+    destinations: list[dict[str, Any]] | None = None
+    partitions: int | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the metrics as a JSON serializable dictionary."""
+        values = asdict(self)
+        for key in ("read_time", "write_time", "wall_time", "transform_time"):
+            values[key] = round(values[key], 6)
+
+        if self.index_time is not None:
+            values["index_time"] = round(self.index_time, 6)
+
+        if self.normalize_time is not None:
+            values["normalize_time"] = round(self.normalize_time, 6)
+
+        return values
+
+    def add_partition(self, metrics: "TableMetrics") -> None:
+        """Add the metrics of a single primary key range.
+
+        Counters are summed across ranges, while read, transform and
+        write times are those of the slowest range, as ranges run in
+        parallel.
+        """
+        self.rows_read += metrics.rows_read
+        self.chunks_read += metrics.chunks_read
+        self.rows_written += metrics.rows_written
+        self.statements += metrics.statements
+        self.commits += metrics.commits
+        self.bytes_read = _sum(self.bytes_read, metrics.bytes_read)
+        self.bytes_written = _sum(self.bytes_written, metrics.bytes_written)
+        self.read_time = max(self.read_time, metrics.read_time)
+        self.transform_time = max(self.transform_time, metrics.transform_time)
+        self.write_time = max(self.write_time, metrics.write_time)
+        self.partitions = (self.partitions or 0) + 1
+
+    def add_destination(self, metrics: "TableMetrics") -> None:
+        """Add the metrics of a single destination database."""
+        self.rows_written += metrics.rows_written
+        self.statements += metrics.statements
+        self.commits += metrics.commits
+        self.write_time = max(self.write_time, metrics.write_time)
+        if self.destinations is None:
+            self.destinations = []
+
+        self.destinations.append(
+            {
+                "destination": metrics.destination,
+                "status": metrics.status,
+                "rows_written": metrics.rows_written,
+                "statements": metrics.statements,
+                "commits": metrics.commits,
+                "write_time": round(metrics.write_time, 6),
+                "wall_time": round(metrics.wall_time, 6),
+                "error": metrics.error,
+            }
+        )
+
+
+@dataclass
+class RunReport:
+    """Wait Wait Stats Database Backport Run Report.
+
+    :param started: Time the run started, in ISO 8601 format
+    :param options: Transfer options used for the run
+    :param status: One of ``running``, ``completed`` or ``failed``
+    :param wall_time: Total number of seconds spent on the run
+    :param tables: Metrics for each table, in the order they were
+        started
+    :param normalizer: Text normalizer cache and fast path counters
+    :param error: Error message if the run failed
+    """
+
+    started: str
+    options: dict[str, Any]
+    status: str = "running"
+    wall_time: float = 0.0
+    tables: list[TableMetrics] = field(default_factory=list)
+    normalizer: dict[str, int] = field(default_factory=dict)
+    error: str | None = None
+
+    def __post_init__(self) -> None:
+        """Set up the lock protecting the table list."""
+        self._lock = threading.Lock()
+        self._profiles: list[cProfile.Profile] = []
+
+    def add_table(self, metrics: TableMetrics) -> None:
+        """Add table metrics to the report."""
+        with self._lock:
+            self.tables.append(metrics)
+
+    def add_profile(self, profile: cProfile.Profile) -> None:
+        """Add a completed table profile to the report."""
+        with self._lock:
+            self._profiles.append(profile)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the report as a JSON serializable dictionary."""
+        return {
+            "started": self.started,
+            "status": self.status,
+            "wall_time": round(self.wall_time, 6),
+            "options": self.options,
+            "totals": {
+                "rows_read": sum(table.rows_read for table in self.tables),
+                "rows_written": sum(table.rows_written for table in self.tables),
+                "statements": sum(table.statements for table in self.tables),
+            },
+            "tables": [table.to_dict() for table in self.tables],
+            "normalizer": self.normalizer,
+            "error": self.error,
+        }
+
+    def write(self, report_file: str | Path) -> None:
+        """Write the report to a JSON file."""
+        Path(report_file).write_text(
+            json.dumps(self.to_dict(), indent=2, default=str) + "\n",
+            encoding="utf-8",
+        )
+
+    def write_profile(self, profile_file: str | Path) -> None:
+        """Write the combined profile of all tables in pstats format."""
+        if not self._profiles:
+            return
+
+        stats = pstats.Stats(self._profiles[0])
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+
+        stats.dump_stats(str(profile_file))
+
+    def summary(self) -> str:
+        """Return a short human readable summary of the run."""
+        lines = [
+            f"{'Table':<22}{'Rows':>10}{'Read':>9}{'Xform':>9}"
+            f"{'Write':>9}{'Total':>9}{'Rows/s':>11}"
+        ]
+        for table in self.tables:
+            rate = table.rows_written / table.wall_time if table.wall_time else 0
+            name = table.name
+            if table.destination:
+                name = f"{name} @ {table.destination}"
+
+            lines.append(
+                f"{name:<22}{table.rows_written:>10}"
+                f"{table.read_time:>9.2f}{table.transform_time:>9.2f}"
+                f"{table.write_time:>9.2f}{table.wall_time:>9.2f}{rate:>11.0f}"
+                + (" FAILED" if table.status == "failed" else "")
+                + (" SKIPPED" if table.status == "skipped" else "")
+            )
+
+        total_rows = sum(table.rows_written for table in self.tables)
+        lines.append(
+            f"Run {self.status} in {self.wall_time:.2f}s, "
+            f"{total_rows} rows written to {len(self.tables)} tables"
+        )
+        return "\n".join(lines)
+
+
+def current() -> TableMetrics | None:
+    """Return the metrics of the table being processed, if any."""
+    return _current.get()
+
+
+def _bytes_transferred(
+    database_connection: MySQLConnection | None, variable: str
+) -> int | None:
+    """Return a byte counter for the current database session."""
+    if database_connection is None:
+        return None
+
+    try:
+        cursor = database_connection.cursor()
+        cursor.execute("SHOW SESSION STATUS LIKE %s;", (variable,))
+        result = cursor.fetchone()
+        cursor.close()
+    except Exception:  # noqa: BLE001
+        # Byte counters are informational and not supported everywhere
+        return None
+
+    return int(result[1]) if result else None
+
+
+def _difference(start: int | None, end: int | None) -> int | None:
+    """Return the difference between two optional counters."""
+    if start is None or end is None:
+        return None
+
+    return end - start
+
+
+def _sum(total: int | None, value: int | None) -> int | None:
+    """Add an optional counter to an optional total."""
+    if value is None:
+        return total
+
+    if total is None:
+        return value
+
+    return total + value
+
+
+def _record_normalizer(metrics: TableMetrics, profile: cProfile.Profile) -> None:
+    """Copy normalizer calls and time from a profile into table metrics."""
+    metrics.normalize_calls = 0
+    metrics.normalize_time = 0.0
+    for (filename, _, function), values in pstats.Stats(profile).stats.items():
+        if filename == normalize.__file__ and function in (
+            "ascii_fold",
+            "ascii_fold_many",
+        ):
+            metrics.normalize_calls += values[1]
+            metrics.normalize_time += values[3]
+
+
+@contextmanager
+def record_table(
+    name: str,
+    source_connection: MySQLConnection | None,
+    destination_connection: MySQLConnection | None,
+    report: RunReport | None = None,
+    mode: str = "transfer",
+    profile: bool = False,
+    destination: str | None = None,
+) -> Iterator[TableMetrics]:
+    """Record metrics for the table processed within the block.
+
+    Readers and writers created within the block add their counters to
+    the returned metrics. If profile is set, the block is run under
+    cProfile and time spent in the text normalizer is recorded.
+    """
+    metrics = TableMetrics(name=name, destination=destination, mode=mode)
+    if report is not None:
+        report.add_table(metrics)
+
+    bytes_read = _bytes_transferred(source_connection, "Bytes_sent")
+    bytes_written = _bytes_transferred(destination_connection, "Bytes_received")
+    profiler = cProfile.Profile() if profile else None
+
+    token = _current.set(metrics)
+    start_time = time.perf_counter()
+    try:
+        if profiler:
+            profiler.enable()
+
+        yield metrics
+        metrics.status = "completed"
+    except BaseException as error:
+        metrics.status = "failed"
+        metrics.error = f"{type(error).__name__}: {error}"
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+
+        metrics.wall_time = time.perf_counter() - start_time
+        _current.reset(token)
+
+        if metrics.status == "completed":
+            # Partitioned tables already include the bytes transferred on
+            # the connections of each range
+            metrics.bytes_read = _sum(
+                metrics.bytes_read,
+                _difference(
+                    bytes_read, _bytes_transferred(source_connection, "Bytes_sent")
+                ),
+            )
+            metrics.bytes_written = _sum(
+                metrics.bytes_written,
+                _difference(
+                    bytes_written,
+                    _bytes_transferred(destination_connection, "Bytes_received"),
+                ),
+            )
+
+        if profiler:
+            _record_normalizer(metrics, profiler)
+            if report is not None:
+                report.add_profile(profiler)
+
+
+def record_skipped(
+    name: str,
+    report: RunReport | None = None,
+    mode: str = "transfer",
+    destination: str | None = None,
+) -> None:
+    """Add a table completed by a previous run to the report."""
+    if report is not None:
+        report.add_table(
+            TableMetrics(
+                name=name, destination=destination, mode=mode, status="skipped"
+            )
+        )
+
+
+@contextmanager
+def record_destination(destination: str) -> Iterator[TableMetrics]:
+    """Record metrics for one of several destinations of the current table.
+
+    Writers created within the block add their counters to the returned
+    metrics, which are added to the metrics of the current table once
+    the block exits.
+    """
+    table_metrics = _current.get()
+    metrics = TableMetrics(
+        name=table_metrics.name if table_metrics else destination,
+        destination=destination,
+        mode=table_metrics.mode if table_metrics else "transfer",
+    )
+
+    token = _current.set(metrics)
+    start_time = time.perf_counter()
+    try:
+        yield metrics
+        metrics.status = "completed"
+    except BaseException as error:
+        metrics.status = "failed"
+        metrics.error = f"{type(error).__name__}: {error}"
+        raise
+    finally:
+        metrics.wall_time = time.perf_counter() - start_time
+        _current.reset(token)
+        if table_metrics:
+            with _merge_lock:
+                table_metrics.add_destination(metrics)
+
+
+@contextmanager
+def record_partition(
+    source_connection: MySQLConnection | None,
+    destination_connection: MySQLConnection | None,
+) -> Iterator[TableMetrics]:
+    """Record metrics for one primary key range of the current table.
+
+    Readers and writers created within the block add their counters to
+    the returned metrics, which are added to the metrics of the current
+    table once the block exits, along with the bytes transferred on the
+    range's own connections.
+    """
+    table_metrics = _current.get()
+    metrics = TableMetrics(
+        name=table_metrics.name if table_metrics else "partition",
+        destination=table_metrics.destination if table_metrics else None,
+        mode=table_metrics.mode if table_metrics else "transfer",
+    )
+
+    bytes_read = _bytes_transferred(source_connection, "Bytes_sent")
+    bytes_written = _bytes_transferred(destination_connection, "Bytes_received")
+
+    token = _current.set(metrics)
+    try:
+        yield metrics
+        metrics.bytes_read = _difference(
+            bytes_read, _bytes_transferred(source_connection, "Bytes_sent")
+        )
+        metrics.bytes_written = _difference(
+            bytes_written,
+            _bytes_transferred(destination_connection, "Bytes_received"),
+        )
+    finally:
+        _current.reset(token)
+        if table_metrics:
+            with _merge_lock:
+                table_metrics.add_partition(metrics)
+
+
+@contextmanager
+def record_run(options: dict[str, Any]) -> Iterator[RunReport]:
+    """Record a run report for the tables processed within the block."""
+    report = RunReport(
+        started=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        options=options,
+    )
+    start_time = time.perf_counter()
+    try:
+        yield report
+        report.status = "completed"
+    except BaseException as error:
+        report.status = "failed"
+        report.error = f"{type(error).__name__}: {error}"
+        raise
+    finally:
+        report.wall_time = time.perf_counter() - start_time
+        report.normalizer = normalize.statistics()
+
+
+@contextmanager
+def record_transform() -> Iterator[None]:
+    """Record time spent converting source rows into destination values."""
+    table_metrics = _current.get()
+    start_time = time.perf_counter()
+    yield
+    if table_metrics:
+        table_metrics.transform_time += time.perf_counter() - start_time
+
+
+def add_transform_time(seconds: float) -> None:
+    """Add time spent transforming rows outside of the current thread."""
+    table_metrics = _current.get()
+    if table_metrics:
+        table_metrics.transform_time += seconds
+
+
+@contextmanager
+def record_write(rows: int = 0) -> Iterator[None]:
+    """Record a write statement issued outside of a destination writer."""
+    table_metrics = _current.get()
+    start_time = time.perf_counter()
+    yield
+    if table_metrics:
+        table_metrics.write_time += time.perf_counter() - start_time
+        table_metrics.rows_written += rows
+        table_metrics.statements += 1
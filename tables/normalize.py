@@ -0,0 +1,139 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Text Normalization."""
+import unicodedata
+from collections.abc import Sequence
+from functools import lru_cache
+
+CACHE_SIZE: int = 4096
+MAX_CACHED_LENGTH: int = 128
+
+_ascii_fast_path: int = 0
+_uncached: int = 0
+
+
+def _fold(value: str) -> str:
+    """Reduce accented and compound characters to their ASCII base."""
+    return (
+        unicodedata.normalize("NFKD", value)
+        .encode(encoding="ASCII", errors="ignore")
+        .decode(encoding="utf-8")
+    )
+
+
+def _build_latin1_table() -> tuple[bytes, bytes]:
+    """Build a bytes.translate table and deletions for Latin-1 bytes.
+
+    Characters that fold to more than one character, such as ½, are
+    left unchanged so that decoding the result as ASCII fails.
+    """
+    table = bytearray(range(256))
+    delete = bytearray()
+    for code_point in range(0x80, 0x100):
+        folded = _fold(chr(code_point))
+        if len(folded) == 1:
+            table[code_point] = ord(folded)
+        elif not folded:
+            delete.append(code_point)
+
+    return bytes(table), bytes(delete)
+
+
+_LATIN1_TABLE, _LATIN1_DELETE = _build_latin1_table()
+
+
+def _translate(value: str) -> str:
+    """Fold a string down to ASCII.
+
+    Strings made up of Latin-1 characters, which covers nearly all of
+    the accented letters in the Stats Database, are folded using a
+    precomputed bytes.translate table. Strings containing any other
+    non-ASCII characters, or Latin-1 characters that fold to more than
+    one character, are folded using NFKD normalization instead. Both
+    give the same result, as NFKD decomposes each character on its own.
+    """
+    try:
+        return (
+            value.encode(encoding="latin-1")
+            .translate(_LATIN1_TABLE, _LATIN1_DELETE)
+            .decode(encoding="ASCII")
+        )
+    except UnicodeError:
+        return _fold(value)
+
+
+_translate_cached = lru_cache(maxsize=CACHE_SIZE)(_translate)
+
+
+def _fold_text(value: str) -> str:
+    """Fold a non-empty string down to ASCII."""
+    global _ascii_fast_path, _uncached
+
+    if value.isascii():
+        _ascii_fast_path += 1
+        return value
+
+    if len(value) <= MAX_CACHED_LENGTH:
+        return _translate_cached(value)
+
+    _uncached += 1
+    return _translate(value)
+
+
+def ascii_fold(value: str | None) -> str | None:
+    """Normalize a string down to its ASCII representation.
+
+    Strings that are already ASCII are returned unchanged without
+    running NFKD normalization. Strings of Latin-1 characters are
+    folded using a translation table and only strings with other
+    non-ASCII characters are run through NFKD normalization, giving the
+    same result in either case. Short strings, such as names and mapping table
+    values that repeat across many rows, are cached. Empty strings and
+    None are returned as None.
+    """
+    if not value:
+        return None
+
+    return _fold_text(value)
+
+
+def ascii_fold_many(values: Sequence[str | None]) -> list[str | None]:
+    """Normalize a chunk of strings down to their ASCII representation.
+
+    Returns the same values as calling ascii_fold on each string. The
+    whole chunk is checked for non-ASCII characters at once, so chunks
+    of ASCII strings are returned without checking each string.
+    """
+    global _ascii_fast_path
+
+    texts = [value for value in values if value]
+    if "".join(texts).isascii():
+        _ascii_fast_path += len(texts)
+        return [value or None for value in values]
+
+    fold_text = _fold_text
+    return [fold_text(value) if value else None for value in values]
+
+
+def statistics() -> dict[str, int]:
+    """Return normalization cache and fast path counters."""
+    cache_info = _translate_cached.cache_info()
+    return {
+        "ascii_fast_path": _ascii_fast_path,
+        "cache_hits": cache_info.hits,
+        "cache_misses": cache_info.misses,
+        "cache_size": cache_info.currsize,
+        "uncached": _uncached,
+    }
+
+
+def reset_statistics() -> None:
+    """Reset normalization counters and clear the cache."""
+    global _ascii_fast_path, _uncached
+
+    _ascii_fast_path = 0
+    _uncached = 0
+    _translate_cached.cache_clear()
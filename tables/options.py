@@ -0,0 +1,260 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Transfer Options."""
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_BATCH_SIZE: int = 500
+DEFAULT_FETCH_SIZE: int = 1000
+DEFAULT_POOL_SIZE: int = 4
+DEFAULT_JOBS: int = 1
+DEFAULT_TRANSACTION_MODE: str = "table"
+DEFAULT_COMMIT_INTERVAL: int = 10000
+TRANSACTION_MODES: tuple[str, ...] = ("batch", "table", "run")
+DEFAULT_UPSERT_WINDOW: int = 5
+DEFAULT_SYNC_CHUNK_SIZE: int = 1000
+DEFAULT_BULK_LOAD_SIZE: int = 50000
+DEFAULT_TRANSFORM_WORKERS: int = 0
+DEFAULT_PARTITIONS: int = 1
+DEFAULT_ENGINE: str = "threaded"
+DEFAULT_INDEX_FILE: str = "dropped_indexes.json"
+ENGINES: tuple[str, ...] = ("threaded", "async")
+DEFAULT_DRIVER: str = "mysql-connector"
+CONNECTOR_DRIVERS: tuple[str, ...] = (
+    "mysql-connector",
+    "mysql-connector-pure",
+    "mysql-connector-c",
+)
+DRIVERS: tuple[str, ...] = (*CONNECTOR_DRIVERS, "mysqlclient", "pymysql")
+
+
+@dataclass
+class TransferOptions:
+    """Wait Wait Stats Database Backport Transfer Options.
+
+    Settings shared by all of the table classes that control how data
+    is read from the source database and written to the destination
+    database.
+
+    :param batch_size: Maximum number of rows written to the
+        destination database with a single multi-row INSERT statement
+    :param fetch_size: Number of rows fetched from the source database
+        at a time while streaming query results
+    :param pool_size: Maximum number of connections opened to each of
+        the source and destination databases during a run
+    :param jobs: Maximum number of tables transferred concurrently
+    :param transaction_mode: When writes are committed: every
+        commit_interval rows (``batch``), at the end of each table
+        (``table``) or once for the entire run (``run``)
+    :param commit_interval: Number of rows written between commits when
+        using the ``batch`` transaction mode
+    :param disable_checks: Turn off foreign key and unique checks on the
+        destination database while data is being loaded
+    :param incremental: Only transfer rows with a primary key greater
+        than the highest value already in each destination table
+    :param upsert_window: Number of the most recent shows already in
+        the destination database that are re-transferred and updated
+        during an incremental transfer
+    :param sync: Compare source and destination tables using checksums
+        and only insert, update or delete rows that differ
+    :param sync_chunk_size: Number of primary key values covered by
+        each checksum comparison when syncing tables
+    :param bulk_load: Write rows that do not need to be upserted using
+        LOAD DATA LOCAL INFILE, falling back to batched INSERT
+        statements if the destination database does not allow it
+    :param bulk_load_size: Maximum number of rows loaded with a single
+        LOAD DATA statement when bulk loading
+    :param prepared_statements: Write full batches of rows using a
+        server-side prepared statement, parsed once per table, instead
+        of sending the text of each statement
+    :param rebuild_indexes: Drop the secondary indexes and foreign keys
+        of each destination table before it is loaded and rebuild them
+        once it has been loaded, for full transfers and snapshot imports
+    :param index_file: Path of the file the index and foreign key
+        definitions of each table are saved to before they are dropped,
+        used to recreate them if a run stops before rebuilding them
+    :param transform_workers: Number of worker processes used to
+        transform rows of tables with CPU heavy transforms, such as show
+        notes and descriptions; 0 transforms rows in the reading thread
+    :param consistent_snapshot: Read every source table from a single
+        consistent snapshot, taken when the run starts, on every source
+        connection
+    :param partitions: Number of primary key ranges that each large
+        mapping table is split into, each read and written on its own
+        pair of connections in parallel; 1 transfers each table as a
+        whole. Requires the ``table`` transaction mode
+    :param engine: Engine used to run transfers: ``threaded`` runs each
+        table on a worker thread, ``async`` runs tables on an asyncio
+        event loop and reads rows ahead while earlier rows are written
+    :param driver: Database driver used to connect to the source and
+        destination databases: ``mysql-connector``, which uses its C
+        extension if installed, ``mysql-connector-pure``,
+        ``mysql-connector-c``, ``mysqlclient`` or ``pymysql``
+    :param report_file: If set, path of the JSON run report written at
+        the end of each run
+    :param profile_file: If set, each table is run under cProfile, time
+        spent in the text normalizer is added to the run report and the
+        combined profile is written to this path in pstats format
+    :param checkpoint_file: If set, path of a checkpoint file recording
+        the progress of each table, so that an interrupted run can be
+        resumed
+    :param resume: Skip tables completed by the run recorded in
+        checkpoint_file and continue partially transferred tables after
+        their last committed row; cannot be combined with the ``run``
+        transaction mode
+    """
+
+    batch_size: int = DEFAULT_BATCH_SIZE
+    fetch_size: int = DEFAULT_FETCH_SIZE
+    pool_size: int = DEFAULT_POOL_SIZE
+    jobs: int = DEFAULT_JOBS
+    transaction_mode: str = DEFAULT_TRANSACTION_MODE
+    commit_interval: int = DEFAULT_COMMIT_INTERVAL
+    disable_checks: bool = False
+    incremental: bool = False
+    upsert_window: int = DEFAULT_UPSERT_WINDOW
+    sync: bool = False
+    sync_chunk_size: int = DEFAULT_SYNC_CHUNK_SIZE
+    bulk_load: bool = False
+    bulk_load_size: int = DEFAULT_BULK_LOAD_SIZE
+    prepared_statements: bool = False
+    rebuild_indexes: bool = False
+    index_file: str | None = DEFAULT_INDEX_FILE
+    transform_workers: int = DEFAULT_TRANSFORM_WORKERS
+    consistent_snapshot: bool = False
+    partitions: int = DEFAULT_PARTITIONS
+    engine: str = DEFAULT_ENGINE
+    driver: str = DEFAULT_DRIVER
+    report_file: str | None = None
+    profile_file: str | None = None
+    checkpoint_file: str | None = None
+    resume: bool = False
+
+    def __post_init__(self) -> None:
+        """Validate option values."""
+        if not isinstance(self.batch_size, int) or self.batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        if not isinstance(self.fetch_size, int) or self.fetch_size < 1:
+            raise ValueError("fetch_size must be a positive integer")
+
+        if not isinstance(self.pool_size, int) or self.pool_size < 1:
+            raise ValueError("pool_size must be a positive integer")
+
+        if not isinstance(self.jobs, int) or self.jobs < 1:
+            raise ValueError("jobs must be a positive integer")
+
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ValueError(
+                f"transaction_mode must be one of: {', '.join(TRANSACTION_MODES)}"
+            )
+
+        if not isinstance(self.commit_interval, int) or self.commit_interval < 1:
+            raise ValueError("commit_interval must be a positive integer")
+
+        if not isinstance(self.upsert_window, int) or self.upsert_window < 0:
+            raise ValueError("upsert_window must be a non-negative integer")
+
+        if not isinstance(self.sync_chunk_size, int) or self.sync_chunk_size < 1:
+            raise ValueError("sync_chunk_size must be a positive integer")
+
+        if not isinstance(self.bulk_load_size, int) or self.bulk_load_size < 1:
+            raise ValueError("bulk_load_size must be a positive integer")
+
+        if not isinstance(self.transform_workers, int) or self.transform_workers < 0:
+            raise ValueError("transform_workers must be a non-negative integer")
+
+        if not isinstance(self.partitions, int) or self.partitions < 1:
+            raise ValueError("partitions must be a positive integer")
+
+        if self.engine not in ENGINES:
+            raise ValueError(f"engine must be one of: {', '.join(ENGINES)}")
+
+        if self.driver not in DRIVERS:
+            raise ValueError(f"driver must be one of: {', '.join(DRIVERS)}")
+
+        if self.prepared_statements and self.driver not in CONNECTOR_DRIVERS:
+            raise ValueError(
+                "Prepared statements are only supported by the mysql-connector "
+                "drivers"
+            )
+
+        if self.sync and self.incremental:
+            raise ValueError("The sync and incremental modes cannot be combined")
+
+        if self.resume and not self.checkpoint_file:
+            raise ValueError("Resuming a run requires a checkpoint_file")
+
+        # No checkpoint is written in the run transaction mode, as a
+        # failed run is rolled back completely
+        if self.resume and self.transaction_mode == "run":
+            raise ValueError("A run cannot be resumed with the run transaction mode")
+
+        if self.rebuild_indexes and (self.sync or self.incremental):
+            raise ValueError(
+                "Indexes can only be rebuilt for full transfers, not with the "
+                "sync or incremental modes"
+            )
+
+        if self.rebuild_indexes and not self.index_file:
+            raise ValueError("Rebuilding indexes requires an index_file")
+
+        # Rebuilding indexes implicitly commits the current transaction
+        if self.rebuild_indexes and self.transaction_mode == "run":
+            raise ValueError("Indexes cannot be rebuilt with the run transaction mode")
+
+        # A single transaction can only span a single destination connection
+        if self.transaction_mode == "run" and self.jobs > 1:
+            raise ValueError("The run transaction mode requires jobs to be 1")
+
+        # Only one cProfile profiler can be active at a time on Python 3.12
+        # and later, and each table is profiled on its own thread
+        if self.profile_file and self.jobs > 1:
+            raise ValueError("Profiling requires jobs to be 1")
+
+        # Ranges of a partitioned table are each written in their own
+        # transaction, committed once every range has been written
+        if self.partitions > 1 and self.transaction_mode != "table":
+            raise ValueError("Partitioned transfers require the table transaction mode")
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any] | None) -> "TransferOptions":
+        """Create transfer options from the application configuration.
+
+        Options not included in the configuration fall back to their
+        default values.
+        """
+        if not config:
+            return cls()
+
+        return cls(
+            batch_size=config.get("batch_size", DEFAULT_BATCH_SIZE),
+            fetch_size=config.get("fetch_size", DEFAULT_FETCH_SIZE),
+            pool_size=config.get("pool_size", DEFAULT_POOL_SIZE),
+            jobs=config.get("jobs", DEFAULT_JOBS),
+            transaction_mode=config.get("transaction_mode", DEFAULT_TRANSACTION_MODE),
+            commit_interval=config.get("commit_interval", DEFAULT_COMMIT_INTERVAL),
+            disable_checks=bool(config.get("disable_checks", False)),
+            incremental=bool(config.get("incremental", False)),
+            upsert_window=config.get("upsert_window", DEFAULT_UPSERT_WINDOW),
+            sync=bool(config.get("sync", False)),
+            sync_chunk_size=config.get("sync_chunk_size", DEFAULT_SYNC_CHUNK_SIZE),
+            bulk_load=bool(config.get("bulk_load", False)),
+            bulk_load_size=config.get("bulk_load_size", DEFAULT_BULK_LOAD_SIZE),
+            prepared_statements=bool(config.get("prepared_statements", False)),
+            rebuild_indexes=bool(config.get("rebuild_indexes", False)),
+            index_file=config.get("index_file", DEFAULT_INDEX_FILE),
+            transform_workers=config.get(
+                "transform_workers", DEFAULT_TRANSFORM_WORKERS
+            ),
+            consistent_snapshot=bool(config.get("consistent_snapshot", False)),
+            partitions=config.get("partitions", DEFAULT_PARTITIONS),
+            engine=config.get("engine", DEFAULT_ENGINE),
+            driver=config.get("driver", DEFAULT_DRIVER),
+            report_file=config.get("report_file"),
+            profile_file=config.get("profile_file"),
+            checkpoint_file=config.get("checkpoint_file"),
+        )
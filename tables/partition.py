@@ -0,0 +1,254 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Partitioned Table Transfers."""
+import contextvars
+import threading
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import ExitStack, contextmanager
+
+from mysql.connector.connection import MySQLConnection
+
+from tables import checkpoint, metrics
+from tables.connections import ConnectionPool
+from tables.incremental import first_new_id
+from tables.options import TransferOptions
+from tables.reader import start_consistent_snapshots
+from tables.spec import TableSpec
+from tables.table import SpecTable
+from tables.transactions import TransactionManager
+
+
+def primary_key_ranges(
+    first_id: int, last_id: int, partitions: int
+) -> list[tuple[int, int]]:
+    """Split primary key values into up to partitions ranges.
+
+    Ranges are inclusive, do not overlap and are of equal width, apart
+    from the last range, which may be narrower.
+    """
+    if partitions < 1:
+        raise ValueError("partitions must be a positive integer")
+
+    if last_id < first_id:
+        return []
+
+    width = (last_id - first_id) // partitions + 1
+    return [
+        (start, min(start + width - 1, last_id))
+        for start in range(first_id, last_id + 1, width)
+    ]
+
+
+def _source_bounds(
+    database_connection: MySQLConnection, spec: TableSpec, start_id: int
+) -> tuple[int, int] | None:
+    """Return the lowest and highest primary key values to transfer."""
+    condition = f"AND ({spec.source_filter})" if spec.source_filter else ""
+    cursor = database_connection.cursor()
+    cursor.execute(
+        f"""
+        SELECT MIN({spec.primary_key}), MAX({spec.primary_key})
+        FROM {spec.source_table}
+        WHERE {spec.primary_key} >= %s {condition};
+        """,
+        (start_id,),
+    )
+    result = cursor.fetchone()
+    cursor.close()
+
+    if not result or result[0] is None:
+        return None
+
+    return int(result[0]), int(result[1])
+
+
+def _committed_id(
+    database_connection: MySQLConnection, spec: TableSpec, first_id: int, last_id: int
+) -> int | None:
+    """Return the highest primary key value of a range already written."""
+    cursor = database_connection.cursor()
+    cursor.execute(
+        f"""
+        SELECT MAX({spec.primary_key})
+        FROM {spec.destination_table}
+        WHERE {spec.primary_key} BETWEEN %s AND %s;
+        """,
+        (first_id, last_id),
+    )
+    result = cursor.fetchone()
+    cursor.close()
+
+    if not result or result[0] is None:
+        return None
+
+    return int(result[0])
+
+
+@contextmanager
+def _consistent_snapshots(
+    coordinator: MySQLConnection,
+    database_connections: Sequence[MySQLConnection],
+    table: str,
+) -> Iterator[None]:
+    """Read a table from the same snapshot on several connections.
+
+    The transactions are ended when the block exits.
+    """
+    start_consistent_snapshots(coordinator, database_connections, (table,))
+    try:
+        yield
+    finally:
+        for database_connection in database_connections:
+            if database_connection.is_connected():
+                database_connection.rollback()
+
+
+def _transfer_range(
+    table_class: type[SpecTable],
+    options: TransferOptions,
+    source_connection: MySQLConnection,
+    destination_pool: ConnectionPool,
+    transaction_manager: TransactionManager,
+    first_id: int,
+    last_id: int,
+    barrier: threading.Barrier,
+    resuming: bool,
+) -> None:
+    """Transfer a single primary key range on its own connection pair."""
+    with (
+        checkpoint.untracked(),
+        destination_pool.connection() as destination_connection,
+        metrics.record_partition(source_connection, destination_connection),
+    ):
+        table = table_class(
+            source_database_connection=source_connection,
+            destination_database_connection=destination_connection,
+            options=options,
+        )
+        try:
+            with transaction_manager.table(destination_connection):
+                if resuming:
+                    # Rows of each range are written in primary key order,
+                    # so every row up to the highest one already in the
+                    # destination table has been committed
+                    committed_id = _committed_id(
+                        destination_connection, table.spec, first_id, last_id
+                    )
+                    if committed_id is not None:
+                        first_id = committed_id + 1
+
+                table.load(table.read(first_id, last_id))
+
+                # Only commit once every range has been written. The
+                # ranges are then committed one after another, so a
+                # failed commit does not undo ranges already committed
+                barrier.wait()
+        except BaseException:
+            barrier.abort()
+            raise
+
+
+def transfer_partitioned(
+    table: SpecTable,
+    source_pool: ConnectionPool,
+    destination_pool: ConnectionPool,
+    transaction_manager: TransactionManager,
+    partitions: int,
+) -> None:
+    """Transfer a table as primary key ranges in parallel.
+
+    The primary key values of the rows to transfer are split into up to
+    partitions ranges of equal width, using the lowest and highest
+    values in the source table. Each range is read on its own source
+    connection and written on its own destination connection, on its
+    own thread. Unless the source pool already reads from a run-wide
+    snapshot, the source connections share a consistent snapshot of the
+    table, started while the table is locked for reading on the table's
+    own source connection.
+
+    Each range is written in a single transaction, which requires the
+    ``table`` transaction mode. If any range fails before every range
+    has been written, every range is rolled back. Otherwise, the ranges
+    are committed one after another on their own connections, so the
+    commits are not atomic: if one fails, ranges already committed are
+    kept. Commits are not recorded in the checkpoint, as rows are
+    committed out of primary key order; when resuming, each range
+    continues after the highest primary key value already in the
+    destination table instead.
+
+    :param table: Table to transfer, with the source and destination
+        connections used to coordinate the transfer
+    :param source_pool: Pool the source connection of each range is
+        taken from
+    :param destination_pool: Pool the destination connection of each
+        range is taken from
+    :param transaction_manager: Transaction manager used to commit each
+        range
+    :param partitions: Maximum number of ranges
+    """
+    spec = table.spec
+    options = table.options
+    start_id = first_new_id(
+        database_connection=table.destination_database_connection,
+        table=spec.destination_table,
+        column=spec.primary_key,
+        options=options,
+    )
+    resuming = checkpoint.current() is not None
+
+    with ExitStack() as stack:
+        source_connections = [
+            stack.enter_context(source_pool.connection()) for _ in range(partitions)
+        ]
+        # Connections of a pool reading from a run-wide snapshot already
+        # share the same view of every table
+        if not source_pool.snapshot:
+            stack.enter_context(
+                _consistent_snapshots(
+                    table.source_database_connection,
+                    source_connections,
+                    spec.source_table,
+                )
+            )
+
+        bounds = _source_bounds(source_connections[0], spec, start_id)
+        if bounds is None:
+            return
+
+        ranges = primary_key_ranges(bounds[0], bounds[1], partitions)
+        barrier = threading.Barrier(len(ranges))
+        with ThreadPoolExecutor(
+            max_workers=len(ranges), thread_name_prefix=f"backport-{spec.name}"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    _transfer_range,
+                    type(table),
+                    options,
+                    source_connection,
+                    destination_pool,
+                    transaction_manager,
+                    first_id,
+                    last_id,
+                    barrier,
+                    resuming,
+                )
+                for source_connection, (first_id, last_id) in zip(
+                    source_connections[: len(ranges)], ranges, strict=True
+                )
+            ]
+            wait(futures)
+
+        # Raise the error that caused the other ranges to be rolled back
+        errors = [future.exception() for future in futures if future.exception()]
+        for error in errors:
+            if not isinstance(error, threading.BrokenBarrierError):
+                raise error
+
+        if errors:
+            raise errors[0]
@@ -0,0 +1,121 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Streaming Source Reader."""
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+from mysql.connector.connection import MySQLConnection
+
+from tables import metrics
+from tables.options import DEFAULT_FETCH_SIZE
+
+
+def read_chunks(
+    database_connection: MySQLConnection,
+    query: str,
+    parameters: Sequence[Any] | None = None,
+    fetch_size: int = DEFAULT_FETCH_SIZE,
+    dictionary: bool = True,
+) -> Iterator[list[dict[str, Any]] | list[tuple[Any, ...]]]:
+    """Stream the results of a query in chunks of up to fetch_size rows.
+
+    An unbuffered cursor is used so that rows are pulled from the server
+    as each chunk is requested, rather than materializing the entire
+    result set in memory before the first row is returned. Time spent
+    waiting on the source database is added to the metrics of the
+    current table.
+
+    Rows are returned as dictionaries keyed by column name, or as
+    tuples in the order of the selected columns if dictionary is False,
+    which avoids building a dictionary for every row.
+    """
+    if fetch_size < 1:
+        raise ValueError("fetch_size must be a positive integer")
+
+    table_metrics = metrics.current()
+    cursor = database_connection.cursor(dictionary=dictionary, buffered=False)
+    exhausted = False
+    try:
+        start_time = time.perf_counter()
+        cursor.execute(query, parameters)
+        while True:
+            rows = cursor.fetchmany(size=fetch_size)
+            if table_metrics:
+                table_metrics.read_time += time.perf_counter() - start_time
+                table_metrics.rows_read += len(rows)
+                table_metrics.chunks_read += 1 if rows else 0
+
+            if not rows:
+                exhausted = True
+                return
+
+            yield rows
+            start_time = time.perf_counter()
+    finally:
+        # Unread rows must be drained before the connection can be used
+        # again if the consumer stops iterating part way through
+        if not exhausted and database_connection.unread_result:
+            database_connection.consume_results()
+
+        cursor.close()
+
+
+def read_rows(
+    database_connection: MySQLConnection,
+    query: str,
+    parameters: Sequence[Any] | None = None,
+    fetch_size: int = DEFAULT_FETCH_SIZE,
+    dictionary: bool = True,
+) -> Iterator[dict[str, Any] | tuple[Any, ...]]:
+    """Stream the results of a query one row at a time.
+
+    Rows are fetched from the server in chunks of up to fetch_size rows,
+    bounding memory use by the chunk size instead of the table size.
+    """
+    for chunk in read_chunks(
+        database_connection=database_connection,
+        query=query,
+        parameters=parameters,
+        fetch_size=fetch_size,
+        dictionary=dictionary,
+    ):
+        yield from chunk
+
+
+def start_consistent_snapshots(
+    coordinator: MySQLConnection,
+    database_connections: Iterable[MySQLConnection],
+    tables: Sequence[str],
+) -> None:
+    """Start read-only transactions sharing the same view of tables.
+
+    MySQL cannot share a snapshot between sessions, so the tables are
+    locked for reading on the coordinator connection while a consistent
+    snapshot transaction is started on each connection. As no write to
+    the tables can be committed between the first and the last
+    snapshot, every connection reads the tables as they were at the
+    same moment. The lock is released as soon as every transaction has
+    started. The coordinator must be a separate connection, and the
+    LOCK TABLES privilege is required on the tables.
+
+    :param coordinator: Connection used to lock the tables
+    :param database_connections: Connections to start transactions on,
+        which must not already be in a transaction
+    :param tables: Names of the tables read within the transactions
+    """
+    cursor = coordinator.cursor()
+    cursor.execute(f"LOCK TABLES {', '.join(f'{table} READ' for table in tables)};")
+    try:
+        for database_connection in database_connections:
+            database_connection.start_transaction(
+                consistent_snapshot=True,
+                isolation_level="REPEATABLE READ",
+                readonly=True,
+            )
+    finally:
+        cursor.execute("UNLOCK TABLES;")
+        cursor.close()
@@ -0,0 +1,511 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Parallel Transfer Scheduler."""
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from mysql.connector.connection import MySQLConnection
+
+from tables.checkpoint import Checkpoint, checkpoint_key, track_table
+from tables.connections import ConnectionManager, ConnectionPool
+from tables.fanout import FanOutRows, fan_out
+from tables.indexes import deferred_indexes
+from tables.metrics import (
+    RunReport,
+    record_destination,
+    record_skipped,
+    record_table,
+)
+from tables.options import TransferOptions
+from tables.partition import transfer_partitioned
+from tables.snapshot import SnapshotReader, SnapshotWriter
+from tables.sync import SyncDeletes
+from tables.transactions import TransactionManager
+
+
+@dataclass(frozen=True)
+class TransferTask:
+    """Wait Wait Stats Database Backport Transfer Task.
+
+    :param name: Unique name of the task
+    :param table_class: Table class used to transfer the data, which
+        must accept source and destination database connections and
+        transfer options as keyword arguments and provide transfer,
+        sync, read and load methods
+    :param dependencies: Names of tasks that must complete before this
+        task can be started, typically the tables referenced by this
+        table's foreign keys
+    """
+
+    name: str
+    table_class: type
+    dependencies: tuple[str, ...] = ()
+
+    @classmethod
+    def from_table(cls, table_class: type) -> "TransferTask":
+        """Create a task for a table class using its table specification."""
+        return cls(
+            name=table_class.spec.name,
+            table_class=table_class,
+            dependencies=table_class.spec.dependencies,
+        )
+
+
+def dependency_order(tasks: Sequence[TransferTask]) -> list[TransferTask]:
+    """Return tasks ordered so that each task follows its dependencies.
+
+    Tasks that do not depend on each other keep the order they are
+    listed in.
+    """
+    # Kahn's algorithm; any tasks left over are part of a cycle
+    remaining = {task.name: set(task.dependencies) for task in tasks}
+    ordered: list[TransferTask] = []
+    while remaining:
+        ready = [name for name, dependencies in remaining.items() if not dependencies]
+        if not ready:
+            raise ValueError(
+                "Transfer task dependencies contain a cycle: "
+                + ", ".join(sorted(remaining))
+            )
+
+        for name in ready:
+            del remaining[name]
+
+        for dependencies in remaining.values():
+            dependencies.difference_update(ready)
+
+        ordered.extend(task for task in tasks if task.name in ready)
+
+    return ordered
+
+
+def validate_tasks(tasks: Sequence[TransferTask]) -> None:
+    """Check that task names are unique and dependencies form a DAG."""
+    names = [task.name for task in tasks]
+    if len(names) != len(set(names)):
+        raise ValueError("Transfer task names must be unique")
+
+    for task in tasks:
+        for dependency in task.dependencies:
+            if dependency not in names:
+                raise ValueError(
+                    f"Transfer task {task.name} depends on unknown task {dependency}"
+                )
+
+    dependency_order(tasks)
+
+
+def delete_synced_rows(
+    tasks: Sequence[TransferTask],
+    destination_pool: ConnectionPool,
+    options: TransferOptions,
+    transaction_manager: TransactionManager,
+    deletes: SyncDeletes,
+    destination: str | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> None:
+    """Delete rows collected while syncing tables to a destination.
+
+    Tables are processed in reverse dependency order, so rows are only
+    deleted once the rows referencing them have been updated or
+    deleted. If a checkpoint is provided, each synced table is recorded
+    as completed once its rows have been deleted.
+    """
+    with destination_pool.connection() as destination_connection:
+        for task in reversed(dependency_order(tasks)):
+            keys = deletes.pop(task.table_class.spec.destination_table)
+            if keys:
+                table = task.table_class(
+                    destination_database_connection=destination_connection,
+                    options=options,
+                )
+                with transaction_manager.table(destination_connection):
+                    table.delete(keys)
+
+            if checkpoint:
+                checkpoint.complete(checkpoint_key(task.name, destination))
+
+
+def _export_task(
+    task: TransferTask,
+    connection_manager: ConnectionManager,
+    options: TransferOptions,
+    snapshot: SnapshotWriter,
+    report: RunReport | None = None,
+) -> None:
+    """Export a single table to a snapshot using a source connection."""
+    with connection_manager.source_pool.connection() as source_connection:
+        table = task.table_class(
+            source_database_connection=source_connection, options=options
+        )
+        with record_table(
+            name=task.name,
+            source_connection=source_connection,
+            destination_connection=None,
+            report=report,
+            mode="export",
+            profile=options.profile_file is not None,
+        ) as table_metrics:
+            table_metrics.rows_written = snapshot.write_table(task.name, table.read())
+
+
+def _import_task(
+    task: TransferTask,
+    destination_pool: ConnectionPool,
+    options: TransferOptions,
+    transaction_manager: TransactionManager,
+    snapshot: SnapshotReader,
+    report: RunReport | None = None,
+    destination: str | None = None,
+) -> None:
+    """Import a single table from a snapshot using a destination connection."""
+    with destination_pool.connection() as destination_connection:
+        table = task.table_class(
+            destination_database_connection=destination_connection, options=options
+        )
+        with (
+            record_table(
+                name=task.name,
+                source_connection=None,
+                destination_connection=destination_connection,
+                report=report,
+                mode="import",
+                profile=options.profile_file is not None,
+                destination=destination,
+            ) as table_metrics,
+            deferred_indexes(
+                destination_connection,
+                table.spec.destination_table,
+                options.rebuild_indexes,
+                options.index_file,
+            ),
+        ):
+            with transaction_manager.table(destination_connection):
+                table.load(snapshot.read_table(task.name))
+                commit_start_time = time.perf_counter()
+
+            table_metrics.rows_read = table_metrics.rows_written
+            table_metrics.write_time += time.perf_counter() - commit_start_time
+
+
+def transfer_task(
+    task: TransferTask,
+    source_pool: ConnectionPool,
+    destination_pool: ConnectionPool,
+    options: TransferOptions,
+    transaction_manager: TransactionManager,
+    report: RunReport | None = None,
+    destination: str | None = None,
+    checkpoint: Checkpoint | None = None,
+    deletes: SyncDeletes | None = None,
+    read_ahead: Callable[[Any], AbstractContextManager[None]] | None = None,
+) -> None:
+    """Transfer or sync a single table on its own connection pair.
+
+    If a checkpoint is provided, tables it records as completed are
+    skipped and the progress of the table is recorded in it. Synced
+    tables are only recorded as completed once their rows have been
+    deleted by delete_synced_rows.
+
+    If read_ahead is provided, it is called with the table and the
+    context manager it returns wraps a full or incremental transfer
+    that is not partitioned, such as to read rows ahead of the writes
+    on another thread.
+    """
+    mode = "sync" if options.sync else "transfer"
+    if checkpoint and checkpoint.completed(checkpoint_key(task.name, destination)):
+        record_skipped(task.name, report, mode, destination)
+        return
+
+    with (
+        source_pool.connection() as source_connection,
+        destination_pool.connection() as destination_connection,
+    ):
+        table = task.table_class(
+            source_database_connection=source_connection,
+            destination_database_connection=destination_connection,
+            options=options,
+        )
+        with (
+            record_table(
+                name=task.name,
+                source_connection=source_connection,
+                destination_connection=destination_connection,
+                report=report,
+                mode=mode,
+                profile=options.profile_file is not None,
+                destination=destination,
+            ) as table_metrics,
+            track_table(
+                None if options.sync else checkpoint,
+                task.name,
+                table.spec.primary_key,
+                destination,
+            ),
+            deferred_indexes(
+                destination_connection,
+                table.spec.destination_table,
+                options.rebuild_indexes,
+                options.index_file,
+            ),
+        ):
+            with transaction_manager.table(destination_connection):
+                if options.sync:
+                    table_metrics.sync = asdict(table.sync(deletes))
+                elif options.partitions > 1 and table.spec.partitioned:
+                    transfer_partitioned(
+                        table,
+                        source_pool,
+                        destination_pool,
+                        transaction_manager,
+                        options.partitions,
+                    )
+                else:
+                    with read_ahead(table) if read_ahead else nullcontext():
+                        table.transfer()
+
+                commit_start_time = time.perf_counter()
+
+            # Include the commit at the end of the table in the write time
+            table_metrics.write_time += time.perf_counter() - commit_start_time
+
+
+def _fan_out_task(
+    task: TransferTask,
+    connection_manager: ConnectionManager,
+    options: TransferOptions,
+    transaction_manager: TransactionManager,
+    report: RunReport | None = None,
+) -> None:
+    """Transfer a single table to every destination in parallel.
+
+    Rows are read and transformed once using the source connection and
+    written to each destination database by its own thread. If writing
+    to any destination fails, the table is rolled back on every
+    destination.
+    """
+
+    def loader(
+        destination_connection: MySQLConnection, destination: str
+    ) -> Callable[[FanOutRows], None]:
+        table = task.table_class(
+            destination_database_connection=destination_connection, options=options
+        )
+
+        def load(rows: FanOutRows) -> None:
+            with (
+                record_destination(destination),
+                deferred_indexes(
+                    destination_connection,
+                    table.spec.destination_table,
+                    options.rebuild_indexes,
+                    options.index_file,
+                ),
+                transaction_manager.table(destination_connection),
+            ):
+                table.load(rows)
+
+                # Only commit once every destination has written the table
+                rows.wait()
+
+        return load
+
+    with connection_manager.fan_out_connections() as (
+        source_connection,
+        destination_connections,
+    ):
+        table = task.table_class(
+            source_database_connection=source_connection, options=options
+        )
+        with record_table(
+            name=task.name,
+            source_connection=source_connection,
+            destination_connection=None,
+            report=report,
+            mode="transfer",
+            profile=options.profile_file is not None,
+        ):
+            fan_out(
+                rows=table.read(),
+                consumers=[
+                    loader(destination_connection, destination_pool.name)
+                    for destination_connection, destination_pool in zip(
+                        destination_connections, connection_manager.destination_pools
+                    )
+                ],
+                chunk_size=options.fetch_size,
+            )
+
+
+def _run_task(
+    task: TransferTask,
+    connection_manager: ConnectionManager,
+    options: TransferOptions,
+    transaction_manager: TransactionManager,
+    report: RunReport | None = None,
+    snapshot: SnapshotReader | SnapshotWriter | None = None,
+    checkpoint: Checkpoint | None = None,
+    deletes: dict[str, SyncDeletes] | None = None,
+) -> None:
+    """Run a single transfer task.
+
+    With more than one destination database, full transfers read the
+    source table once and write to every destination in parallel, while
+    incremental transfers, syncs, checkpointed transfers and snapshot
+    imports are run for each destination in turn, as each destination
+    needs its own starting point or comparison.
+    """
+    if isinstance(snapshot, SnapshotWriter):
+        _export_task(task, connection_manager, options, snapshot, report)
+        return
+
+    destination_pools = connection_manager.destination_pools
+    multiple_destinations = len(destination_pools) > 1
+    if isinstance(snapshot, SnapshotReader):
+        for destination_pool in destination_pools:
+            _import_task(
+                task,
+                destination_pool,
+                options,
+                transaction_manager,
+                snapshot,
+                report,
+                destination_pool.name if multiple_destinations else None,
+            )
+
+        return
+
+    if multiple_destinations and not (
+        options.incremental or options.sync or checkpoint
+    ):
+        _fan_out_task(task, connection_manager, options, transaction_manager, report)
+        return
+
+    for destination_pool in destination_pools:
+        transfer_task(
+            task,
+            connection_manager.source_pool,
+            destination_pool,
+            options,
+            transaction_manager,
+            report,
+            destination_pool.name if multiple_destinations else None,
+            checkpoint,
+            deletes[destination_pool.name] if deletes is not None else None,
+        )
+
+
+def run_tasks(
+    tasks: Sequence[TransferTask],
+    connection_manager: ConnectionManager,
+    options: TransferOptions,
+    jobs: int = 1,
+    transaction_manager: TransactionManager | None = None,
+    report: RunReport | None = None,
+    snapshot: SnapshotReader | SnapshotWriter | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> None:
+    """Run transfer tasks concurrently while honoring their dependencies.
+
+    Each task is started as soon as all of its dependencies have
+    completed, with at most jobs tasks running at once. Ready tasks are
+    started in the order they are listed. If a task fails, no further
+    tasks are started and the first exception is raised once all
+    running tasks have finished. If a report is provided, metrics for
+    each task are added to it.
+
+    If a snapshot writer is provided, each table is exported to the
+    snapshot instead of being transferred, and if a snapshot reader is
+    provided, each table is imported from the snapshot.
+
+    If a checkpoint is provided, tables it records as completed are
+    skipped, partially transferred tables continue after their last
+    committed row and the progress of each table is recorded in it.
+    Checkpoints are not used when exporting or importing snapshots.
+
+    When syncing, rows that no longer exist in the source database are
+    deleted once every table has been synced, in reverse dependency
+    order.
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be a positive integer")
+
+    validate_tasks(tasks)
+    transaction_manager = transaction_manager or TransactionManager(
+        mode=options.transaction_mode, disable_checks=options.disable_checks
+    )
+
+    # Rows to delete from each destination database once every table
+    # has been synced
+    deletes: dict[str, SyncDeletes] | None = None
+    if options.sync and snapshot is None:
+        deletes = {
+            destination_pool.name: SyncDeletes()
+            for destination_pool in connection_manager.destination_pools
+        }
+
+    pending: list[TransferTask] = list(tasks)
+    completed: set[str] = set()
+    running: dict[Future, TransferTask] = {}
+    failure: BaseException | None = None
+
+    with ThreadPoolExecutor(
+        max_workers=jobs, thread_name_prefix="backport"
+    ) as executor:
+        while pending or running:
+            if failure is None:
+                for task in list(pending):
+                    if len(running) >= jobs:
+                        break
+
+                    if completed.issuperset(task.dependencies):
+                        pending.remove(task)
+                        future = executor.submit(
+                            _run_task,
+                            task,
+                            connection_manager,
+                            options,
+                            transaction_manager,
+                            report,
+                            snapshot,
+                            checkpoint,
+                            deletes,
+                        )
+                        running[future] = task
+            else:
+                pending.clear()
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                exception = future.exception()
+                if exception is None:
+                    completed.add(task.name)
+                elif failure is None:
+                    failure = exception
+
+    if failure is not None:
+        raise failure
+
+    if deletes is not None:
+        multiple_destinations = len(connection_manager.destination_pools) > 1
+        for destination_pool in connection_manager.destination_pools:
+            delete_synced_rows(
+                tasks,
+                destination_pool,
+                options,
+                transaction_manager,
+                deletes[destination_pool.name],
+                destination_pool.name if multiple_destinations else None,
+                checkpoint,
+            )
@@ -4,104 +4,146 @@
 #
 # vim: set noai syntax=python ts=4 sw=4:
 """Wait Wait Stats Database Backport: Shows Table."""
+from collections.abc import Iterable, Sequence
 from typing import Any
 
-from mysql.connector import connect
-from mysql.connector.connection import MySQLConnection
+from tables import checkpoint, metrics
+from tables.incremental import first_new_id
+from tables.spec import SHOWS
+from tables.table import SpecTable
+from tables.writer import create_writer
 
 
-class Shows:
+class Shows(SpecTable):
     """Wait Wait Stats Database Shows Table.
 
     This class contains database methods used to process and transfer
     data from the latest version of the Wait Wait Stats Database to
     a database set up for version 3.0.
-
-    :param connect_dict: Dictionary containing database connection
-        settings as required by mysql.connector.connect
-    :param database_connection: mysql.connector.connect database
-        connection
     """
 
-    def __init__(
-        self,
-        source_connect_dict: dict[str, Any] | None = None,
-        destination_connect_dict: dict[str, Any] | None = None,
-        source_database_connection: MySQLConnection | None = None,
-        destination_database_connection: MySQLConnection | None = None,
-    ) -> None:
-        """Class initialization method."""
-        if source_connect_dict and destination_connect_dict:
-            self.source_connect_dict = source_connect_dict
-            self.destination_connect_dict = destination_connect_dict
-
-            self.source_database_connection = connect(**source_connect_dict)
-            self.destination_database_connection = connect(**destination_connect_dict)
-        elif source_database_connection and destination_database_connection:
-            if not source_database_connection.is_connected():
-                source_database_connection.reconnect()
+    spec = SHOWS
 
-            if not destination_database_connection.is_connected():
-                destination_database_connection.reconnect()
+    def _update_repeat_shows(self, repeat_shows: list[tuple[int, int]]) -> None:
+        """Set repeatshowid for shows using batched UPDATE statements.
 
-            self.source_database_connection = source_database_connection
-            self.destination_database_connection = destination_database_connection
+        :param repeat_shows: List of (showid, repeatshowid) tuples
+        """
+        cursor = self.destination_database_connection.cursor()
+        batch_size = self.options.batch_size
+        for index in range(0, len(repeat_shows), batch_size):
+            batch = repeat_shows[index : index + batch_size]
+            cases = " ".join(["WHEN %s THEN %s"] * len(batch))
+            placeholders = ", ".join(["%s"] * len(batch))
+            query = f"""
+                UPDATE ww_shows
+                SET repeatshowid = CASE showid {cases} END
+                WHERE showid IN ({placeholders});
+            """
+            parameters = [value for repeat_show in batch for value in repeat_show]
+            parameters.extend(show_id for show_id, _ in batch)
+            with metrics.record_write():
+                cursor.execute(query, parameters)
 
-    def __str__(self):
-        pass
+        cursor.close()
 
-    def transfer(self) -> None:
-        """Process and transfer data from source to destination databases."""
-        source_cursor = self.source_database_connection.cursor(dictionary=True)
+    def load(
+        self,
+        rows: Iterable[tuple[Any, ...]],
+        first_id: int = 0,
+        upsert_columns: Sequence[str] | None = None,
+    ) -> None:
+        """Write rows of destination values to the destination database.
 
-        query = """
-            SELECT showid, showdate, repeatshowid, bestof, bestofuniquebluff
-            FROM ww_shows
-            ORDER BY showid ASC;
+        :param rows: Rows of destination values, in showid order
+        :param first_id: Shows with an ID lower than first_id already
+            exist in the destination database
+        :param upsert_columns: If set, existing shows have these columns
+            updated
         """
-        source_cursor.execute(query)
-        source_data = source_cursor.fetchall()
-        source_cursor.close()
+        # Shows are inserted in showid order, so repeatshowid can be set
+        # in the initial insert when the original show has already been
+        # written (InnoDB checks foreign keys row by row, including rows
+        # earlier in the same multi-row INSERT). Any remaining repeat
+        # shows are set afterwards in batches due to the constraint.
+        written_show_ids: set[int] = set()
+        deferred_repeat_shows: list[tuple[int, int]] = []
+        with create_writer(
+            database_connection=self.destination_database_connection,
+            table=self.spec.destination_table,
+            columns=self.spec.columns,
+            options=self.options,
+            upsert_columns=upsert_columns,
+        ) as writer:
+            for show_id, show_date, repeat_show_id, best_of, unique_bluff in rows:
+                if repeat_show_id and not (
+                    repeat_show_id < first_id or repeat_show_id in written_show_ids
+                ):
+                    deferred_repeat_shows.append((show_id, repeat_show_id))
+                    repeat_show_id = None
+
+                writer.add((show_id, show_date, repeat_show_id, best_of, unique_bluff))
+                written_show_ids.add(show_id)
+
+        if deferred_repeat_shows:
+            self._update_repeat_shows(deferred_repeat_shows)
+
+    def delete(self, keys: Sequence[Any]) -> int:
+        """Delete shows from the destination database by showid.
+
+        Returns the number of shows deleted.
+
+        :param keys: IDs of the shows to delete
+        """
+        # Shows being deleted can be repeats of each other, so their
+        # repeatshowid is cleared first due to the constraint
+        cursor = self.destination_database_connection.cursor()
+        batch_size = self.options.batch_size
+        for index in range(0, len(keys), batch_size):
+            batch = keys[index : index + batch_size]
+            placeholders = ", ".join(["%s"] * len(batch))
+            with metrics.record_write():
+                cursor.execute(
+                    f"""
+                    UPDATE ww_shows SET repeatshowid = NULL
+                    WHERE showid IN ({placeholders}) AND repeatshowid IS NOT NULL;
+                    """,
+                    tuple(batch),
+                )
 
-        if not source_data:
-            return
+        cursor.close()
+        return super().delete(keys)
 
-        destination_cursor = self.destination_database_connection.cursor(
-            dictionary=True
+    def transfer(self) -> None:
+        """Process and transfer data from source to destination databases."""
+        # Shows with an ID lower than first_id already exist in the
+        # destination database and can be referenced by repeat shows
+        first_id = first_new_id(
+            database_connection=self.destination_database_connection,
+            table=self.spec.destination_table,
+            column=self.spec.primary_key,
+            options=self.options,
         )
 
-        # Loop through all show entries, but do not fill in repeatshowid
-        # column due to constraint
-        for show in source_data:
-            query = """
-                INSERT INTO ww_shows (showid, showdate, bestof, bestofuniquebluff)
-                VALUES (%s, %s, %s, %s);
-            """
-            destination_cursor.execute(
-                query,
-                (
-                    show["showid"],
-                    show["showdate"],
-                    show["bestof"],
-                    show["bestofuniquebluff"],
-                ),
-            )
-
-        # Loop through show entries and only update existing rows to set
-        # repeatshowid if not None
-        for show in source_data:
-            if show["repeatshowid"]:
-                query = """
-                    UPDATE ww_shows SET repeatshowid = %s
-                    WHERE showid = %s;
-                """
-                destination_cursor.execute(
-                    query,
-                    (
-                        show["repeatshowid"],
-                        show["showid"],
-                    ),
-                )
+        progress = checkpoint.current()
+
+        # For incremental transfers, the most recent shows that already
+        # exist in the destination are also re-read and upserted to pick
+        # up any changes made after they were last transferred
+        if self.options.incremental:
+            start_id = max(first_id - self.options.upsert_window, 0)
+            upsert_columns = ("showdate", "repeatshowid", "bestof", "bestofuniquebluff")
+        elif progress and self.options.resume:
+            # When resuming, shows already committed may still be missing
+            # a deferred repeatshowid, so every show is re-read and the
+            # existing shows are upserted
+            start_id = 0
+            first_id = self.committed_id() + 1
+            upsert_columns = ("showdate", "repeatshowid", "bestof", "bestofuniquebluff")
+        else:
+            start_id = first_id
+            upsert_columns = None
+
+        self.load(self.read(start_id), first_id=first_id, upsert_columns=upsert_columns)
 
-        destination_cursor.close()
         return
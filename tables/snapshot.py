@@ -0,0 +1,269 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Offline Snapshots.
+
+A snapshot is a directory containing one gzip compressed file per
+table and a ``manifest.json`` file. Each table file contains rows of
+destination values, ready to be loaded into the destination database,
+stored as length-prefixed binary records. Each value is written as a
+one byte type tag followed by its payload. The manifest records the
+format version, the number of rows in each file and a SHA-256 checksum
+of the uncompressed records, which is verified before each table is
+imported.
+"""
+import datetime
+import decimal
+import gzip
+import hashlib
+import json
+import struct
+import threading
+import zlib
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+SNAPSHOT_FORMAT: str = "wwdtm_database_backport snapshot"
+SNAPSHOT_VERSION: int = 1
+MANIFEST_FILE: str = "manifest.json"
+
+_LENGTH = struct.Struct(">I")
+_INTEGER = struct.Struct(">q")
+_FLOAT = struct.Struct(">d")
+_DATE = struct.Struct(">i")
+_WRITE_BUFFER_SIZE: int = 65536
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing, incompatible or corrupt."""
+
+
+def _encode_text(tag: bytes, value: bytes) -> bytes:
+    """Encode a length-prefixed value."""
+    return tag + _LENGTH.pack(len(value)) + value
+
+
+def encode_row(row: Sequence[Any]) -> bytes:
+    """Encode a row of values as a length-prefixed binary record."""
+    fields = bytearray()
+    for value in row:
+        if value is None:
+            fields += b"N"
+        elif isinstance(value, str):
+            fields += _encode_text(b"s", value.encode(encoding="utf-8"))
+        elif isinstance(value, int):
+            fields += b"i" + _INTEGER.pack(int(value))
+        elif isinstance(value, datetime.datetime):
+            fields += _encode_text(b"t", value.isoformat().encode(encoding="ascii"))
+        elif isinstance(value, datetime.date):
+            fields += b"d" + _DATE.pack(value.toordinal())
+        elif isinstance(value, float):
+            fields += b"f" + _FLOAT.pack(value)
+        elif isinstance(value, decimal.Decimal):
+            fields += _encode_text(b"m", str(value).encode(encoding="ascii"))
+        elif isinstance(value, bytes | bytearray):
+            fields += _encode_text(b"b", bytes(value))
+        else:
+            raise TypeError(f"Unsupported snapshot value type: {type(value).__name__}")
+
+    return _LENGTH.pack(len(fields)) + bytes(fields)
+
+
+def decode_record(record: bytes) -> tuple[Any, ...]:
+    """Decode a binary record, without its length prefix, into a row."""
+    values: list[Any] = []
+    offset = 0
+    length = len(record)
+    while offset < length:
+        tag = record[offset : offset + 1]
+        offset += 1
+        if tag == b"N":
+            values.append(None)
+        elif tag == b"i":
+            values.append(_INTEGER.unpack_from(record, offset)[0])
+            offset += _INTEGER.size
+        elif tag == b"d":
+            ordinal = _DATE.unpack_from(record, offset)[0]
+            values.append(datetime.date.fromordinal(ordinal))
+            offset += _DATE.size
+        elif tag == b"f":
+            values.append(_FLOAT.unpack_from(record, offset)[0])
+            offset += _FLOAT.size
+        elif tag in (b"s", b"t", b"m", b"b"):
+            size = _LENGTH.unpack_from(record, offset)[0]
+            offset += _LENGTH.size
+            payload = record[offset : offset + size]
+            offset += size
+            if tag == b"s":
+                values.append(payload.decode(encoding="utf-8"))
+            elif tag == b"t":
+                values.append(datetime.datetime.fromisoformat(payload.decode()))
+            elif tag == b"m":
+                values.append(decimal.Decimal(payload.decode()))
+            else:
+                values.append(payload)
+        else:
+            raise SnapshotError(f"Unknown snapshot value type tag: {tag!r}")
+
+    return tuple(values)
+
+
+class SnapshotWriter:
+    """Wait Wait Stats Database Backport Snapshot Writer.
+
+    Writes tables into a snapshot directory. Tables can be written
+    concurrently from multiple threads. The manifest is written when
+    the writer is closed after all tables were written successfully, so
+    an incomplete snapshot cannot be imported.
+
+    :param directory: Path of the snapshot directory, which is created
+        if it does not exist
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        """Class initialization method."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.tables: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        # Remove the manifest of any previous snapshot in the directory
+        (self.directory / MANIFEST_FILE).unlink(missing_ok=True)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+
+    def write_table(self, name: str, rows: Iterable[Sequence[Any]]) -> int:
+        """Write rows of destination values for a table.
+
+        Returns the number of rows written.
+        """
+        file_name = f"{name}.bin.gz"
+        checksum = hashlib.sha256()
+        row_count = 0
+        buffer = bytearray()
+        with gzip.open(self.directory / file_name, mode="wb") as table_file:
+            for row in rows:
+                buffer += encode_row(row)
+                row_count += 1
+                if len(buffer) >= _WRITE_BUFFER_SIZE:
+                    checksum.update(buffer)
+                    table_file.write(buffer)
+                    buffer.clear()
+
+            checksum.update(buffer)
+            table_file.write(buffer)
+
+        with self._lock:
+            self.tables[name] = {
+                "file": file_name,
+                "rows": row_count,
+                "sha256": checksum.hexdigest(),
+                "size": (self.directory / file_name).stat().st_size,
+            }
+
+        return row_count
+
+    def close(self) -> None:
+        """Write the snapshot manifest."""
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "tables": dict(sorted(self.tables.items())),
+        }
+        manifest_path = self.directory / MANIFEST_FILE
+        temporary_path = manifest_path.with_suffix(".tmp")
+        temporary_path.write_text(
+            json.dumps(manifest, indent=2) + "\n", encoding="utf-8"
+        )
+        temporary_path.replace(manifest_path)
+
+
+class SnapshotReader:
+    """Wait Wait Stats Database Backport Snapshot Reader.
+
+    Reads tables from a snapshot directory written by SnapshotWriter.
+    Tables can be read concurrently from multiple threads.
+
+    :param directory: Path of the snapshot directory
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        """Class initialization method."""
+        self.directory = Path(directory)
+        manifest_path = self.directory / MANIFEST_FILE
+        if not manifest_path.is_file():
+            raise SnapshotError(f"No snapshot manifest found in {self.directory}")
+
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("format") != SNAPSHOT_FORMAT:
+            raise SnapshotError(f"{manifest_path} is not a snapshot manifest")
+
+        if manifest.get("version") != SNAPSHOT_VERSION:
+            raise SnapshotError(
+                f"Unsupported snapshot version {manifest.get('version')}, "
+                f"expected {SNAPSHOT_VERSION}"
+            )
+
+        self.created: str | None = manifest.get("created")
+        self.tables: dict[str, dict[str, Any]] = manifest["tables"]
+
+    def _records(self, entry: dict[str, Any]) -> Iterator[tuple[bytes, bytes]]:
+        """Read the length prefix and record of each row of a table file."""
+        try:
+            with gzip.open(self.directory / entry["file"], mode="rb") as table_file:
+                while prefix := table_file.read(_LENGTH.size):
+                    size = (
+                        _LENGTH.unpack(prefix)[0] if len(prefix) == _LENGTH.size else -1
+                    )
+                    record = table_file.read(size) if size >= 0 else b""
+                    if len(record) != size:
+                        raise SnapshotError(
+                            f"Snapshot file {entry['file']} is truncated"
+                        )
+
+                    yield prefix, record
+        except (EOFError, gzip.BadGzipFile, zlib.error) as error:
+            raise SnapshotError(
+                f"Snapshot file {entry['file']} is corrupt: {error}"
+            ) from error
+
+    def verify_table(self, name: str) -> None:
+        """Check the row count and checksum of a table file.
+
+        Raises SnapshotError if they do not match the manifest.
+        """
+        if name not in self.tables:
+            raise SnapshotError(f"Table {name} is not included in the snapshot")
+
+        entry = self.tables[name]
+        checksum = hashlib.sha256()
+        row_count = 0
+        for prefix, record in self._records(entry):
+            checksum.update(prefix)
+            checksum.update(record)
+            row_count += 1
+
+        if row_count != entry["rows"] or checksum.hexdigest() != entry["sha256"]:
+            raise SnapshotError(
+                f"Snapshot file {entry['file']} does not match the manifest"
+            )
+
+    def read_table(self, name: str) -> Iterator[tuple[Any, ...]]:
+        """Read rows of destination values for a table.
+
+        The table file is verified against the manifest before the
+        first row is returned, so rows of a corrupt or truncated file
+        are never loaded, even when intermediate commits are made.
+        """
+        self.verify_table(name)
+        for _, record in self._records(self.tables[name]):
+            yield decode_record(record)
@@ -0,0 +1,213 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Table Specifications."""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """Wait Wait Stats Database Backport Table Specification.
+
+    Describes how a single table is transferred from the source
+    database to the destination database.
+
+    :param name: Unique name of the table, also used as the name of its
+        transfer task, in run reports and in snapshots
+    :param source_table: Name of the source table
+    :param destination_table: Name of the destination table
+    :param primary_key: Name of the integer primary key column
+    :param columns: Names of the columns transferred, which must exist
+        with the same name in both the source and destination tables
+    :param folded_columns: Names of the text columns that are folded to
+        ASCII before being written to the destination table
+    :param dependencies: Names of the tables referenced by this table's
+        foreign keys, which must be transferred first
+    :param source_filter: Optional SQL condition used to restrict which
+        source rows are transferred
+    :param cpu_heavy: Transforming rows is CPU heavy, such as folding
+        long text, so rows are transformed in worker processes when
+        transform workers are enabled
+    :param partitioned: The table is large enough to be split into
+        primary key ranges that are transferred in parallel when
+        partitions are enabled
+    """
+
+    name: str
+    source_table: str
+    destination_table: str
+    primary_key: str
+    columns: tuple[str, ...]
+    folded_columns: tuple[str, ...] = ()
+    dependencies: tuple[str, ...] = ()
+    source_filter: str | None = None
+    cpu_heavy: bool = False
+    partitioned: bool = False
+
+    def __post_init__(self) -> None:
+        """Validate the specification."""
+        if self.primary_key not in self.columns:
+            raise ValueError(
+                f"Columns of table {self.name} must include primary key "
+                f"{self.primary_key}"
+            )
+
+        for column in self.folded_columns:
+            if column not in self.columns:
+                raise ValueError(
+                    f"Folded column {column} is not a column of table {self.name}"
+                )
+
+
+SHOWS = TableSpec(
+    name="shows",
+    source_table="ww_shows",
+    destination_table="ww_shows",
+    primary_key="showid",
+    columns=("showid", "showdate", "repeatshowid", "bestof", "bestofuniquebluff"),
+)
+DESCRIPTIONS = TableSpec(
+    name="descriptions",
+    source_table="ww_showdescriptions",
+    destination_table="ww_showdescriptions",
+    primary_key="showid",
+    columns=("showid", "showdescription"),
+    folded_columns=("showdescription",),
+    dependencies=("shows",),
+    cpu_heavy=True,
+)
+NOTES = TableSpec(
+    name="notes",
+    source_table="ww_shownotes",
+    destination_table="ww_shownotes",
+    primary_key="showid",
+    columns=("showid", "shownotes"),
+    folded_columns=("shownotes",),
+    dependencies=("shows",),
+    cpu_heavy=True,
+)
+GUESTS = TableSpec(
+    name="guests",
+    source_table="ww_guests",
+    destination_table="ww_guests",
+    primary_key="guestid",
+    columns=("guestid", "guest", "guestslug"),
+    folded_columns=("guest",),
+)
+HOSTS = TableSpec(
+    name="hosts",
+    source_table="ww_hosts",
+    destination_table="ww_hosts",
+    primary_key="hostid",
+    columns=("hostid", "host", "hostgender", "hostslug"),
+    folded_columns=("host",),
+)
+LOCATIONS = TableSpec(
+    name="locations",
+    source_table="ww_locations",
+    destination_table="ww_locations",
+    primary_key="locationid",
+    columns=("locationid", "city", "state", "venue", "locationslug"),
+    folded_columns=("venue",),
+)
+PANELISTS = TableSpec(
+    name="panelists",
+    source_table="ww_panelists",
+    destination_table="ww_panelists",
+    primary_key="panelistid",
+    columns=("panelistid", "panelist", "panelistgender", "panelistslug"),
+    folded_columns=("panelist",),
+)
+SCOREKEEPERS = TableSpec(
+    name="scorekeepers",
+    source_table="ww_scorekeepers",
+    destination_table="ww_scorekeepers",
+    primary_key="scorekeeperid",
+    columns=("scorekeeperid", "scorekeeper", "scorekeepergender", "scorekeeperslug"),
+    folded_columns=("scorekeeper",),
+)
+BLUFF_MAPPINGS = TableSpec(
+    name="bluff_mappings",
+    source_table="ww_showbluffmap",
+    destination_table="ww_showbluffmap",
+    primary_key="showbluffmapid",
+    columns=("showbluffmapid", "showid", "chosenbluffpnlid", "correctbluffpnlid"),
+    dependencies=("shows", "panelists"),
+    source_filter="segment = 1",
+)
+GUEST_MAPPINGS = TableSpec(
+    name="guest_mappings",
+    source_table="ww_showguestmap",
+    destination_table="ww_showguestmap",
+    primary_key="showguestmapid",
+    columns=("showguestmapid", "showid", "guestid", "guestscore", "exception"),
+    dependencies=("shows", "guests"),
+    partitioned=True,
+)
+HOST_MAPPINGS = TableSpec(
+    name="host_mappings",
+    source_table="ww_showhostmap",
+    destination_table="ww_showhostmap",
+    primary_key="showhostmapid",
+    columns=("showhostmapid", "showid", "hostid", "guest"),
+    dependencies=("shows", "hosts"),
+    partitioned=True,
+)
+LOCATION_MAPPINGS = TableSpec(
+    name="location_mappings",
+    source_table="ww_showlocationmap",
+    destination_table="ww_showlocationmap",
+    primary_key="showlocationmapid",
+    columns=("showlocationmapid", "showid", "locationid"),
+    dependencies=("shows", "locations"),
+    partitioned=True,
+)
+PANELIST_MAPPINGS = TableSpec(
+    name="panelist_mappings",
+    source_table="ww_showpnlmap",
+    destination_table="ww_showpnlmap",
+    primary_key="showpnlmapid",
+    columns=(
+        "showpnlmapid",
+        "showid",
+        "panelistid",
+        "panelistlrndstart",
+        "panelistlrndcorrect",
+        "panelistscore",
+        "showpnlrank",
+    ),
+    folded_columns=("showpnlrank",),
+    dependencies=("shows", "panelists"),
+    partitioned=True,
+)
+SCOREKEEPER_MAPPINGS = TableSpec(
+    name="scorekeeper_mappings",
+    source_table="ww_showskmap",
+    destination_table="ww_showskmap",
+    primary_key="showskmapid",
+    columns=("showskmapid", "showid", "scorekeeperid", "guest", "description"),
+    folded_columns=("description",),
+    dependencies=("shows", "scorekeepers"),
+    partitioned=True,
+)
+
+# Registry of every table, in an order in which each table follows the
+# tables it depends on
+TABLE_SPECS: tuple[TableSpec, ...] = (
+    SHOWS,
+    DESCRIPTIONS,
+    NOTES,
+    GUESTS,
+    HOSTS,
+    LOCATIONS,
+    PANELISTS,
+    SCOREKEEPERS,
+    BLUFF_MAPPINGS,
+    GUEST_MAPPINGS,
+    HOST_MAPPINGS,
+    LOCATION_MAPPINGS,
+    PANELIST_MAPPINGS,
+    SCOREKEEPER_MAPPINGS,
+)
@@ -0,0 +1,322 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Checksum-Based Table Sync."""
+import threading
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from mysql.connector.connection import MySQLConnection
+
+from tables import metrics
+from tables.options import TransferOptions
+from tables.reader import read_rows
+
+SYNC_LEAF_SIZE: int = 64
+
+
+@dataclass
+class SyncResult:
+    """Wait Wait Stats Database Backport Table Sync Result.
+
+    :param chunks_compared: Number of primary key ranges compared using
+        checksums
+    :param chunks_differing: Number of compared ranges whose checksums
+        did not match
+    :param rows_compared: Number of rows compared individually after
+        drilling down into differing ranges
+    :param inserted: Number of rows inserted into the destination table
+    :param updated: Number of rows updated in the destination table
+    :param deleted: Number of rows deleted from the destination table,
+        or to be deleted once every table has been synced
+    """
+
+    chunks_compared: int = 0
+    chunks_differing: int = 0
+    rows_compared: int = 0
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+
+
+class TableSync:
+    """Wait Wait Stats Database Backport Table Sync.
+
+    Brings a destination table in line with its source table while
+    reading as little data as possible. Primary key ranges are compared
+    using a row count and an order-independent checksum computed by each
+    database server. Ranges that differ are split in half until they are
+    small enough to be compared row by row, and only rows that differ
+    after being transformed are inserted or updated. Missing and changed
+    rows are passed to the load function in primary key order. The
+    primary keys of rows that no longer exist in the source table are
+    collected in deleted_keys rather than deleted, so that rows can be
+    deleted once the rows referencing them have been updated.
+
+    Source rows containing text that is folded to ASCII will never match
+    the destination checksum, so ranges containing those rows are always
+    compared row by row, but are only written if they actually differ.
+
+    :param source_database_connection: Source database connection
+    :param destination_database_connection: Destination database
+        connection
+    :param source_table: Name of the source table
+    :param destination_table: Name of the destination table
+    :param primary_key: Name of the integer primary key column
+    :param columns: Names of the columns to compare, which must exist
+        with the same name in both the source and destination tables
+    :param transform: Function that converts a tuple of source values
+        into a tuple of destination values, both in the same order as
+        columns
+    :param load: Function that writes rows of destination values, in
+        the same order as columns, given the names of the columns to
+        update for rows that already exist
+    :param options: Transfer options
+    :param source_filter: Optional SQL condition used to restrict which
+        source rows are included
+    """
+
+    def __init__(
+        self,
+        source_database_connection: MySQLConnection,
+        destination_database_connection: MySQLConnection,
+        source_table: str,
+        destination_table: str,
+        primary_key: str,
+        columns: Sequence[str],
+        transform: Callable[[tuple[Any, ...]], tuple[Any, ...]],
+        load: Callable[[Iterable[tuple[Any, ...]], Sequence[str]], None],
+        options: TransferOptions,
+        source_filter: str | None = None,
+    ) -> None:
+        """Class initialization method."""
+        if primary_key not in columns:
+            raise ValueError(f"Columns must include primary key {primary_key}")
+
+        self.source_database_connection = source_database_connection
+        self.destination_database_connection = destination_database_connection
+        self.source_table = source_table
+        self.destination_table = destination_table
+        self.primary_key = primary_key
+        self.columns = tuple(columns)
+        self.transform = transform
+        self.load = load
+        self.options = options
+        self.source_filter = source_filter
+
+        self.result = SyncResult()
+        self.deleted_keys: list[Any] = []
+        self._key_index = self.columns.index(primary_key)
+
+        column_list = ", ".join(self.columns)
+        null_flags = ", ".join(f"ISNULL({column})" for column in self.columns)
+        self._checksum_select = (
+            "SELECT COUNT(*), COALESCE(BIT_XOR(CRC32(CONCAT_WS('#', "
+            f"{column_list}, CONCAT({null_flags})))), 0)"
+        )
+        self._row_select = f"SELECT {column_list}"
+
+    def _where(self, include_filter: bool) -> str:
+        """Build the WHERE clause for a primary key range."""
+        where = f"WHERE {self.primary_key} BETWEEN %s AND %s"
+        if include_filter and self.source_filter:
+            where += f" AND ({self.source_filter})"
+
+        return where
+
+    def _key_range(
+        self, database_connection: MySQLConnection, table: str, is_source: bool
+    ) -> tuple[int | None, int | None]:
+        """Return the minimum and maximum primary key values of a table."""
+        query = f"SELECT MIN({self.primary_key}), MAX({self.primary_key}) FROM {table}"
+        if is_source and self.source_filter:
+            query += f" WHERE {self.source_filter}"
+
+        cursor = database_connection.cursor()
+        cursor.execute(query)
+        result = cursor.fetchone()
+        cursor.close()
+        return result[0], result[1]
+
+    def _checksum(
+        self,
+        database_connection: MySQLConnection,
+        table: str,
+        is_source: bool,
+        first_id: int,
+        last_id: int,
+    ) -> tuple[int, int]:
+        """Return the row count and checksum of a primary key range."""
+        cursor = database_connection.cursor()
+        cursor.execute(
+            f"{self._checksum_select} FROM {table} {self._where(is_source)};",
+            (first_id, last_id),
+        )
+        result = cursor.fetchone()
+        cursor.close()
+        return int(result[0]), int(result[1])
+
+    def _compare_rows(self, first_id: int, last_id: int) -> Iterator[tuple[Any, ...]]:
+        """Compare a primary key range row by row.
+
+        Missing and changed rows are yielded, and the primary keys of
+        rows that no longer exist in the source table are added to
+        deleted_keys.
+        """
+        rows = list(
+            read_rows(
+                database_connection=self.source_database_connection,
+                query=f"{self._row_select} FROM {self.source_table} "
+                f"{self._where(True)} ORDER BY {self.primary_key} ASC;",
+                parameters=(first_id, last_id),
+                fetch_size=self.options.fetch_size,
+                dictionary=False,
+            )
+        )
+
+        source_rows: dict[Any, tuple[Any, ...]] = {}
+        with metrics.record_transform():
+            for row in rows:
+                values = self.transform(row)
+                source_rows[values[self._key_index]] = values
+
+        cursor = self.destination_database_connection.cursor()
+        cursor.execute(
+            f"{self._row_select} FROM {self.destination_table} "
+            f"{self._where(False)} ORDER BY {self.primary_key} ASC;",
+            (first_id, last_id),
+        )
+        destination_rows = {row[self._key_index]: tuple(row) for row in cursor}
+        cursor.close()
+
+        self.result.rows_compared += len(source_rows)
+        for key, values in source_rows.items():
+            existing = destination_rows.get(key)
+            if existing is None:
+                self.result.inserted += 1
+                yield values
+            elif existing != values:
+                self.result.updated += 1
+                yield values
+
+        self.deleted_keys.extend(
+            key for key in destination_rows if key not in source_rows
+        )
+
+    def _sync_range(self, first_id: int, last_id: int) -> Iterator[tuple[Any, ...]]:
+        """Compare a primary key range and drill down if it differs."""
+        self.result.chunks_compared += 1
+        source_checksum = self._checksum(
+            self.source_database_connection,
+            self.source_table,
+            True,
+            first_id,
+            last_id,
+        )
+        destination_checksum = self._checksum(
+            self.destination_database_connection,
+            self.destination_table,
+            False,
+            first_id,
+            last_id,
+        )
+        if source_checksum == destination_checksum:
+            return
+
+        self.result.chunks_differing += 1
+        if source_checksum[0] == 0 or destination_checksum[0] == 0:
+            # One side is empty, so there is nothing to gain by splitting
+            yield from self._compare_rows(first_id, last_id)
+        elif last_id - first_id + 1 <= SYNC_LEAF_SIZE:
+            yield from self._compare_rows(first_id, last_id)
+        else:
+            middle_id = (first_id + last_id) // 2
+            yield from self._sync_range(first_id, middle_id)
+            yield from self._sync_range(middle_id + 1, last_id)
+
+    def _changed_rows(self, first_id: int, last_id: int) -> Iterator[tuple[Any, ...]]:
+        """Compare every chunk of a primary key range in order."""
+        chunk_size = self.options.sync_chunk_size
+        for chunk_first_id in range(first_id, last_id + 1, chunk_size):
+            chunk_last_id = min(chunk_first_id + chunk_size - 1, last_id)
+            yield from self._sync_range(chunk_first_id, chunk_last_id)
+
+    def sync(self) -> SyncResult:
+        """Write changed rows and collect the keys of deleted rows."""
+        source_range = self._key_range(
+            self.source_database_connection, self.source_table, True
+        )
+        destination_range = self._key_range(
+            self.destination_database_connection, self.destination_table, False
+        )
+        first_ids = [
+            key for key in (source_range[0], destination_range[0]) if key is not None
+        ]
+        last_ids = [
+            key for key in (source_range[1], destination_range[1]) if key is not None
+        ]
+        if not first_ids or not last_ids:
+            return self.result
+
+        upsert_columns = [
+            column for column in self.columns if column != self.primary_key
+        ]
+        self.load(self._changed_rows(min(first_ids), max(last_ids)), upsert_columns)
+        self.result.deleted = len(self.deleted_keys)
+        return self.result
+
+
+def delete_rows(
+    database_connection: MySQLConnection,
+    table: str,
+    primary_key: str,
+    keys: Sequence[Any],
+    batch_size: int,
+) -> int:
+    """Delete rows from a destination table in batches.
+
+    Returns the number of rows deleted.
+    """
+    deleted = 0
+    cursor = database_connection.cursor()
+    for index in range(0, len(keys), batch_size):
+        batch = keys[index : index + batch_size]
+        placeholders = ", ".join(["%s"] * len(batch))
+        with metrics.record_write():
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {primary_key} IN ({placeholders});",
+                tuple(batch),
+            )
+        deleted += cursor.rowcount
+
+    cursor.close()
+    return deleted
+
+
+class SyncDeletes:
+    """Wait Wait Stats Database Backport Deferred Sync Deletes.
+
+    Collects the primary keys of rows to delete from each destination
+    table while tables are synced, possibly on multiple threads. Rows
+    are deleted once every table has been synced, starting with the
+    tables that reference other tables, so that the rows referencing a
+    deleted row have already been updated or deleted.
+    """
+
+    def __init__(self) -> None:
+        """Class initialization method."""
+        self._lock = threading.Lock()
+        self._keys: dict[str, list[Any]] = {}
+
+    def add(self, table: str, keys: Iterable[Any]) -> None:
+        """Add the primary keys of rows to delete from a table."""
+        with self._lock:
+            self._keys.setdefault(table, []).extend(keys)
+
+    def pop(self, table: str) -> list[Any]:
+        """Remove and return the primary keys of rows to delete from a table."""
+        with self._lock:
+            return self._keys.pop(table, [])
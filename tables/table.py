@@ -0,0 +1,236 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Generic Table Transfer."""
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, ClassVar
+
+from mysql.connector.connection import MySQLConnection
+
+from tables import checkpoint, metrics
+from tables.drivers import connect
+from tables.incremental import first_new_id, high_water_mark
+from tables.options import TransferOptions
+from tables.reader import read_chunks
+from tables.spec import TableSpec
+from tables.sync import SyncDeletes, SyncResult, TableSync, delete_rows
+from tables.transform import (
+    compile_chunk_transform,
+    compile_transform,
+    transform_in_workers,
+)
+from tables.writer import create_writer
+
+
+class SpecTable:
+    """Wait Wait Stats Database Backport Generic Table.
+
+    Transfers, syncs, reads and loads a table as described by the
+    TableSpec set as the spec class attribute of a subclass. Each table
+    class is a subclass that only sets its spec.
+
+    :param source_connect_dict: Dictionary containing source database
+        connection settings as required by mysql.connector.connect
+    :param destination_connect_dict: Dictionary containing destination
+        database connection settings as required by
+        mysql.connector.connect
+    :param source_database_connection: Source database connection
+    :param destination_database_connection: Destination database
+        connection
+    :param options: Transfer options used to control how data is
+        written to the destination database
+    """
+
+    spec: ClassVar[TableSpec]
+
+    def __init__(
+        self,
+        source_connect_dict: dict[str, Any] | None = None,
+        destination_connect_dict: dict[str, Any] | None = None,
+        source_database_connection: MySQLConnection | None = None,
+        destination_database_connection: MySQLConnection | None = None,
+        options: TransferOptions | None = None,
+    ) -> None:
+        """Class initialization method."""
+        self.options = options or TransferOptions()
+
+        if source_connect_dict and destination_connect_dict:
+            self.source_connect_dict = source_connect_dict
+            self.destination_connect_dict = destination_connect_dict
+
+            self.source_database_connection = connect(
+                source_connect_dict, self.options.driver
+            )
+            self.destination_database_connection = connect(
+                destination_connect_dict, self.options.driver
+            )
+        elif source_database_connection or destination_database_connection:
+            # Exporting and importing snapshots only uses one of the
+            # source and destination databases
+            if (
+                source_database_connection
+                and not source_database_connection.is_connected()
+            ):
+                source_database_connection.reconnect()
+
+            if (
+                destination_database_connection
+                and not destination_database_connection.is_connected()
+            ):
+                destination_database_connection.reconnect()
+
+            self.source_database_connection = source_database_connection
+            self.destination_database_connection = destination_database_connection
+
+        # Convert tuples of source values into destination values, either
+        # a row or a chunk of rows at a time
+        self._transform_row = compile_transform(self.spec)
+        self._transform_chunk = compile_chunk_transform(self.spec)
+
+    def __str__(self):
+        pass
+
+    def read(
+        self, start_id: int = 0, end_id: int | None = None
+    ) -> Iterator[tuple[Any, ...]]:
+        """Read rows from the source database as destination values.
+
+        :param start_id: Lowest primary key value to read
+        :param end_id: If set, highest primary key value to read
+        """
+        spec = self.spec
+        transform = self._transform_chunk
+        parameters: tuple[int, ...] = (start_id,)
+        condition = f"AND ({spec.source_filter})" if spec.source_filter else ""
+        if end_id is not None:
+            condition = f"AND {spec.primary_key} <= %s {condition}"
+            parameters = (start_id, end_id)
+
+        query = f"""
+            SELECT {", ".join(spec.columns)}
+            FROM {spec.source_table}
+            WHERE {spec.primary_key} >= %s {condition}
+            ORDER BY {spec.primary_key} ASC;
+        """
+
+        chunks = read_chunks(
+            database_connection=self.source_database_connection,
+            query=query,
+            parameters=parameters,
+            fetch_size=self.options.fetch_size,
+            dictionary=False,
+        )
+        if spec.cpu_heavy and self.options.transform_workers:
+            for chunk in transform_in_workers(
+                spec=spec, chunks=chunks, workers=self.options.transform_workers
+            ):
+                yield from chunk
+
+            return
+
+        for chunk in chunks:
+            with metrics.record_transform():
+                transformed = transform(chunk)
+
+            yield from transformed
+
+    def load(
+        self,
+        rows: Iterable[tuple[Any, ...]],
+        upsert_columns: Sequence[str] | None = None,
+    ) -> None:
+        """Write rows of destination values to the destination database.
+
+        :param rows: Rows of destination values
+        :param upsert_columns: If set, existing rows have these columns
+            updated
+        """
+        with create_writer(
+            database_connection=self.destination_database_connection,
+            table=self.spec.destination_table,
+            columns=self.spec.columns,
+            options=self.options,
+            upsert_columns=upsert_columns,
+        ) as writer:
+            writer.extend(rows)
+
+    def transfer(self) -> None:
+        """Process and transfer data from source to destination databases."""
+        start_id = first_new_id(
+            database_connection=self.destination_database_connection,
+            table=self.spec.destination_table,
+            column=self.spec.primary_key,
+            options=self.options,
+        )
+
+        if checkpoint.current() and self.options.resume:
+            start_id = max(start_id, self.committed_id() + 1)
+
+        self.load(self.read(start_id))
+
+        return
+
+    def committed_id(self) -> int:
+        """Return the highest primary key value already committed.
+
+        Used when resuming a run. Rows are written in primary key order,
+        so every row up to the highest primary key value in the
+        destination table has been committed, including rows committed
+        just before the previous run stopped that were not recorded in
+        the checkpoint. Returns -1 if the destination table is empty.
+        """
+        last_id = high_water_mark(
+            database_connection=self.destination_database_connection,
+            table=self.spec.destination_table,
+            column=self.spec.primary_key,
+        )
+        return -1 if last_id is None else last_id
+
+    def sync(self, deletes: SyncDeletes | None = None) -> SyncResult:
+        """Synchronize changed rows from source to destination databases.
+
+        Missing and changed rows are written using load. Rows that no
+        longer exist in the source database are deleted once the other
+        rows have been written, or added to deletes, if set, to be
+        deleted once every table has been synced.
+
+        :param deletes: Rows to delete once every table has been synced
+        """
+        table_sync = TableSync(
+            source_database_connection=self.source_database_connection,
+            destination_database_connection=self.destination_database_connection,
+            source_table=self.spec.source_table,
+            destination_table=self.spec.destination_table,
+            primary_key=self.spec.primary_key,
+            columns=self.spec.columns,
+            transform=self._transform_row,
+            load=lambda rows, upsert_columns: self.load(
+                rows, upsert_columns=upsert_columns
+            ),
+            options=self.options,
+            source_filter=self.spec.source_filter,
+        )
+        result = table_sync.sync()
+        if deletes is not None:
+            deletes.add(self.spec.destination_table, table_sync.deleted_keys)
+        elif table_sync.deleted_keys:
+            result.deleted = self.delete(table_sync.deleted_keys)
+
+        return result
+
+    def delete(self, keys: Sequence[Any]) -> int:
+        """Delete rows from the destination database by primary key.
+
+        Returns the number of rows deleted.
+
+        :param keys: Primary key values of the rows to delete
+        """
+        return delete_rows(
+            database_connection=self.destination_database_connection,
+            table=self.spec.destination_table,
+            primary_key=self.spec.primary_key,
+            keys=keys,
+            batch_size=self.options.batch_size,
+        )
@@ -0,0 +1,131 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Transaction Management."""
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from mysql.connector.connection import MySQLConnection
+
+from tables.options import DEFAULT_TRANSACTION_MODE, TRANSACTION_MODES
+
+
+class TransactionManager:
+    """Wait Wait Stats Database Backport Transaction Manager.
+
+    Controls when writes to the destination database are committed.
+    Supported transaction modes are:
+
+    - ``batch``: commit every ``commit_interval`` rows (handled by the
+      destination writer) and once more at the end of each table
+    - ``table``: commit once at the end of each table
+    - ``run``: commit once at the end of the entire run
+
+    Autocommit is turned off on destination connections while they are
+    in use and restored afterwards. On failure, any uncommitted writes
+    are rolled back; in ``run`` mode that leaves the destination
+    database untouched.
+
+    :param mode: Transaction mode, one of ``batch``, ``table`` or
+        ``run``
+    :param disable_checks: Turn off foreign key and unique checks on
+        destination connections while data is being loaded
+    """
+
+    def __init__(
+        self, mode: str = DEFAULT_TRANSACTION_MODE, disable_checks: bool = False
+    ) -> None:
+        """Class initialization method."""
+        if mode not in TRANSACTION_MODES:
+            raise ValueError(
+                f"Transaction mode must be one of: {', '.join(TRANSACTION_MODES)}"
+            )
+
+        self.mode = mode
+        self.disable_checks = disable_checks
+
+        self._lock = threading.Lock()
+        self._prepared: dict[int, tuple[MySQLConnection, bool]] = {}
+
+    def _prepare(self, database_connection: MySQLConnection) -> None:
+        """Turn off autocommit and optional checks for a connection."""
+        with self._lock:
+            if id(database_connection) in self._prepared:
+                return
+
+            self._prepared[id(database_connection)] = (
+                database_connection,
+                database_connection.autocommit,
+            )
+
+        database_connection.autocommit = False
+        if self.disable_checks:
+            cursor = database_connection.cursor()
+            cursor.execute("SET foreign_key_checks = 0;")
+            cursor.execute("SET unique_checks = 0;")
+            cursor.close()
+
+    def _restore(self, database_connection: MySQLConnection) -> None:
+        """Restore the original autocommit and check settings."""
+        with self._lock:
+            prepared = self._prepared.pop(id(database_connection), None)
+
+        if not prepared or not database_connection.is_connected():
+            return
+
+        if self.disable_checks:
+            cursor = database_connection.cursor()
+            cursor.execute("SET unique_checks = 1;")
+            cursor.execute("SET foreign_key_checks = 1;")
+            cursor.close()
+
+        database_connection.autocommit = prepared[1]
+
+    @contextmanager
+    def table(self, database_connection: MySQLConnection) -> Iterator[None]:
+        """Wrap the transfer of a single table on a destination connection.
+
+        Outside of ``run`` mode, the table's writes are committed when
+        the with block completes and rolled back if it raises.
+        """
+        self._prepare(database_connection)
+        if self.mode == "run":
+            yield
+            return
+
+        try:
+            yield
+        except BaseException:
+            if database_connection.is_connected():
+                database_connection.rollback()
+            raise
+        else:
+            database_connection.commit()
+        finally:
+            self._restore(database_connection)
+
+    @contextmanager
+    def run(self) -> Iterator[None]:
+        """Wrap an entire backport run.
+
+        In ``run`` mode, all writes are committed when the with block
+        completes and rolled back if it raises.
+        """
+        try:
+            yield
+        except BaseException:
+            if self.mode == "run":
+                for database_connection, _ in list(self._prepared.values()):
+                    if database_connection.is_connected():
+                        database_connection.rollback()
+            raise
+        else:
+            if self.mode == "run":
+                for database_connection, _ in list(self._prepared.values()):
+                    database_connection.commit()
+        finally:
+            for database_connection, _ in list(self._prepared.values()):
+                self._restore(database_connection)
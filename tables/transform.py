@@ -0,0 +1,184 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Row Transformers."""
+import multiprocessing
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import cache
+from typing import Any
+
+from tables import metrics
+from tables.normalize import ascii_fold, ascii_fold_many
+from tables.spec import TableSpec
+
+RowTransform = Callable[[Sequence[Any]], tuple[Any, ...]]
+ChunkTransform = Callable[[list[Sequence[Any]]], list[tuple[Any, ...]]]
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+@cache
+def compile_transform(spec: TableSpec) -> RowTransform:
+    """Return a function converting source rows into destination values.
+
+    Source rows are tuples of values in the order of spec.columns, as
+    returned by a tuple cursor. The returned function is specialized
+    once per table for the positions of the folded columns, so that
+    converting a row does not look up columns by name or check which
+    columns need to be folded.
+    """
+    positions = tuple(
+        index
+        for index, column in enumerate(spec.columns)
+        if column in spec.folded_columns
+    )
+
+    if not positions:
+        # Tuple cursors already return tuples, which tuple() returns as is
+        return tuple
+
+    if len(positions) == 1:
+        position = positions[0]
+        following = position + 1
+
+        def transform_one(row: Sequence[Any]) -> tuple[Any, ...]:
+            return (*row[:position], ascii_fold(row[position]), *row[following:])
+
+        return transform_one
+
+    def transform_many(row: Sequence[Any]) -> tuple[Any, ...]:
+        values = list(row)
+        for index in positions:
+            values[index] = ascii_fold(values[index])
+
+        return tuple(values)
+
+    return transform_many
+
+
+@cache
+def compile_chunk_transform(spec: TableSpec) -> ChunkTransform:
+    """Return a function converting chunks of source rows at a time.
+
+    Produces the same values as the row transformer returned by
+    compile_transform, but each folded column is normalized for the
+    whole chunk with a single call to ascii_fold_many.
+    """
+    positions = tuple(
+        index
+        for index, column in enumerate(spec.columns)
+        if column in spec.folded_columns
+    )
+
+    if not positions:
+        return list
+
+    if len(positions) == 1:
+        position = positions[0]
+        following = position + 1
+
+        def transform_one(rows: list[Sequence[Any]]) -> list[tuple[Any, ...]]:
+            values = ascii_fold_many([row[position] for row in rows])
+            return [
+                (*row[:position], value, *row[following:])
+                for row, value in zip(rows, values, strict=True)
+            ]
+
+        return transform_one
+
+    def transform_many(rows: list[Sequence[Any]]) -> list[tuple[Any, ...]]:
+        # An empty chunk has no columns to fold
+        if not rows:
+            return []
+
+        columns = [list(row) for row in zip(*rows, strict=True)]
+        for index in positions:
+            columns[index] = ascii_fold_many(columns[index])
+
+        return list(zip(*columns, strict=True))
+
+    return transform_many
+
+
+def _transform_chunk(
+    spec: TableSpec, rows: list[Sequence[Any]]
+) -> tuple[list[tuple], float]:
+    """Transform a chunk of rows within a worker process.
+
+    Returns the transformed rows and the number of seconds spent
+    transforming them.
+    """
+    start_time = time.perf_counter()
+    transformed = compile_chunk_transform(spec)(rows)
+    return transformed, time.perf_counter() - start_time
+
+
+def _result(future: Future) -> list[tuple[Any, ...]]:
+    """Return the rows of a transformed chunk, recording the transform time."""
+    rows, seconds = future.result()
+    metrics.add_transform_time(seconds)
+    return rows
+
+
+def transform_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the process pool shared by all tables, starting it if needed.
+
+    Worker processes are started using spawn rather than fork, as the
+    pool is started while other threads may be using database
+    connections.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+        return _pool
+
+
+def shutdown_transform_pool() -> None:
+    """Stop the shared process pool, if it was started."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def transform_in_workers(
+    spec: TableSpec, chunks: Iterable[list[Sequence[Any]]], workers: int
+) -> Iterator[list[tuple[Any, ...]]]:
+    """Transform chunks of source rows in worker processes.
+
+    Transformed chunks are returned in the same order as they were
+    read. At most two chunks per worker are in flight at a time, so
+    reading pauses while the workers catch up. Time spent in the worker
+    processes is added to the transform time of the current table, but
+    text normalizer counters and profiles do not include it.
+    """
+    if workers < 1:
+        raise ValueError("workers must be a positive integer")
+
+    pool = transform_pool(workers)
+    pending: deque[Future] = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(_transform_chunk, spec, chunk))
+            if len(pending) >= workers * 2:
+                yield _result(pending.popleft())
+
+        while pending:
+            yield _result(pending.popleft())
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,540 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Wait Wait Stats Database Backport: Batched Destination Writer."""
+import re
+import tempfile
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any, TextIO
+
+from mysql.connector.connection import MySQLConnection
+
+from tables import checkpoint, metrics
+from tables.drivers import error_code
+from tables.options import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_BULK_LOAD_SIZE,
+    TransferOptions,
+)
+
+# Errors raised when LOAD DATA LOCAL INFILE is disabled on the server
+# (1148, 3948) or rejected by the client (2068)
+LOCAL_INFILE_ERRORS: frozenset[int] = frozenset({1148, 2068, 3948})
+
+# Maximum number of parameters of a single server-side prepared statement
+MAX_PREPARED_PARAMETERS: int = 65535
+
+_TSV_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"}
+)
+_TSV_UNESCAPES: dict[str, str] = {
+    "\\": "\\",
+    "t": "\t",
+    "n": "\n",
+    "r": "\r",
+    "0": "\0",
+}
+_TSV_ESCAPE_PATTERN = re.compile(r"\\(.)", re.DOTALL)
+
+
+class BulkLoadError(Exception):
+    """Raised when rows written for LOAD DATA are skipped or changed."""
+
+
+class BatchWriter:
+    """Wait Wait Stats Database Backport Batched Writer.
+
+    Collects rows destined for a single table and writes them using
+    multi-row ``INSERT ... VALUES (...), (...)`` statements, reducing
+    the number of round trips to the destination database to one per
+    batch instead of one per row.
+
+    :param database_connection: Destination database connection
+    :param table: Name of the destination table
+    :param columns: Names of the destination table columns, in the same
+        order as the values in each row
+    :param batch_size: Maximum number of rows to include in a single
+        INSERT statement
+    :param commit_interval: If set, commit the current transaction
+        once at least this many rows have been written since the last
+        commit
+    :param upsert_columns: If set, rows that already exist in the
+        destination table have these columns updated using
+        ``ON DUPLICATE KEY UPDATE`` instead of raising an error
+    :param prepared: Write full batches using a server-side prepared
+        statement, which is parsed once per writer and receives the
+        values of each batch using the binary protocol. The final,
+        partial batch is written as a plain statement. Full batches are
+        written as plain statements if they need more parameters than
+        a prepared statement allows
+
+    Rows, statements, commits and time spent writing are added to the
+    metrics of the table being processed when the writer is created,
+    and the last row of each intermediate commit is recorded in the
+    checkpoint of the run, if any.
+    """
+
+    def __init__(
+        self,
+        database_connection: MySQLConnection,
+        table: str,
+        columns: Sequence[str],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        commit_interval: int | None = None,
+        upsert_columns: Sequence[str] | None = None,
+        prepared: bool = False,
+    ) -> None:
+        """Class initialization method."""
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        if commit_interval is not None and commit_interval < 1:
+            raise ValueError("commit_interval must be a positive integer")
+
+        self.database_connection = database_connection
+        self.table = table
+        self.columns = tuple(columns)
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+
+        self.rows_written: int = 0
+        self.statements: int = 0
+        self.commits: int = 0
+
+        self._metrics = metrics.current()
+        self._progress = checkpoint.current()
+        self._cursor = database_connection.cursor()
+        self._buffer: list[Sequence[Any]] = []
+        self._uncommitted_rows: int = 0
+        self._insert_prefix = f"INSERT INTO {table} ({', '.join(self.columns)}) VALUES "
+        self._row_placeholder = f"({', '.join(['%s'] * len(self.columns))})"
+        if upsert_columns:
+            self._insert_suffix = " ON DUPLICATE KEY UPDATE " + ", ".join(
+                f"{column} = VALUES({column})" for column in upsert_columns
+            )
+        else:
+            self._insert_suffix = ""
+
+        # The prepared cursor only prepares the statement again if it is
+        # given a different query string than on the previous execution
+        self._full_batch_query = self._build_query(batch_size)
+        self._prepared_cursor = None
+        if prepared and batch_size * len(self.columns) <= MAX_PREPARED_PARAMETERS:
+            self._prepared_cursor = database_connection.cursor(prepared=True)
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # Only write out remaining rows if the block completed cleanly
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self._cursor.close()
+            if self._prepared_cursor:
+                self._prepared_cursor.close()
+
+    @property
+    def uses_prepared_statements(self) -> bool:
+        """Whether full batches are written using a prepared statement."""
+        return self._prepared_cursor is not None
+
+    def _build_query(self, row_count: int) -> str:
+        """Build a multi-row INSERT statement for the given row count."""
+        return (
+            self._insert_prefix
+            + ", ".join([self._row_placeholder] * row_count)
+            + self._insert_suffix
+        )
+
+    def add(self, row: Sequence[Any]) -> None:
+        """Add a row to the current batch, writing the batch when full."""
+        if len(row) != len(self.columns):
+            raise ValueError(
+                f"Expected {len(self.columns)} values for {self.table}, "
+                f"received {len(row)}"
+            )
+
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def extend(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Add multiple rows to the current batch."""
+        for row in rows:
+            self.add(row)
+
+    def flush(self) -> None:
+        """Write any buffered rows to the destination table."""
+        if not self._buffer:
+            return
+
+        row_count = len(self._buffer)
+        cursor = self._cursor
+        if row_count == self.batch_size:
+            query = self._full_batch_query
+            if self._prepared_cursor:
+                cursor = self._prepared_cursor
+        else:
+            query = self._build_query(row_count)
+
+        parameters = [value for row in self._buffer for value in row]
+        start_time = time.perf_counter()
+        cursor.execute(query, parameters)
+
+        self.rows_written += row_count
+        self.statements += 1
+        last_row = self._buffer[-1]
+        self._buffer.clear()
+
+        self._uncommitted_rows += row_count
+        committed = False
+        if self.commit_interval and self._uncommitted_rows >= self.commit_interval:
+            self.database_connection.commit()
+            self.commits += 1
+            self._uncommitted_rows = 0
+            committed = True
+            if self._progress:
+                self._progress.committed(self.columns, last_row)
+
+        if self._metrics:
+            self._metrics.write_time += time.perf_counter() - start_time
+            self._metrics.rows_written += row_count
+            self._metrics.statements += 1
+            self._metrics.commits += int(committed)
+
+
+def _tsv_value(value: Any) -> str:
+    """Convert a value into an escaped LOAD DATA field."""
+    if value is None:
+        return "\\N"
+
+    if isinstance(value, bool):
+        return "1" if value else "0"
+
+    if isinstance(value, bytes):
+        value = value.decode(encoding="utf-8")
+
+    return str(value).translate(_TSV_ESCAPES)
+
+
+def _tsv_field(field: str) -> str | None:
+    """Convert an escaped LOAD DATA field back into a string value."""
+    if field == "\\N":
+        return None
+
+    return _TSV_ESCAPE_PATTERN.sub(
+        lambda match: _TSV_UNESCAPES.get(match.group(1), match.group(1)), field
+    )
+
+
+def read_tsv(tsv_file: TextIO) -> Iterator[tuple[str | None, ...]]:
+    """Read rows back from a file written for LOAD DATA.
+
+    Values are returned as strings, which the database server converts
+    to the column types when the rows are inserted.
+    """
+    for line in tsv_file:
+        yield tuple(_tsv_field(field) for field in line[:-1].split("\t"))
+
+
+def local_infile_enabled(database_connection: MySQLConnection) -> bool:
+    """Check whether the server allows LOAD DATA LOCAL INFILE."""
+    cursor = database_connection.cursor()
+    try:
+        cursor.execute("SELECT @@GLOBAL.local_infile;")
+        result = cursor.fetchone()
+    except Exception as error:
+        if error_code(error) is None:
+            raise
+
+        return False
+    finally:
+        cursor.close()
+
+    return bool(result and int(result[0]))
+
+
+class BulkLoadWriter:
+    """Wait Wait Stats Database Backport Bulk Load Writer.
+
+    Streams rows destined for a single table into a temporary
+    tab-separated file and loads each file of up to load_size rows with
+    a single ``LOAD DATA LOCAL INFILE`` statement, the fastest way to
+    insert rows into MySQL 5.6. Tabs, newlines and backslashes in
+    values are escaped and NULL values are written as NULL markers.
+
+    If the server has ``local_infile`` disabled, or the client rejects
+    the file request, rows are written using a BatchWriter instead,
+    including any rows already written to the temporary file. The
+    database connection must be opened with ``allow_local_infile``
+    enabled for bulk loading to be used. If a file is not loaded in
+    full, or loading it raises any warnings, BulkLoadError is raised.
+
+    :param database_connection: Destination database connection
+    :param table: Name of the destination table
+    :param columns: Names of the destination table columns, in the same
+        order as the values in each row
+    :param load_size: Maximum number of rows loaded with a single LOAD
+        DATA statement
+    :param batch_size: Maximum number of rows to include in a single
+        INSERT statement if bulk loading is not available
+    :param commit_interval: If set, commit the current transaction
+        once at least this many rows have been written since the last
+        commit
+    :param prepared: Write full batches using a prepared statement if
+        bulk loading is not available
+    """
+
+    def __init__(
+        self,
+        database_connection: MySQLConnection,
+        table: str,
+        columns: Sequence[str],
+        load_size: int = DEFAULT_BULK_LOAD_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        commit_interval: int | None = None,
+        prepared: bool = False,
+    ) -> None:
+        """Class initialization method."""
+        if load_size < 1:
+            raise ValueError("load_size must be a positive integer")
+
+        if commit_interval is not None and commit_interval < 1:
+            raise ValueError("commit_interval must be a positive integer")
+
+        self.database_connection = database_connection
+        self.table = table
+        self.columns = tuple(columns)
+        self.load_size = load_size
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self.prepared = prepared
+
+        self._rows_loaded: int = 0
+        self._loads: int = 0
+        self._commits: int = 0
+
+        self._metrics = metrics.current()
+        self._progress = checkpoint.current()
+        self._file: TextIO | None = None
+        self._file_rows: int = 0
+        self._last_row: Sequence[Any] = ()
+        self._uncommitted_rows: int = 0
+        self._load_query = (
+            "LOAD DATA LOCAL INFILE %s "
+            f"INTO TABLE {table} CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+            "LINES TERMINATED BY '\\n' "
+            f"({', '.join(self.columns)});"
+        )
+
+        self._fallback: BatchWriter | None = None
+        if not local_infile_enabled(database_connection):
+            self._fallback = self._create_fallback()
+
+    def __enter__(self) -> "BulkLoadWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # Only write out remaining rows if the block completed cleanly
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self._remove_file()
+            if self._fallback:
+                self._fallback.__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def uses_bulk_load(self) -> bool:
+        """Whether rows are being written using LOAD DATA."""
+        return self._fallback is None
+
+    @property
+    def rows_written(self) -> int:
+        """Number of rows written to the destination table."""
+        fallback_rows = self._fallback.rows_written if self._fallback else 0
+        return self._rows_loaded + fallback_rows
+
+    @property
+    def statements(self) -> int:
+        """Number of LOAD DATA and INSERT statements issued."""
+        fallback_statements = self._fallback.statements if self._fallback else 0
+        return self._loads + fallback_statements
+
+    @property
+    def commits(self) -> int:
+        """Number of intermediate commits issued."""
+        fallback_commits = self._fallback.commits if self._fallback else 0
+        return self._commits + fallback_commits
+
+    def _create_fallback(self) -> BatchWriter:
+        """Create the batched INSERT writer used without LOAD DATA."""
+        return BatchWriter(
+            database_connection=self.database_connection,
+            table=self.table,
+            columns=self.columns,
+            batch_size=self.batch_size,
+            commit_interval=self.commit_interval,
+            prepared=self.prepared,
+        )
+
+    def _remove_file(self) -> None:
+        """Close and delete the current temporary file."""
+        if self._file is None:
+            return
+
+        self._file.close()
+        Path(self._file.name).unlink()
+        self._file = None
+        self._file_rows = 0
+
+    def add(self, row: Sequence[Any]) -> None:
+        """Add a row to the current file, loading the file when full."""
+        if self._fallback:
+            self._fallback.add(row)
+            return
+
+        if len(row) != len(self.columns):
+            raise ValueError(
+                f"Expected {len(self.columns)} values for {self.table}, "
+                f"received {len(row)}"
+            )
+
+        if self._file is None:
+            self._file = tempfile.NamedTemporaryFile(  # noqa: SIM115
+                mode="w",
+                encoding="utf-8",
+                newline="\n",
+                prefix=f"{self.table}.",
+                suffix=".tsv",
+                delete=False,
+            )
+
+        self._file.write("\t".join([_tsv_value(value) for value in row]) + "\n")
+        self._file_rows += 1
+        self._last_row = row
+        if self._file_rows >= self.load_size:
+            self.flush()
+
+    def extend(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Add multiple rows to the current file."""
+        for row in rows:
+            self.add(row)
+
+    def _check_loaded(self, cursor: Any, row_count: int) -> None:
+        """Check that every row in the current file was loaded unchanged.
+
+        With LOCAL, LOAD DATA ignores rows with duplicate keys and
+        converts invalid values, reporting warnings instead of errors,
+        so BulkLoadError is raised rather than silently losing rows.
+        """
+        loaded_rows = cursor.rowcount
+        cursor.execute("SHOW COUNT(*) WARNINGS;")
+        warning_count = int(cursor.fetchone()[0])
+        if loaded_rows == row_count and not warning_count:
+            return
+
+        cursor.execute("SHOW WARNINGS LIMIT 3;")
+        warnings = "; ".join(str(warning[2]) for warning in cursor.fetchall())
+        raise BulkLoadError(
+            f"Loaded {loaded_rows} of {row_count} rows into {self.table} with "
+            f"{warning_count} warnings: {warnings}"
+        )
+
+    def flush(self) -> None:
+        """Load any rows in the current file into the destination table."""
+        if self._fallback:
+            self._fallback.flush()
+            return
+
+        if self._file is None:
+            return
+
+        row_count = self._file_rows
+        self._file.flush()
+        cursor = self.database_connection.cursor()
+        start_time = time.perf_counter()
+        try:
+            cursor.execute(self._load_query, (self._file.name,))
+        except Exception as error:
+            if error_code(error) not in LOCAL_INFILE_ERRORS:
+                raise
+
+            # Bulk loading is not allowed, so write the rows in this file
+            # and any further rows using batched INSERT statements
+            self._fallback = self._create_fallback()
+            with Path(self._file.name).open(encoding="utf-8", newline="\n") as tsv_file:
+                self._fallback.extend(read_tsv(tsv_file))
+
+            self._remove_file()
+            return
+        else:
+            self._check_loaded(cursor, row_count)
+        finally:
+            cursor.close()
+
+        self._rows_loaded += row_count
+        self._loads += 1
+        self._remove_file()
+
+        self._uncommitted_rows += row_count
+        committed = False
+        if self.commit_interval and self._uncommitted_rows >= self.commit_interval:
+            self.database_connection.commit()
+            self._commits += 1
+            self._uncommitted_rows = 0
+            committed = True
+            if self._progress:
+                self._progress.committed(self.columns, self._last_row)
+
+        if self._metrics:
+            self._metrics.write_time += time.perf_counter() - start_time
+            self._metrics.rows_written += row_count
+            self._metrics.statements += 1
+            self._metrics.commits += int(committed)
+
+
+def create_writer(
+    database_connection: MySQLConnection,
+    table: str,
+    columns: Sequence[str],
+    options: TransferOptions,
+    upsert_columns: Sequence[str] | None = None,
+) -> BatchWriter | BulkLoadWriter:
+    """Create a destination writer configured from transfer options.
+
+    Bulk loading is only used for plain inserts, as LOAD DATA cannot
+    update existing rows without deleting them first.
+    """
+    if options.transaction_mode == "batch":
+        commit_interval = options.commit_interval
+    else:
+        commit_interval = None
+
+    if options.bulk_load and not upsert_columns:
+        return BulkLoadWriter(
+            database_connection=database_connection,
+            table=table,
+            columns=columns,
+            load_size=options.bulk_load_size,
+            batch_size=options.batch_size,
+            commit_interval=commit_interval,
+            prepared=options.prepared_statements,
+        )
+
+    return BatchWriter(
+        database_connection=database_connection,
+        table=table,
+        columns=columns,
+        batch_size=options.batch_size,
+        commit_interval=commit_interval,
+        upsert_columns=upsert_columns,
+        prepared=options.prepared_statements,
+    )
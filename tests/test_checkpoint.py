@@ -0,0 +1,134 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Testing for module tables.checkpoint."""
+import json
+from pathlib import Path
+
+import pytest
+
+from tables import checkpoint
+from tables.checkpoint import (
+    CHECKPOINT_FORMAT,
+    CHECKPOINT_VERSION,
+    Checkpoint,
+    CheckpointError,
+    checkpoint_key,
+    track_table,
+)
+
+
+def test_checkpoint_resume(tmp_path: Path) -> None:
+    """Test resuming from the progress recorded by an earlier run.
+
+    :param tmp_path: Temporary directory for the checkpoint file
+    """
+    path = tmp_path / "checkpoint.json"
+    run = Checkpoint(path)
+    run.complete("shows")
+    run.record_commit("guests", 1000)
+    run.record_commit("guests", 2000)
+
+    resumed = Checkpoint(path, resume=True)
+    assert resumed.started == run.started
+    assert resumed.completed("shows")
+    assert not resumed.completed("guests")
+    assert resumed.tables["guests"] == {
+        "status": "running",
+        "last_id": 2000,
+        "batches": 2,
+    }
+
+    resumed.complete("guests")
+    assert Checkpoint(path, resume=True).completed("guests")
+
+    resumed.remove()
+    assert not path.exists()
+
+
+def test_checkpoint_new_run(tmp_path: Path) -> None:
+    """Test that a new run starts over instead of reading the file.
+
+    :param tmp_path: Temporary directory for the checkpoint file
+    """
+    path = tmp_path / "checkpoint.json"
+    Checkpoint(path).complete("shows")
+    assert not Checkpoint(path).completed("shows")
+    assert json.loads(path.read_text(encoding="utf-8"))["tables"] == {}
+
+
+@pytest.mark.parametrize(
+    "contents, message",
+    [
+        (None, "No checkpoint found"),
+        ({"format": "report"}, "is not a checkpoint file"),
+        (
+            {
+                "format": CHECKPOINT_FORMAT,
+                "version": CHECKPOINT_VERSION + 1,
+            },
+            "Unsupported checkpoint version",
+        ),
+    ],
+)
+def test_checkpoint_resume_invalid(
+    tmp_path: Path, contents: dict | None, message: str
+) -> None:
+    """Test that missing and incompatible checkpoint files are rejected.
+
+    :param tmp_path: Temporary directory for the checkpoint file
+    :param contents: Contents of the checkpoint file, or None if there
+        is no checkpoint file
+    :param message: Part of the expected error message
+    """
+    path = tmp_path / "checkpoint.json"
+    if contents is not None:
+        path.write_text(json.dumps(contents), encoding="utf-8")
+
+    with pytest.raises(CheckpointError, match=message):
+        Checkpoint(path, resume=True)
+
+
+def test_track_table(tmp_path: Path) -> None:
+    """Test that commits are recorded and a table completed on success.
+
+    :param tmp_path: Temporary directory for the checkpoint file
+    """
+    run = Checkpoint(tmp_path / "checkpoint.json")
+    key = checkpoint_key("guests", "stats")
+    with track_table(run, "guests", "guestid", "stats") as progress:
+        assert checkpoint.current() is progress
+        progress.committed(("guestid", "guest"), (42, "Guest"))
+        with checkpoint.untracked():
+            assert checkpoint.current() is None
+
+    assert checkpoint.current() is None
+    assert key == "stats/guests"
+    assert run.completed(key)
+    assert run.tables[key]["last_id"] == 42
+
+
+def test_track_table_failed(tmp_path: Path) -> None:
+    """Test that a failed table is not recorded as completed.
+
+    :param tmp_path: Temporary directory for the checkpoint file
+    """
+    run = Checkpoint(tmp_path / "checkpoint.json")
+    with (
+        pytest.raises(ConnectionError),
+        track_table(run, "guests", "guestid") as progress,
+    ):
+        progress.committed(("guestid", "guest"), (42, "Guest"))
+        raise ConnectionError("lost connection")
+
+    assert not run.completed("guests")
+    assert run.tables["guests"]["last_id"] == 42
+
+
+def test_track_table_without_checkpoint() -> None:
+    """Test that nothing is tracked without a checkpoint."""
+    with track_table(None, "guests", "guestid") as progress:
+        assert progress is None
+        assert checkpoint.current() is None
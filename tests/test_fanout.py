@@ -0,0 +1,87 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Testing for module tables.fanout."""
+from collections.abc import Callable, Iterator
+
+import pytest
+
+from tables.fanout import FanOutAbortedError, FanOutRows, fan_out
+
+
+def _consumer(results: list[str]) -> Callable[[FanOutRows], None]:
+    """Return a consumer that reads every row and then commits.
+
+    The consumer appends ``committed`` to results if every consumer
+    read all of its rows, or ``aborted`` if the fan-out was aborted
+    while reading or waiting.
+    """
+
+    def consume(rows: FanOutRows) -> None:
+        try:
+            for _ in rows:
+                pass
+
+            rows.wait()
+        except FanOutAbortedError:
+            results.append("aborted")
+            raise
+
+        results.append("committed")
+
+    return consume
+
+
+def test_fan_out() -> None:
+    """Test that every consumer receives every row, in order."""
+    received: list[list[int]] = [[], [], []]
+    consumers = [
+        lambda rows, index=index: received[index].extend(rows) for index in range(3)
+    ]
+    fan_out(iter(range(100)), consumers, chunk_size=7, queue_size=1)
+    assert received == [list(range(100))] * 3
+
+
+def test_fan_out_consumer_error() -> None:
+    """Test that a failed consumer aborts the others and is raised."""
+    results: list[str] = []
+
+    def fail(rows: FanOutRows) -> None:
+        for row in rows:
+            if row == 50:
+                raise ConnectionError("lost connection")
+
+    with pytest.raises(ConnectionError, match="lost connection"):
+        fan_out(
+            iter(range(100)),
+            [_consumer(results), fail, _consumer(results)],
+            chunk_size=10,
+        )
+
+    assert results == ["aborted", "aborted"]
+
+
+def test_fan_out_read_error() -> None:
+    """Test that an error reading rows aborts every consumer and is raised."""
+    results: list[str] = []
+
+    def rows() -> Iterator[int]:
+        yield from range(25)
+        raise ConnectionError("lost source connection")
+
+    with pytest.raises(ConnectionError, match="lost source connection"):
+        fan_out(
+            rows(),
+            [_consumer(results), _consumer(results)],
+            chunk_size=10,
+        )
+
+    assert results == ["aborted", "aborted"]
+
+
+def test_fan_out_invalid_chunk_size() -> None:
+    """Test that chunks must hold at least one row."""
+    with pytest.raises(ValueError, match="chunk_size"):
+        fan_out([], [list], chunk_size=0)
@@ -0,0 +1,85 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Testing for module tables.normalize."""
+import random
+from collections.abc import Iterator
+
+import pytest
+
+from benchmarks.normalize import reference_fold
+from tables.normalize import ascii_fold, ascii_fold_many
+
+BMP_SIZE: int = 0x10000
+CHUNK_SIZE: int = 1000
+
+
+def _bmp_strings() -> Iterator[str]:
+    """Generate strings covering every code point in the BMP."""
+    for code_point in range(1, BMP_SIZE):
+        character = chr(code_point)
+        yield character
+        yield f"a{character}b"
+        yield f"é{character}̧c"
+
+
+def _mixed_strings(count: int, seed: int) -> Iterator[str]:
+    """Generate strings of random code points and combining marks."""
+    # Reproducible test data, not used for anything security related
+    generator = random.Random(seed)  # noqa: S311
+    for _ in range(count):
+        yield "".join(
+            chr(generator.choice((generator.randrange(1, BMP_SIZE), 0x0300, 0x0041)))
+            for _ in range(generator.randint(0, 12))
+        )
+
+
+def _chunks(values: Iterator[str]) -> Iterator[list[str]]:
+    """Split strings into chunks of CHUNK_SIZE strings."""
+    chunk: list[str] = []
+    for value in values:
+        chunk.append(value)
+        if len(chunk) >= CHUNK_SIZE:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def _assert_matches_reference(values: list[str | None]) -> None:
+    """Compare ascii_fold and ascii_fold_many against the reference."""
+    expected = [reference_fold(value) for value in values]
+    assert [ascii_fold(value) for value in values] == expected
+    assert ascii_fold_many(values) == expected
+
+
+def test_ascii_fold_bmp() -> None:
+    """Test every code point in the BMP, on its own and between others."""
+    for chunk in _chunks(_bmp_strings()):
+        _assert_matches_reference(chunk)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_ascii_fold_mixed(seed: int) -> None:
+    """Test strings of random code points and combining marks."""
+    for chunk in _chunks(_mixed_strings(count=100000, seed=seed)):
+        _assert_matches_reference(chunk)
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["plain", None, "", "text"],
+        ["½ cup", "¼", "naïve ¾", "", "Zürich"],
+        [],
+    ],
+)
+def test_ascii_fold_many_edge_cases(values: list[str | None]) -> None:
+    """Test empty values, ASCII strings and multi-character folds.
+
+    :param values: Strings to normalize in a single chunk
+    """
+    _assert_matches_reference(values)
@@ -0,0 +1,83 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Testing for module tables.options."""
+from typing import Any
+
+import pytest
+
+from tables.options import DEFAULT_JOBS, TransferOptions
+
+
+def test_from_config() -> None:
+    """Test that missing settings fall back to their default values."""
+    assert TransferOptions.from_config(None) == TransferOptions()
+    options = TransferOptions.from_config({"jobs": 4, "transaction_mode": "batch"})
+    assert options.jobs == 4
+    assert options.transaction_mode == "batch"
+    assert TransferOptions.from_config({"batch_size": 10}).jobs == DEFAULT_JOBS
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"jobs": 4},
+        {"jobs": 4, "transaction_mode": "batch", "commit_interval": 100},
+        {"transaction_mode": "run"},
+        {"checkpoint_file": "checkpoint.json", "resume": True},
+        {
+            "checkpoint_file": "checkpoint.json",
+            "resume": True,
+            "transaction_mode": "batch",
+        },
+        {"partitions": 4, "jobs": 4},
+    ],
+)
+def test_valid_options(settings: dict[str, Any]) -> None:
+    """Test combinations of options that are accepted.
+
+    :param settings: Transfer option values
+    """
+    TransferOptions(**settings)
+
+
+@pytest.mark.parametrize(
+    "settings, message",
+    [
+        ({"jobs": 0}, "jobs must be a positive integer"),
+        ({"jobs": 1.5}, "jobs must be a positive integer"),
+        ({"pool_size": 0}, "pool_size must be a positive integer"),
+        ({"transaction_mode": "statement"}, "transaction_mode must be one of"),
+        ({"commit_interval": 0}, "commit_interval must be a positive integer"),
+        ({"transaction_mode": "run", "jobs": 2}, "requires jobs to be 1"),
+        ({"sync": True, "incremental": True}, "cannot be combined"),
+        ({"resume": True}, "requires a checkpoint_file"),
+        (
+            {
+                "checkpoint_file": "checkpoint.json",
+                "resume": True,
+                "transaction_mode": "run",
+            },
+            "cannot be resumed with the run transaction mode",
+        ),
+        ({"partitions": 0}, "partitions must be a positive integer"),
+        (
+            {"partitions": 4, "transaction_mode": "batch"},
+            "require the table transaction mode",
+        ),
+        (
+            {"partitions": 4, "transaction_mode": "run"},
+            "require the table transaction mode",
+        ),
+    ],
+)
+def test_invalid_options(settings: dict[str, Any], message: str) -> None:
+    """Test that invalid options and combinations are rejected.
+
+    :param settings: Transfer option values
+    :param message: Part of the expected error message
+    """
+    with pytest.raises(ValueError, match=message):
+        TransferOptions(**settings)
@@ -0,0 +1,52 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Testing for module tables.partition."""
+import pytest
+
+from tables.partition import primary_key_ranges
+
+
+@pytest.mark.parametrize(
+    "first_id, last_id, partitions, ranges",
+    [
+        (1, 100, 4, [(1, 25), (26, 50), (51, 75), (76, 100)]),
+        (1, 10, 3, [(1, 4), (5, 8), (9, 10)]),
+        (1, 2, 4, [(1, 1), (2, 2)]),
+        (7, 7, 4, [(7, 7)]),
+        (1, 100, 1, [(1, 100)]),
+        (-5, 4, 2, [(-5, -1), (0, 4)]),
+        (10, 9, 4, []),
+    ],
+)
+def test_primary_key_ranges(
+    first_id: int, last_id: int, partitions: int, ranges: list[tuple[int, int]]
+) -> None:
+    """Test splitting primary key values into ranges.
+
+    :param first_id: Lowest primary key value
+    :param last_id: Highest primary key value
+    :param partitions: Maximum number of ranges
+    :param ranges: Expected inclusive ranges
+    """
+    assert primary_key_ranges(first_id, last_id, partitions) == ranges
+
+
+@pytest.mark.parametrize("partitions", [1, 2, 3, 7, 16])
+def test_primary_key_ranges_cover_values(partitions: int) -> None:
+    """Test that ranges cover every value exactly once.
+
+    :param partitions: Maximum number of ranges
+    """
+    ranges = primary_key_ranges(3, 1000, partitions)
+    values = [value for first, last in ranges for value in range(first, last + 1)]
+    assert values == list(range(3, 1001))
+    assert len(ranges) <= partitions
+
+
+def test_primary_key_ranges_invalid_partitions() -> None:
+    """Test that at least one partition is required."""
+    with pytest.raises(ValueError, match="positive integer"):
+        primary_key_ranges(1, 100, 0)
@@ -0,0 +1,77 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Testing for module tables.scheduler."""
+import pytest
+
+from backport import TRANSFER_TASKS
+from tables.mappings import Guests
+from tables.scheduler import TransferTask, dependency_order, validate_tasks
+
+
+def _task(name: str, *dependencies: str) -> TransferTask:
+    """Return a task named name that depends on dependencies."""
+    return TransferTask(name=name, table_class=object, dependencies=dependencies)
+
+
+def test_dependency_order() -> None:
+    """Test that each task follows its dependencies, in waves."""
+    tasks = [
+        _task("mappings", "shows", "guests"),
+        _task("descriptions", "shows"),
+        _task("shows"),
+        _task("guests"),
+    ]
+    assert [task.name for task in dependency_order(tasks)] == [
+        "shows",
+        "guests",
+        "mappings",
+        "descriptions",
+    ]
+
+
+def test_dependency_order_keeps_independent_order() -> None:
+    """Test that tasks without dependencies keep the order they are listed in."""
+    tasks = [_task("hosts"), _task("guests"), _task("shows")]
+    assert dependency_order(tasks) == tasks
+
+
+def test_dependency_order_cycle() -> None:
+    """Test that only the tasks that are part of a cycle are reported."""
+    tasks = [_task("shows"), _task("guests", "hosts"), _task("hosts", "guests")]
+    with pytest.raises(ValueError, match="cycle: guests, hosts$"):
+        dependency_order(tasks)
+
+
+def test_from_table() -> None:
+    """Test that tasks take their name and dependencies from the spec."""
+    task = TransferTask.from_table(Guests)
+    assert task.name == "guest_mappings"
+    assert task.table_class is Guests
+    assert task.dependencies == ("shows", "guests")
+
+
+def test_transfer_tasks() -> None:
+    """Test that the backport's own tasks form a valid dependency graph."""
+    validate_tasks(TRANSFER_TASKS)
+
+
+@pytest.mark.parametrize(
+    "tasks, message",
+    [
+        ([_task("shows"), _task("shows")], "must be unique"),
+        ([_task("mappings", "shows")], "mappings depends on unknown task shows"),
+        ([_task("shows", "shows")], "cycle: shows"),
+        ([_task("a", "c"), _task("b", "a"), _task("c", "b")], "cycle: a, b, c"),
+    ],
+)
+def test_validate_tasks_invalid(tasks: list[TransferTask], message: str) -> None:
+    """Test that duplicate names, unknown dependencies and cycles are rejected.
+
+    :param tasks: Invalid list of tasks
+    :param message: Part of the expected error message
+    """
+    with pytest.raises(ValueError, match=message):
+        validate_tasks(tasks)
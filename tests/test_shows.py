@@ -0,0 +1,114 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Testing for module tables.shows."""
+import datetime
+from typing import Any
+
+import pytest
+
+from tables.options import TransferOptions
+from tables.shows import Shows
+
+DATE = datetime.date(2000, 1, 1)
+
+
+class ShowsCursor:
+    """Cursor writing to an in-memory ww_shows table.
+
+    Checks the repeatshowid foreign key row by row, as InnoDB does.
+    """
+
+    def __init__(self, shows: dict[int, list[Any]]) -> None:
+        self.shows = shows
+        self.updates = 0
+
+    def execute(self, query: str, parameters: list[Any]) -> None:
+        """Apply an INSERT or repeatshowid UPDATE statement."""
+        if query.startswith("INSERT INTO ww_shows"):
+            for index in range(0, len(parameters), 5):
+                row = list(parameters[index : index + 5])
+                if row[2] is not None and row[2] not in self.shows:
+                    raise AssertionError(f"Show {row[0]} references missing {row[2]}")
+
+                self.shows[row[0]] = row
+        elif "SET repeatshowid = CASE" in query:
+            count = len(parameters) // 3
+            for index in range(count):
+                show_id, repeat_show_id = parameters[index * 2 : index * 2 + 2]
+                assert repeat_show_id in self.shows
+                self.shows[show_id][2] = repeat_show_id
+
+            self.updates += 1
+        else:
+            raise AssertionError(f"Unexpected query: {query}")
+
+    def close(self) -> None:
+        """Close the cursor."""
+
+
+class ShowsConnection:
+    """Destination connection holding an in-memory ww_shows table."""
+
+    def __init__(self, shows: dict[int, list[Any]] | None = None) -> None:
+        self.shows = shows or {}
+        self.cursors: list[ShowsCursor] = []
+
+    def cursor(self) -> ShowsCursor:
+        """Return a new cursor."""
+        cursor = ShowsCursor(self.shows)
+        self.cursors.append(cursor)
+        return cursor
+
+    def is_connected(self) -> bool:
+        """Return whether the connection is open."""
+        return True
+
+    def commit(self) -> None:
+        """Commit the current transaction."""
+
+
+def _load(
+    connection: ShowsConnection, rows: list[tuple[Any, ...]], first_id: int = 0
+) -> int:
+    """Load shows and return the number of repeatshowid UPDATE statements."""
+    Shows(
+        destination_database_connection=connection,
+        options=TransferOptions(batch_size=2),
+    ).load(rows, first_id=first_id)
+    return sum(cursor.updates for cursor in connection.cursors)
+
+
+@pytest.mark.parametrize(
+    "rows, updates",
+    [
+        # Repeats of earlier shows, including shows in the same batch,
+        # are written by the initial insert
+        ([(1, DATE, None, 0, 0), (2, DATE, 1, 0, 0), (3, DATE, 2, 1, 0)], 0),
+        # Repeats of later shows are set once every show is written
+        ([(1, DATE, 3, 0, 0), (2, DATE, None, 0, 0), (3, DATE, None, 0, 0)], 1),
+        ([(1, DATE, 2, 0, 0), (2, DATE, 1, 0, 0), (3, DATE, 3, 0, 0)], 1),
+    ],
+)
+def test_load_repeat_shows(rows: list[tuple[Any, ...]], updates: int) -> None:
+    """Test that repeats of later shows are deferred.
+
+    :param rows: Shows to load, in showid order
+    :param updates: Expected number of repeatshowid UPDATE statements
+    """
+    connection = ShowsConnection()
+    assert _load(connection, rows) == updates
+    assert {show_id: tuple(row) for show_id, row in connection.shows.items()} == {
+        row[0]: row for row in rows
+    }
+
+
+def test_load_repeat_of_existing_show() -> None:
+    """Test that repeats of shows already in the destination are not deferred."""
+    connection = ShowsConnection({1: [1, DATE, None, 0, 0]})
+    rows = [(2, DATE, 1, 0, 0), (3, DATE, 1, 1, 0)]
+    assert _load(connection, rows, first_id=2) == 0
+    assert connection.shows[2][2] == 1
+    assert connection.shows[3][2] == 1
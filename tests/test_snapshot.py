@@ -0,0 +1,136 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Testing for module tables.snapshot."""
+import datetime
+import decimal
+import gzip
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from tables.snapshot import (
+    SnapshotError,
+    SnapshotReader,
+    SnapshotWriter,
+    decode_record,
+    encode_row,
+)
+
+ROWS: list[tuple[Any, ...]] = [
+    (1, "plain", None),
+    (2, "Zürich “quoted”", ""),
+    (-(2**63), 2**63 - 1, 0),
+    (1.5, float("inf"), -0.0),
+    (datetime.date(1, 1, 1), datetime.date(2000, 2, 29), datetime.date(9999, 12, 31)),
+    (
+        datetime.datetime(2000, 1, 1, 12, 30, 15),
+        datetime.datetime(2000, 1, 1, 12, 30, 15, 123456),
+        datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc),
+    ),
+    (decimal.Decimal("12.50"), decimal.Decimal("-0.001"), decimal.Decimal("1E+3")),
+    (b"", b"\x00\xff", bytearray(b"tab\there")),
+    (),
+]
+
+
+@pytest.mark.parametrize("row", ROWS)
+def test_record_round_trip(row: tuple[Any, ...]) -> None:
+    """Test decoding an encoded row.
+
+    :param row: Row of destination values
+    """
+    record = encode_row(row)
+    assert int.from_bytes(record[:4], "big") == len(record) - 4
+
+    values = decode_record(record[4:])
+    assert values == tuple(bytes(v) if isinstance(v, bytearray) else v for v in row)
+    assert [type(value) for value in values] == [
+        bytes if isinstance(value, bytearray) else type(value) for value in row
+    ]
+
+
+def test_encode_row_unsupported_type() -> None:
+    """Test that values of an unsupported type are rejected."""
+    with pytest.raises(TypeError):
+        encode_row([object()])
+
+
+def test_decode_record_unknown_tag() -> None:
+    """Test that records with an unknown type tag are rejected."""
+    with pytest.raises(SnapshotError):
+        decode_record(b"x")
+
+
+def test_snapshot_round_trip(tmp_path: Path) -> None:
+    """Test reading back tables written to a snapshot directory.
+
+    :param tmp_path: Temporary snapshot directory
+    """
+    with SnapshotWriter(tmp_path) as writer:
+        assert writer.write_table("ww_rows", ROWS) == len(ROWS)
+        assert writer.write_table("ww_empty", []) == 0
+
+    reader = SnapshotReader(tmp_path)
+    assert reader.tables["ww_rows"]["rows"] == len(ROWS)
+    assert list(reader.read_table("ww_rows")) == [
+        decode_record(encode_row(row)[4:]) for row in ROWS
+    ]
+    assert list(reader.read_table("ww_empty")) == []
+
+
+def test_snapshot_truncated(tmp_path: Path) -> None:
+    """Test that a truncated table file is detected.
+
+    :param tmp_path: Temporary snapshot directory
+    """
+    with SnapshotWriter(tmp_path) as writer:
+        writer.write_table("ww_rows", ROWS)
+
+    table_path = tmp_path / "ww_rows.bin.gz"
+    data = gzip.decompress(table_path.read_bytes())
+    table_path.write_bytes(gzip.compress(data[:-1]))
+
+    # The file is rejected before the first row is returned
+    with pytest.raises(SnapshotError):
+        next(SnapshotReader(tmp_path).read_table("ww_rows"))
+
+
+def test_snapshot_changed_record(tmp_path: Path) -> None:
+    """Test that a changed record is detected before any row is read.
+
+    :param tmp_path: Temporary snapshot directory
+    """
+    with SnapshotWriter(tmp_path) as writer:
+        writer.write_table("ww_rows", ROWS)
+
+    table_path = tmp_path / "ww_rows.bin.gz"
+    data = gzip.decompress(table_path.read_bytes())
+    table_path.write_bytes(gzip.compress(data.replace(b"plain", b"PLAIN")))
+
+    with pytest.raises(SnapshotError):
+        next(SnapshotReader(tmp_path).read_table("ww_rows"))
+
+
+@pytest.mark.parametrize("corrupt", ["truncated", "not_gzip"])
+def test_snapshot_corrupt_file(tmp_path: Path, corrupt: str) -> None:
+    """Test that truncated and invalid gzip files raise SnapshotError.
+
+    :param tmp_path: Temporary snapshot directory
+    :param corrupt: How the compressed table file is damaged
+    """
+    with SnapshotWriter(tmp_path) as writer:
+        writer.write_table("ww_rows", ROWS * 100)
+
+    table_path = tmp_path / "ww_rows.bin.gz"
+    data = table_path.read_bytes()
+    if corrupt == "truncated":
+        table_path.write_bytes(data[: len(data) // 2])
+    else:
+        table_path.write_bytes(b"not a gzip file" + data)
+
+    with pytest.raises(SnapshotError):
+        next(SnapshotReader(tmp_path).read_table("ww_rows"))
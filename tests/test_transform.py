@@ -0,0 +1,50 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Testing for module tables.transform."""
+from collections.abc import Sequence
+from typing import Any
+
+import pytest
+
+from tables.spec import DESCRIPTIONS, SHOWS, TableSpec
+from tables.transform import compile_chunk_transform, compile_transform
+
+TWO_FOLDED = TableSpec(
+    name="two_folded",
+    source_table="ww_two_folded",
+    destination_table="ww_two_folded",
+    primary_key="id",
+    columns=("id", "first", "count", "second"),
+    folded_columns=("first", "second"),
+)
+
+ROWS: dict[str, list[Sequence[Any]]] = {
+    "shows": [(1, "2000-01-01", None, 0, 0), (2, "2000-01-08", 1, 1, 0)],
+    "descriptions": [(1, "Zürich"), (2, None), (3, "")],
+    "two_folded": [(1, "naïve", 2, "½ cup"), (2, None, 3, "plain"), (3, "", 4, None)],
+}
+
+
+@pytest.mark.parametrize("spec", [SHOWS, DESCRIPTIONS, TWO_FOLDED])
+def test_chunk_transform_matches_row_transform(spec: TableSpec) -> None:
+    """Test that chunk and row transformers produce the same values.
+
+    :param spec: Table specification with zero, one or two folded
+        columns
+    """
+    rows = ROWS[spec.name]
+    transform_row = compile_transform(spec)
+    assert compile_chunk_transform(spec)(rows) == [transform_row(row) for row in rows]
+
+
+@pytest.mark.parametrize("spec", [SHOWS, DESCRIPTIONS, TWO_FOLDED])
+def test_chunk_transform_empty_chunk(spec: TableSpec) -> None:
+    """Test that an empty chunk is transformed into no rows.
+
+    :param spec: Table specification with zero, one or two folded
+        columns
+    """
+    assert compile_chunk_transform(spec)([]) == []
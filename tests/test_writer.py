@@ -0,0 +1,153 @@
+# Copyright (c) 2025 Linh Pham
+# wwdtm_database_backport is released under the terms of the Apache License 2.0
+# SPDX-License-Identifier: Apache-2.0
+#
+# vim: set noai syntax=python ts=4 sw=4:
+"""Testing for module tables.writer."""
+import datetime
+import decimal
+import io
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from tables.writer import BulkLoadError, BulkLoadWriter, _tsv_value, read_tsv
+
+ROWS: list[tuple[Any, ...]] = [
+    (1, "plain", None),
+    (2, "tab\there", "new\nline"),
+    (3, "carriage\r\nreturn", "back\\slash"),
+    (4, "nul\0byte", "\\N"),
+    (5, "", "\\\\t"),
+    (6, True, False),
+    (7, b"bytes\tvalue", "Zürich"),
+    (8, decimal.Decimal("12.50"), datetime.date(2000, 1, 1)),
+]
+
+
+def _write_tsv(rows: list[tuple[Any, ...]]) -> io.StringIO:
+    """Write rows into an in-memory file, as BulkLoadWriter.add does."""
+    tsv_file = io.StringIO(newline="\n")
+    for row in rows:
+        tsv_file.write("\t".join([_tsv_value(value) for value in row]) + "\n")
+
+    tsv_file.seek(0)
+    return tsv_file
+
+
+def _expected(value: Any) -> str | None:
+    """Return the string a value is read back as."""
+    if value is None:
+        return None
+
+    if isinstance(value, bool):
+        return "1" if value else "0"
+
+    if isinstance(value, bytes):
+        return value.decode(encoding="utf-8")
+
+    return str(value)
+
+
+def test_tsv_round_trip() -> None:
+    """Test reading back rows written for LOAD DATA."""
+    rows = list(read_tsv(_write_tsv(ROWS)))
+    assert rows == [tuple(_expected(value) for value in row) for row in ROWS]
+
+
+@pytest.mark.parametrize(
+    "value, field",
+    [
+        ("\t", "\\t"),
+        ("\n", "\\n"),
+        ("\r", "\\r"),
+        ("\0", "\\0"),
+        ("\\", "\\\\"),
+    ],
+)
+def test_tsv_value_escapes(value: str, field: str) -> None:
+    """Test that special characters are escaped within a single field.
+
+    :param value: Character that must not appear unescaped
+    :param field: Escaped form of the character
+    """
+    assert _tsv_value(f"a{value}b") == f"a{field}b"
+
+
+def test_tsv_value_null() -> None:
+    r"""Test that None and the string "\N" are written differently."""
+    assert _tsv_value(None) == "\\N"
+    assert _tsv_value("\\N") == "\\\\N"
+
+
+class LoadDataCursor:
+    """Cursor reporting the results of LOAD DATA statements."""
+
+    def __init__(self, connection: "LoadDataConnection") -> None:
+        self.connection = connection
+        self.rowcount = -1
+        self._rows: list[tuple[Any, ...]] = []
+
+    def execute(self, query: str, parameters: Any = None) -> None:
+        """Return the results of a query run by BulkLoadWriter."""
+        if query.startswith("SELECT @@GLOBAL.local_infile"):
+            self._rows = [(1,)]
+        elif query.startswith("LOAD DATA"):
+            rows = len(Path(parameters[0]).read_text(encoding="utf-8").splitlines())
+            self.rowcount = rows - self.connection.skipped
+            self.connection.loads += 1
+        elif query.startswith("SHOW COUNT(*) WARNINGS"):
+            self._rows = [(self.connection.warnings,)]
+        elif query.startswith("SHOW WARNINGS"):
+            self._rows = [("Warning", 1062, "Duplicate entry '1' for key 'PRIMARY'")]
+
+    def fetchone(self) -> tuple[Any, ...]:
+        """Return the next result row."""
+        return self._rows.pop(0)
+
+    def fetchall(self) -> list[tuple[Any, ...]]:
+        """Return the remaining result rows."""
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self) -> None:
+        """Close the cursor."""
+
+
+class LoadDataConnection:
+    """Connection whose LOAD DATA statements skip rows or raise warnings."""
+
+    def __init__(self, skipped: int = 0, warnings: int = 0) -> None:
+        self.skipped = skipped
+        self.warnings = warnings
+        self.loads = 0
+
+    def cursor(self) -> LoadDataCursor:
+        """Return a new cursor."""
+        return LoadDataCursor(self)
+
+
+def test_bulk_load() -> None:
+    """Test that rows loaded in full are counted as written."""
+    connection = LoadDataConnection()
+    with BulkLoadWriter(connection, "ww_rows", ("id", "value"), load_size=2) as writer:
+        writer.extend([(1, "a"), (2, "b"), (3, "c")])
+
+    assert connection.loads == 2
+    assert writer.rows_written == 3
+
+
+@pytest.mark.parametrize("skipped, warnings", [(1, 1), (0, 1)])
+def test_bulk_load_skipped_rows(skipped: int, warnings: int) -> None:
+    """Test that rows skipped or changed by LOAD DATA raise an error.
+
+    :param skipped: Number of rows not loaded
+    :param warnings: Number of warnings raised by the load
+    """
+    connection = LoadDataConnection(skipped=skipped, warnings=warnings)
+    with (
+        pytest.raises(BulkLoadError, match="Duplicate entry"),
+        BulkLoadWriter(connection, "ww_rows", ("id", "value")) as writer,
+    ):
+        writer.extend([(1, "a"), (1, "b")])